@@ -1,15 +1,15 @@
-from flask import Blueprint, request, jsonify
 import json
-from openai import OpenAI
-from pathlib import Path
+
+from flask import Blueprint, Response, request, jsonify
 
 from app.config import SECRET_KEY, BASE_URL
+from app.utils.project import project_dir
+from app.utils.chat_client import chat_client, acquire_chat_slot, release_chat_slot
+from app.logic.chat_context import chat_context
+from app.logic.chat_answers import answer_cache, answer_key
 
 chat_bp = Blueprint("chat", __name__)
 
-LOGIC_FOLDER = Path(__file__).parent.parent / "logic"
-RESULTS_FILE = LOGIC_FOLDER / "truss_results.json"
-IMAGE_FILE = LOGIC_FOLDER / "truss_deformation.png"
 
 def _looks_persian(text):
     return any("\u0600" <= ch <= "\u06FF" for ch in text)
@@ -35,63 +35,25 @@ def _sanitize_history(history):
     return cleaned[-20:]
 
 
-@chat_bp.route("/api/chat/req", methods=["POST"])
-def api_chat_req():
-    """Handle chat request from user with AI integration."""
-    data = request.get_json(silent=True) or {}
+BUSY_ERROR = "The assistant is busy answering other questions. Please try again in a moment."
+
+
+def _prepare_chat(data):
+    """Answer a chat request body directly, or build the model call for it.
+
+    Returns ``(response, status, None)`` when no model call is needed (errors
+    included), otherwise ``(None, None, call)`` with the keyword arguments for
+    ``chat.completions.create`` and what to add to the model's answer.
+    """
     message = data.get("message", "").strip()
     history = _sanitize_history(data.get("history", []))
 
     if not message:
-        return jsonify({"ok": False, "errors": ["Message cannot be empty."]}), 400
-
-    calculation_context = ""
-    raw_results = None
-    image_url = None
-
-    # collect data for answers
-    if RESULTS_FILE.exists():
-        try:
-            with open(RESULTS_FILE, "r") as f:
-                results = json.load(f)
-            raw_results = results
-
-            calc_summary = ["Truss Calculation Results:\n"]
-
-            calc_summary.append("\nDisplacements:")
-            for disp in results.get("displacements", []):
-                calc_summary.append(
-                    f"  Node {disp['node_id']}: ux = {disp['ux']:.6e} m, uy = {disp['uy']:.6e} m"
-                )
-
-            calc_summary.append("\nElement Properties:")
-            for eid, elem_data in results.get("elements", {}).items():
-                calc_summary.append(
-                    f"  Element {eid}: Area = {elem_data['area']:.6e} m², "
-                    f"Length = {elem_data['length']:.4f} m, Material = {elem_data['material']}, "
-                    f"E = {elem_data['young_modulus']:.2e} Pa"
-                )
-
-            calc_summary.append("\nElement Forces:")
-            for eid, force_data in results.get("forces", {}).items():
-                calc_summary.append(
-                    f"  Element {eid}: {force_data['force']:.2f} N ({force_data['status']})"
-                )
-
-            calc_summary.append("\nElement Stress Analysis:")
-            for eid, result in results.get("element_results", {}).items():
-                calc_summary.append(
-                    f"  Element {eid}: Force = {result['force']:.2f} N, "
-                    f"Stress = {result['stress']:.2e} Pa, Status = {result['status']}"
-                )
-
-            calculation_context = "\n".join(calc_summary)
-
-            if IMAGE_FILE.exists():
-                image_url = "/api/truss/image"
-
-        except Exception as e:
-            calculation_context = f"Error loading results: {str(e)}"
+        return {"ok": False, "errors": ["Message cannot be empty."]}, 400, None
+
+    # Built lazily: the summary and the model prompt are only prepared when used.
+    context = chat_context(project_dir())
+    image_url = "/api/truss/image" if context is not None else None
 
     message_lower = message.lower()
     image_keywords = [
@@ -111,17 +73,17 @@ def api_chat_req():
     ]
     if any(keyword in message_lower for keyword in image_keywords) or any(k in message for k in image_keywords):
         if image_url:
-            return jsonify({
+            return {
                 "ok": True,
                 "response": f"Here is the truss deformation visualization: {image_url}\n"
                             f"You can view it at: {request.host_url.rstrip('/')}{image_url}",
                 "image_url": image_url,
-            })
+            }, 200, None
         else:
-            return jsonify({
+            return {
                 "ok": True,
                 "response": "No truss image is available. Please calculate the truss first."
-            })
+            }, 200, None
 
     wants_persian = _looks_persian(message)
     language_rule = (
@@ -133,7 +95,8 @@ def api_chat_req():
     system_prompt = (
         "You are a helpful assistant specialized in structural engineering and truss analysis.\n"
         "CRITICAL RULES:\n"
-        "- Answer ONLY using the provided truss calculation JSON data and do not mention your data is from a JSON file\n"
+        "- Answer ONLY using the provided truss calculation data and do not mention the format it was given in.\n"
+        "- Lists marked as truncated are incomplete; if the answer needs rows that are not shown, ask the user to name the node or element.\n"
         "- If the data is missing or insufficient, say you cannot answer and tell the user to calculate the truss first.\n"
         "- Do not invent nodes/elements/forces/stresses that are not in the data.\n"
         "- Keep responses concise, technical, and helpful.\n"
@@ -142,74 +105,165 @@ def api_chat_req():
 
     if not SECRET_KEY:
         response_text = f"I received your message: {message}\n\n"
-        if calculation_context:
+        if context is not None:
+            try:
+                calculation_context = context.summary
+            except Exception as e:
+                calculation_context = f"Error loading results: {str(e)}"
             response_text += f"\n{calculation_context}\n\n"
         response_text += "Note: AI API key not configured. Please set AI_API_KEY in your environment."
-        return jsonify({"ok": True, "response": response_text})
+        return {"ok": True, "response": response_text}, 200, None
 
-    if raw_results is None:
+    if context is None:
         if wants_persian:
-            return jsonify(
-                {
-                    "ok": True,
-                    "response": (
-                        "من هنوز به نتایج محاسبات خرپا دسترسی ندارم، بنابراین نمی‌توانم بر اساس مدل شما پاسخ بدهم.\n"
-                        "لطفاً ابتدا در صفحه خرپا محاسبه را انجام دهید (Go to chat) و سپس دوباره سوال بپرسید."
-                    ),
-                }
-            )
-        return jsonify(
-            {
+            return {
                 "ok": True,
                 "response": (
-                    "I don't have `truss_results.json` yet, so I can't answer based on your truss.\n"
-                    "Please go to the truss page and calculate first (Go to chat), then ask again."
+                    "من هنوز به نتایج محاسبات خرپا دسترسی ندارم، بنابراین نمی‌توانم بر اساس مدل شما پاسخ بدهم.\n"
+                    "لطفاً ابتدا در صفحه خرپا محاسبه را انجام دهید (Go to chat) و سپس دوباره سوال بپرسید."
                 ),
-            }
-        )
+            }, 200, None
+        return {
+            "ok": True,
+            "response": (
+                "I don't have `truss_results.json` yet, so I can't answer based on your truss.\n"
+                "Please go to the truss page and calculate first (Go to chat), then ask again."
+            ),
+        }, 200, None
 
-    try:
-        if not BASE_URL:
-            return jsonify(
-                {
-                    "ok": False,
-                    "errors": ["BASE_URL is not configured. Please set BASE_URL in your environment."],
-                }
-            ), 500
+    if not BASE_URL:
+        return {
+            "ok": False,
+            "errors": ["BASE_URL is not configured. Please set BASE_URL in your environment."],
+        }, 500, None
 
-        # GAPGPT (OpenAI-compatible) client
-        gap_client = OpenAI(base_url=BASE_URL, api_key=SECRET_KEY)
+    suffix = ""
+    if image_url and any(keyword in message_lower for keyword in ["show", "display", "see", "view"]):
+        suffix = f"\n\nTruss visualization image: {request.host_url.rstrip('/')}{image_url}"
 
-        truss_context = (
-            "Truss calculation data (authoritative, use this to answer):\n"
-            f"{json.dumps(raw_results, ensure_ascii=False)}"
-        )
+    # The same question about the same results is answered from the cache.
+    cache_key = answer_key(context.results_hash, message, history)
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        return {"ok": True, "response": cached + suffix, "image_url": image_url, "cached": True}, 200, None
 
-        ai_response = gap_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
+    return None, None, {
+        "request": {
+            "model": "gpt-4o",
+            "messages": [
                 {"role": "system", "content": system_prompt},
-                {"role": "system", "content": truss_context},
+                {"role": "system", "content": context.prompt(message)},
                 *history,
                 {"role": "user", "content": message},
             ],
-            temperature=0.2,
-            max_tokens=1000,
-        )
+            "temperature": 0.2,
+            "max_tokens": 1000,
+        },
+        "suffix": suffix,
+        "image_url": image_url,
+        "cache_key": cache_key,
+    }
+
 
-        ai_message = ai_response.choices[0].message.content or "No response from AI."
+@chat_bp.route("/api/chat/req", methods=["POST"])
+def api_chat_req():
+    """Handle chat request from user with AI integration."""
+    response, status, call = _prepare_chat(request.get_json(silent=True) or {})
+    if call is None:
+        return jsonify(response), status
 
-        if image_url and any(keyword in message_lower for keyword in ["show", "display", "see", "view"]):
-            ai_message += f"\n\nTruss visualization image: {request.host_url.rstrip('/')}{image_url}"
+    if not acquire_chat_slot():
+        return jsonify({"ok": False, "errors": [BUSY_ERROR]}), 503
+
+    try:
+        # GAPGPT (OpenAI-compatible) client
+        ai_response = chat_client().chat.completions.create(**call["request"])
+
+        choice = ai_response.choices[0]
+        ai_message = choice.message.content
+        if ai_message and choice.finish_reason == "stop":
+            # Answers cut short (e.g. by max_tokens) are not reused.
+            answer_cache.set(call["cache_key"], ai_message)
+        ai_message = (ai_message or "No response from AI.") + call["suffix"]
 
         return jsonify({
             "ok": True,
             "response": ai_message,
-            "image_url": image_url if image_url else None,
+            "image_url": call["image_url"],
         })
 
     except Exception as e:
         return jsonify({
             "ok": False,
             "errors": [f"Error calling AI API: {str(e)}"]
-        }), 500
\ No newline at end of file
+        }), 500
+    finally:
+        release_chat_slot()
+
+
+def _sse(data, event=None):
+    """One Server-Sent Events message carrying ``data`` as JSON."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _stream_completion(call):
+    """Relay the model's answer as ``delta`` messages, then a ``done`` event."""
+    parts = []
+    finish_reason = None
+    try:
+        # Closing the stream hands its connection back to the pool, also
+        # when the browser goes away mid-answer.
+        with chat_client().chat.completions.create(**call["request"], stream=True) as stream:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield _sse({"delta": delta})
+    except Exception as e:
+        yield _sse({"ok": False, "errors": [f"Error calling AI API: {str(e)}"]}, "error")
+        return
+
+    ai_message = "".join(parts)
+    if ai_message and finish_reason == "stop":
+        answer_cache.set(call["cache_key"], ai_message)
+    ai_message = (ai_message or "No response from AI.") + call["suffix"]
+    yield _sse({"ok": True, "response": ai_message, "image_url": call["image_url"]}, "done")
+
+
+@chat_bp.route("/api/chat/stream", methods=["POST"])
+def api_chat_stream():
+    """Same as /api/chat/req, but sends the answer as Server-Sent Events while it is written.
+
+    Each ``data:`` message holds ``{"delta": "..."}`` with the next piece of
+    text; the stream ends with an ``event: done`` message carrying the full
+    response (as /api/chat/req would return it) or an ``event: error`` one.
+    Requests rejected before the model is called get the usual JSON error.
+    """
+    response, status, call = _prepare_chat(request.get_json(silent=True) or {})
+    if call is None:
+        if not response["ok"]:
+            return jsonify(response), status
+        events = iter([_sse(response, "done")])
+    elif not acquire_chat_slot():
+        return jsonify({"ok": False, "errors": [BUSY_ERROR]}), 503
+    else:
+        events = _stream_completion(call)
+    reply = Response(
+        events,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    if call is not None:
+        # Held until the stream is finished or the client goes away.
+        reply.call_on_close(release_chat_slot)
+    return reply
+
+
+@chat_bp.route("/api/chat/cache", methods=["GET"])
+def api_chat_cache():
+    """Hit and miss counts of the chat answer cache."""
+    return jsonify({"ok": True, "cache": answer_cache.stats()})
@@ -1,61 +1,138 @@
-from flask import request , send_from_directory , jsonify , Blueprint
-from app.logic.models import Node, Element
-from app.logic.truss_data import materials, nodes, elements
+from flask import request , make_response , jsonify , Blueprint
+from app.logic.models import TrussArrays, LoadCase, LoadCombination
+from app.logic.truss_data import materials, job_manager
+from app.logic.model_store import StaleModelError
+from app.utils.project import current_model, project_dir, save_model
 from app.logic.truss_calculator import (
-    assemble_global_stiffness,
-    apply_boundary_conditions,
-    solve_displacements,
-    compute_forces,
-    check_element_failure,
-    plot_truss,
+    factorize_system,
+    solve_load_cases,
+    force_envelope,
     check_boundary_conditions,
+    render_deformation,
+    render_model,
 )
-import io , base64 , json
+from app.logic.solvers import MechanismError, PRECONDITIONERS
+from app.logic.jobs import run_calculation, solver_info
+from app.logic.results import (
+    displacements_data,
+    reactions_data,
+    load_solution,
+    read_solution,
+    RESULT_SECTIONS,
+)
+from app.logic.model_io import ModelBuilder, ModelImportError, iter_lines, FORMATS
+from app.logic.sweep import parse_sweep, run_sweep, MAX_SENSITIVITY_ELEMENTS
+from app.logic.sizing import (
+    size_members,
+    sizing_report,
+    DEFAULT_SAFETY_FACTOR,
+    DEFAULT_MIN_AREA,
+    MAX_SIZING_ITERATIONS,
+)
+import gzip
 import numpy as np
 from pathlib import Path
 import matplotlib
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 
 LOGIC_FOLDER = Path(__file__).parent.parent / "logic"
-RESULTS_FILE = LOGIC_FOLDER / "truss_results.json"
-IMAGE_FILE = LOGIC_FOLDER / "truss_deformation.png"
+DEFAULT_PLOT_SCALE = 100
+DEFAULT_PLOT_DPI = 150
+MIN_PLOT_DPI, MAX_PLOT_DPI = 50, 400
+IMAGE_MIMETYPES = {"png": "image/png", "svg": "image/svg+xml"}
+NPZ_MIMETYPE = "application/x-npz"
+MAX_RESULTS_PAGE = 100000
+# Responses smaller than this are not worth compressing.
+GZIP_MIN_SIZE = 1024
+BATCH_OPS = ("add", "update", "delete")
+BATCH_TYPES = ("node", "element", "load")
+MAX_BATCH_OPERATIONS = 10000
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+}
 
 info_bp = Blueprint("truss_info" , __name__)
 
+
+@info_bp.errorhandler(StaleModelError)
+def _stale_model(e):
+    """Another worker saved the project during this edit; the client retries on the saved model."""
+    return jsonify({"ok": False, "errors": [str(e)]}), 409
+
+
+def _solver_options(data):
+    """Read the optional solver settings of a calculate request."""
+    solver = data.get("solver", "direct")
+    if solver not in ("direct", "cg"):
+        raise ValueError("solver must be 'direct' or 'cg'.")
+    options = {"solver": solver}
+    if solver == "cg":
+        preconditioner = data.get("preconditioner", "jacobi")
+        if preconditioner not in PRECONDITIONERS:
+            raise ValueError(f"preconditioner must be one of: {', '.join(PRECONDITIONERS)}.")
+        options["preconditioner"] = preconditioner
+        try:
+            if "tol" in data:
+                options["tol"] = float(data["tol"])
+                if not 0 < options["tol"] < 1:
+                    raise ValueError
+            if "maxiter" in data:
+                options["maxiter"] = int(data["maxiter"])
+                if options["maxiter"] <= 0:
+                    raise ValueError
+        except (TypeError, ValueError):
+            raise ValueError("tol must be between 0 and 1 and maxiter a positive integer.")
+    return options
+
+
+def _node_data(n):
+    return {
+        "node_id": n.node_id,
+        "x": n.x,
+        "y": n.y,
+        "ux": bool(n.restraints.get("ux", False)),
+        "uy": bool(n.restraints.get("uy", False)),
+        "fx": float(n.loads.get("fx", 0.0)),
+        "fy": float(n.loads.get("fy", 0.0)),
+        "dx": float(n.settlements.get("ux", 0.0)),
+        "dy": float(n.settlements.get("uy", 0.0)),
+    }
+
+
+def _element_data(e):
+    return {
+        "element_id": e.element_id,
+        "node_i": e.node_i.node_id,
+        "node_j": e.node_j.node_id,
+        "material": e.material.name,
+        "area": e.area,
+    }
+
+
 @info_bp.route("/api/truss-data", methods=["GET"])
 def get_truss_data():
     """Return current truss data: nodes, elements, materials."""
-    return jsonify(
-        nodes=[
-            {
-                "node_id": n.node_id,
-                "x": n.x,
-                "y": n.y,
-                "ux": bool(n.restraints.get("ux", False)),
-                "uy": bool(n.restraints.get("uy", False)),
-                "fx": float(n.loads.get("fx", 0.0)),
-                "fy": float(n.loads.get("fy", 0.0)),
-            }
-            for n in nodes
-        ],
-        materials=[m.name for m in materials.values()],
-        elements=[
-            {
-                "element_id": e.element_id,
-                "node_i": e.node_i.node_id,
-                "node_j": e.node_j.node_id,
-                "material": e.material.name,
-                "area": e.area,
-            }
-            for e in elements
-        ],
-    )
+    model = current_model()
+    with model.read():
+        return jsonify(
+            nodes=[_node_data(n) for n in model.nodes],
+            materials=[m.name for m in materials.values()],
+            elements=[_element_data(e) for e in model.elements],
+            load_cases={
+                name: [{"node_id": nid, **load} for nid, load in case.loads.items()]
+                for name, case in model.load_cases.items()
+            },
+            load_combinations={name: combo.factors for name, combo in model.load_combinations.items()},
+        )
 
 
 @info_bp.route("/api/nodes", methods=["POST"])
 def api_add_node():
     """Add a new node with coordinates and restraints."""
+    model = current_model()
     data = request.get_json(silent=True) or {}
     errors = []
 
@@ -72,35 +149,32 @@ def api_add_node():
     ux = bool(data.get("ux", False))
     uy = bool(data.get("uy", False))
 
+    try:
+        dx = float(data.get("dx", 0.0) or 0.0)
+        dy = float(data.get("dy", 0.0) or 0.0)
+    except (TypeError, ValueError):
+        errors.append("dx and dy (support settlements) must be floating point numbers.")
+    else:
+        if dx != 0.0 and not ux:
+            errors.append("A settlement dx can only be prescribed on a node restrained in ux.")
+        if dy != 0.0 and not uy:
+            errors.append("A settlement dy can only be prescribed on a node restrained in uy.")
+
     if errors:
         return jsonify({"ok": False, "errors": errors}), 400
 
-    for node in nodes:
-        if node.x == x and node.y == y:
-            return jsonify({"ok": False, "errors": ["Node already exists."]}), 400
-
-    next_id = (max((n.node_id for n in nodes), default=0) + 1) if nodes else 1
-    node = Node(node_id=next_id, x=x, y=y, restraints={"ux": ux, "uy": uy})
-    nodes.append(node)
-
-    return jsonify(
-        {
-            "ok": True,
-            "node": {
-                "node_id": node.node_id,
-                "x": node.x,
-                "y": node.y,
-                "ux": node.restraints["ux"],
-                "uy": node.restraints["uy"],
-                "fx": node.loads["fx"],
-                "fy": node.loads["fy"],
-            },
-        }
-    )
+    with model.write():
+        try:
+            node = model.add_node(x, y, restraints={"ux": ux, "uy": uy}, settlements={"ux": dx, "uy": dy})
+        except ValueError as e:
+            return jsonify({"ok": False, "errors": [str(e)]}), 400
+        save_model(model)
+        return jsonify({"ok": True, "node": _node_data(node)})
 
 
 @info_bp.route("/api/elements", methods=["POST"])
 def api_add_element():
+    model = current_model()
     data = request.get_json(silent=True) or {}
     errors = []
 
@@ -117,12 +191,6 @@ def api_add_element():
     if not material_name or material_name not in materials:
         errors.append("material must be one of the available materials.")
 
-    node_i = next((n for n in nodes if n.node_id == node_i_id), None)
-    node_j = next((n for n in nodes if n.node_id == node_j_id), None)
-
-    if node_i is None or node_j is None:
-        errors.append("Both node_i and node_j must be existing nodes.")
-
     try:
         area = float(data.get("area", ""))
         if area <= 0:
@@ -130,31 +198,25 @@ def api_add_element():
     except (TypeError, ValueError):
         errors.append("Area must be a valid floating point number.")
 
-    if errors:
-        return jsonify({"ok": False, "errors": errors}), 400
+    with model.write():
+        node_i = model.get_node(node_i_id)
+        node_j = model.get_node(node_j_id)
 
-    element_id = (max((e.element_id for e in elements), default=0) + 1) if elements else 1
-    material = materials[material_name]
-    element = Element(element_id=element_id, node_i=node_i, node_j=node_j, area=area, material=material)
-    elements.append(element)
+        if node_i is None or node_j is None:
+            errors.append("Both node_i and node_j must be existing nodes.")
 
-    return jsonify(
-        {
-            "ok": True,
-            "element": {
-                "element_id": element.element_id,
-                "node_i": element.node_i.node_id,
-                "node_j": element.node_j.node_id,
-                "material": element.material.name,
-                "area": element.area,
-            },
-        }
-    )
+        if errors:
+            return jsonify({"ok": False, "errors": errors}), 400
+
+        element = model.add_element(node_i, node_j, area, materials[material_name])
+        save_model(model)
+        return jsonify({"ok": True, "element": _element_data(element)})
 
 
 @info_bp.route("/api/loads", methods=["POST"])
 def api_add_load():
     """Add nodal loads fx, fy to an existing node."""
+    model = current_model()
     data = request.get_json(silent=True) or {}
     errors = []
 
@@ -176,37 +238,355 @@ def api_add_load():
         errors.append("fy must be a floating point number.")
         fy = None
 
-    node = next((n for n in nodes if n.node_id == node_id), None) if node_id is not None else None
+    with model.write():
+        node = model.get_node(node_id) if node_id is not None else None
+        if node is None:
+            errors.append("node_id must refer to an existing node.")
+
+        if errors:
+            return jsonify({"ok": False, "errors": errors}), 400
+
+        model.add_load(node, fx, fy)
+        save_model(model)
+        return jsonify({"ok": True, "node": _node_data(node)})
+
+
+def _batch_float(data, key, default=None):
+    value = data.get(key, default)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a floating point number.")
+
+
+def _batch_node(model, value, refs, key="node_id"):
+    """Resolve a node ID, or a ``ref`` given to a node added earlier in the batch."""
+    if isinstance(value, str) and value in refs:
+        value = refs[value]
+    try:
+        node = model.get_node(int(value))
+    except (TypeError, ValueError):
+        node = None
     if node is None:
-        errors.append("node_id must refer to an existing node.")
+        raise ValueError(f"{key} must refer to an existing node.")
+    return node
+
+
+def _batch_node_op(model, op, target, data):
+    if op == "delete":
+        model.remove_node(target)
+        return {}
+
+    current = _node_data(target) if target is not None else {"x": None, "y": None}
+    fields = {**current, **data}
+    x, y = _batch_float(fields, "x"), _batch_float(fields, "y")
+    restraints = {"ux": bool(fields.get("ux", False)), "uy": bool(fields.get("uy", False))}
+    loads = {"fx": _batch_float(fields, "fx", 0.0), "fy": _batch_float(fields, "fy", 0.0)}
+    settlements = {"ux": _batch_float(fields, "dx", 0.0), "uy": _batch_float(fields, "dy", 0.0)}
+    for axis, name in (("ux", "dx"), ("uy", "dy")):
+        if settlements[axis] != 0.0 and not restraints[axis]:
+            raise ValueError(f"A settlement {name} can only be prescribed on a node restrained in {axis}.")
+
+    if op == "add":
+        node = model.add_node(x, y, restraints, loads, settlements)
+    else:
+        node = model.update_node(target, x, y, restraints, loads, settlements)
+    return {"node": _node_data(node)}
+
+
+def _batch_element_op(model, op, target, data, refs):
+    if op == "delete":
+        model.remove_element(target)
+        return {}
+
+    node_i = node_j = area = material = None
+    if op == "add" or "node_i" in data:
+        node_i = _batch_node(model, data.get("node_i"), refs, "node_i")
+    if op == "add" or "node_j" in data:
+        node_j = _batch_node(model, data.get("node_j"), refs, "node_j")
+    if op == "add" or "area" in data:
+        area = _batch_float(data, "area")
+        if area <= 0:
+            raise ValueError("Area must be a positive number.")
+    if op == "add" or "material" in data:
+        material = materials.get(str(data.get("material")))
+        if material is None:
+            raise ValueError("material must be one of the available materials.")
+
+    if op == "add":
+        if node_i is node_j:
+            raise ValueError("node_i and node_j must be different nodes.")
+        element = model.add_element(node_i, node_j, area, material)
+    else:
+        element = model.update_element(target, node_i, node_j, area, material)
+    return {"element": _element_data(element)}
 
-    if errors:
-        return jsonify({"ok": False, "errors": errors}), 400
 
-    node.loads["fx"] = float(node.loads.get("fx", 0.0)) + fx
-    node.loads["fy"] = float(node.loads.get("fy", 0.0)) + fy
+def _batch_load_op(model, op, data, refs):
+    node = _batch_node(model, data.get("node_id"), refs)
+    if op == "add":
+        model.add_load(node, _batch_float(data, "fx", 0.0), _batch_float(data, "fy", 0.0))
+    elif op == "update":
+        model.update_node(node, loads={"fx": _batch_float(data, "fx", 0.0), "fy": _batch_float(data, "fy", 0.0)})
+    else:
+        model.update_node(node, loads={"fx": 0.0, "fy": 0.0})
+    return {"node": _node_data(node)}
+
+
+def _apply_batch_operation(model, operation, refs):
+    """Apply one batch operation and return its result fields; raises ValueError."""
+    if not isinstance(operation, dict):
+        raise ValueError("Each operation must be an object.")
+    op, kind = operation.get("op"), operation.get("type")
+    if op not in BATCH_OPS:
+        raise ValueError(f"op must be one of: {', '.join(BATCH_OPS)}.")
+    if kind not in BATCH_TYPES:
+        raise ValueError(f"type must be one of: {', '.join(BATCH_TYPES)}.")
+    data = operation.get("data") or {}
+    if not isinstance(data, dict):
+        raise ValueError("data must be an object.")
+
+    if kind == "load":
+        return _batch_load_op(model, op, data, refs)
+
+    target = None
+    if op != "add":
+        try:
+            target_id = int(refs.get(operation.get("id"), operation.get("id")))
+        except (TypeError, ValueError):
+            raise ValueError("id must be a valid integer ID.")
+        target = model.get_node(target_id) if kind == "node" else model.get_element(target_id)
+        if target is None:
+            raise ValueError(f"{kind.capitalize()} {target_id} does not exist.")
+
+    if kind == "node":
+        result = _batch_node_op(model, op, target, data)
+        if op == "add" and operation.get("ref") is not None:
+            refs[str(operation["ref"])] = result["node"]["node_id"]
+        return result
+    return _batch_element_op(model, op, target, data, refs)
+
+
+@info_bp.route("/api/truss/batch", methods=["POST"])
+def api_truss_batch():
+    """Apply a list of add/update/delete operations on nodes, elements and loads.
+
+    Operations run in order and either all take effect or none do. An added
+    node may carry a ``ref`` that later operations use in place of its ID.
+    The response has one result per operation.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"ok": False, "errors": ["operations must be a non-empty list."]}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"ok": False, "errors": [f"A batch may contain at most {MAX_BATCH_OPERATIONS} operations."]}), 400
+
+    model = current_model()
+    results, errors, refs = [], [], {}
+    with model.write():
+        try:
+            with model.transaction():
+                for index, operation in enumerate(operations):
+                    result = {"index": index}
+                    try:
+                        result.update(_apply_batch_operation(model, operation, refs))
+                        result["ok"] = True
+                    except ValueError as e:
+                        result.update(ok=False, error=str(e))
+                        errors.append(f"Operation {index}: {e}")
+                    results.append(result)
+                if errors:
+                    raise ValueError("batch rejected")
+        except ValueError:
+            return jsonify({"ok": False, "errors": errors, "results": results}), 400
+        save_model(model)
+
+    return jsonify({"ok": True, "results": results, "refs": refs})
+
+
+@info_bp.route("/api/load-cases", methods=["POST"])
+def api_add_case_load():
+    """Add nodal loads fx, fy to a named load case (created on first use)."""
+    model = current_model()
+    data = request.get_json(silent=True) or {}
+    errors = []
+
+    case_name = str(data.get("case", "")).strip()
+    if not case_name:
+        errors.append("case must be a non-empty load case name.")
 
-    return jsonify(
-        {
+    try:
+        node_id = int(data.get("node_id", ""))
+    except (TypeError, ValueError):
+        errors.append("node_id must be a valid integer ID.")
+        node_id = None
+
+    try:
+        fx = float(data.get("fx", "0"))
+        fy = float(data.get("fy", "0"))
+    except (TypeError, ValueError):
+        errors.append("fx and fy must be floating point numbers.")
+
+    with model.write():
+        if node_id is not None and model.get_node(node_id) is None:
+            errors.append("node_id must refer to an existing node.")
+
+        if errors:
+            return jsonify({"ok": False, "errors": errors}), 400
+
+        case = model.load_cases.setdefault(case_name, LoadCase(case_name))
+        case.add_load(node_id, fx, fy)
+        save_model(model)
+
+        return jsonify({
             "ok": True,
-            "node": {
-                "node_id": node.node_id,
-                "x": node.x,
-                "y": node.y,
-                "ux": node.restraints["ux"],
-                "uy": node.restraints["uy"],
-                "fx": node.loads["fx"],
-                "fy": node.loads["fy"],
-            },
+            "case": case.name,
+            "loads": [{"node_id": nid, **load} for nid, load in case.loads.items()],
+        })
+
+
+@info_bp.route("/api/load-combinations", methods=["POST"])
+def api_add_load_combination():
+    """Define a load combination from explicit factors or an expression like "1.2D+1.6L"."""
+    model = current_model()
+    data = request.get_json(silent=True) or {}
+    try:
+        combo = _parse_combination(data.get("name"), data.get("factors"))
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+
+    with model.write():
+        model.load_combinations[combo.name] = combo
+        save_model(model)
+    return jsonify({"ok": True, "name": combo.name, "factors": combo.factors})
+
+
+def _parse_combination(name, factors):
+    name = str(name or "").strip()
+    if not name:
+        raise ValueError("name must be a non-empty load combination name.")
+    if factors is None:
+        return LoadCombination.from_expression(name)
+    if isinstance(factors, str):
+        return LoadCombination.from_expression(factors, name=name)
+    if not isinstance(factors, dict) or not factors:
+        raise ValueError("factors must map load case names to numbers.")
+    try:
+        return LoadCombination(name, factors)
+    except (TypeError, ValueError):
+        raise ValueError("factors must map load case names to numbers.")
+
+
+def _parse_load_cases(raw):
+    cases = {}
+    if not isinstance(raw, dict):
+        raise ValueError("cases must map load case names to lists of nodal loads.")
+    for name, loads in raw.items():
+        if not isinstance(loads, list):
+            raise ValueError(f"Load case '{name}' must be a list of nodal loads.")
+        case = LoadCase(name)
+        for load in loads:
+            try:
+                case.add_load(int(load["node_id"]), float(load.get("fx", 0.0)), float(load.get("fy", 0.0)))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Load case '{name}' has an invalid load entry: {load!r}.")
+        cases[case.name] = case
+    return cases
+
+
+@info_bp.route("/api/truss/calculate-cases", methods=["POST"])
+def api_truss_calculate_cases():
+    """Solve all load cases and combinations against one factorization.
+
+    The body may carry "cases" and "combinations" to use instead of the
+    stored ones. The nodal loads set through /api/loads are available as the
+    "nodal" case. Support settlements are not part of any load case.
+    """
+    model = current_model()
+    data = request.get_json(silent=True) or {}
+
+    # Take everything needed from the model under one read lock; the solve
+    # itself runs on the snapshot while edits continue.
+    with model.read():
+        if not model.nodes or not model.elements:
+            return jsonify({"ok": False, "errors": ["No truss data to calculate. Add nodes and elements first."]}), 400
+
+        try:
+            options = _solver_options(data)
+            cases = _parse_load_cases(data["cases"]) if "cases" in data else dict(model.load_cases)
+            if "combinations" in data:
+                raw = data["combinations"]
+                if not isinstance(raw, dict):
+                    raise ValueError("combinations must map names to factors or expressions.")
+                combinations = [_parse_combination(name, factors) for name, factors in raw.items()]
+            else:
+                combinations = list(model.load_combinations.values())
+        except ValueError as e:
+            return jsonify({"ok": False, "errors": [str(e)]}), 400
+
+        nodal = LoadCase("nodal", {
+            n.node_id: dict(n.loads) for n in model.nodes if n.loads.get("fx", 0.0) or n.loads.get("fy", 0.0)
+        })
+        if nodal.loads and "nodal" not in cases:
+            cases["nodal"] = nodal
+        cases = {name: LoadCase(name, {nid: dict(load) for nid, load in case.loads.items()})
+                 for name, case in cases.items()}
+        is_valid, error_msg = check_boundary_conditions(model.nodes)
+        truss = TrussArrays(model.nodes, model.elements)
+
+    if not cases:
+        return jsonify({"ok": False, "errors": ["No load cases defined. Add loads to a load case first."]}), 400
+    if not is_valid:
+        return jsonify({"ok": False, "errors": [error_msg]}), 400
+
+    try:
+        system, cached = factorize_system(truss, **options)
+        names, d, reactions, forces = solve_load_cases(truss, list(cases.values()), combinations, system)
+        envelope = force_envelope(names, forces)
+    except MechanismError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "errors": [f"Calculation error: {str(e)}"]}), 500
+
+    element_ids = truss.element_ids.tolist()
+    results = {}
+    for col, name in enumerate(names):
+        results[name] = {
+            "displacements": displacements_data(truss, d[:, col]),
+            "reactions": reactions_data(truss, reactions[:, col]),
+            "forces": dict(zip(element_ids, forces[:, col].tolist())),
+        }
+
+    envelope_data = {}
+    for k, eid in enumerate(element_ids):
+        envelope_data[eid] = {
+            "max": float(envelope["max"][k]),
+            "max_case": envelope["max_case"][k],
+            "min": float(envelope["min"][k]),
+            "min_case": envelope["min_case"][k],
         }
-    )
+
+    return jsonify({
+        "ok": True,
+        "cases": list(cases),
+        "combinations": [combo.name for combo in combinations],
+        "results": results,
+        "envelope": envelope_data,
+        "factorization_cached": cached,
+        "solver": solver_info(system),
+    })
 
 
 @info_bp.route("/api/truss/clear", methods=["POST"])
 def api_truss_clear():
     """Delete all nodes and elements (reset current truss)."""
-    nodes.clear()
-    elements.clear()
+    model = current_model()
+    with model.write():
+        model.clear()
+        save_model(model)
     return jsonify({"ok": True})
 
 
@@ -214,266 +594,476 @@ def api_truss_clear():
 def api_truss_load_default():
     """Load default test truss data for testing."""
     TEST_DATA_FILE = LOGIC_FOLDER / "TRUSS_INPUT.txt"
-    n = []
-    e = []
-    with open(TEST_DATA_FILE, "r") as f:
-        mode = None
-        for line in f:
-            line = line.strip()
-            if line == "" or line.startswith("#"):
-                continue
-
-            if line.lower() == "nodes":
-                mode = "nodes"
-                continue
-            if line.lower() == "elements":
-                mode = "elements"
-                continue
-
-            if mode == "nodes":
-                parts = line.split()
-                nid = int(parts[0])
-                x, y = float(parts[1]), float(parts[2])
-                ux_restr, uy_restr = bool(int(parts[3])), bool(int(parts[4]))
-                fx, fy = float(parts[5]), float(parts[6])
-                restraints = {"ux": ux_restr, "uy": uy_restr}
-                loads = {"fx": fx, "fy": fy}
-                n.append(Node(nid, x, y, restraints, loads))
-
-            elif mode == "elements":
-                eid, ni, nj, area, mat = line.split()
-                elem = Element(
-                    int(eid),
-                    n[int(ni) - 1],
-                    n[int(nj) - 1],
-                    float(area),
-                    materials[mat],
-                )
-                e.append(elem)
-
-    nodes.extend(n)
-    elements.extend(e)
+    with open(TEST_DATA_FILE, "rb") as f:
+        builder = ModelBuilder(materials).read(iter_lines(f), "text")
+
+    model = current_model()
+    with model.write():
+        try:
+            nodes, elements = builder.attach(model)
+        except ModelImportError as e:
+            return jsonify({"ok": False, "errors": e.messages()}), 400
+        model.extend(nodes, elements)
+        save_model(model)
+        nodes_count, elements_count = len(model.nodes), len(model.elements)
 
     return jsonify({
         "ok": True,
         "message": "Default test truss loaded successfully.",
-        "nodes_count": len(nodes),
-        "elements_count": len(elements),
+        "nodes_count": nodes_count,
+        "elements_count": elements_count,
     })
 
 
+@info_bp.route("/api/truss/import", methods=["POST"])
+def api_truss_import():
+    """Import nodes and elements from a streamed text, CSV or JSON Lines body.
+
+    ``format`` (query string) is "text", "csv" or "jsonl" and defaults from
+    the Content-Type. ``mode=replace`` (default) swaps the whole model,
+    ``mode=append`` adds to it. The body is validated as it is read and the
+    model is only changed if every record is valid.
+    """
+    fmt = request.args.get("format") or IMPORT_CONTENT_TYPES.get(request.mimetype, "text")
+    mode = request.args.get("mode", "replace")
+    errors = []
+    if fmt not in FORMATS:
+        errors.append(f"format must be one of: {', '.join(FORMATS)}.")
+    if mode not in ("replace", "append"):
+        errors.append("mode must be 'replace' or 'append'.")
+    if errors:
+        return jsonify({"ok": False, "errors": errors}), 400
+
+    builder = ModelBuilder(materials).read(iter_lines(request.stream), fmt)
+    if not builder.error_count and not builder.nodes and not builder.elements:
+        return jsonify({"ok": False, "errors": ["The upload contains no nodes or elements."]}), 400
+
+    model = current_model()
+    with model.write():
+        try:
+            nodes, elements = builder.attach(model if mode == "append" else None)
+        except ModelImportError as e:
+            return jsonify({"ok": False, "errors": e.messages()}), 400
+        if mode == "replace":
+            model.clear()
+        model.extend(nodes, elements)
+        save_model(model)
+        nodes_count, elements_count = len(model.nodes), len(model.elements)
+
+    return jsonify({
+        "ok": True,
+        "imported": {"nodes": len(nodes), "elements": len(elements)},
+        "nodes_count": nodes_count,
+        "elements_count": elements_count,
+    })
+
+
+def _image_format():
+    fmt = request.args.get("format", "png")
+    if fmt not in IMAGE_MIMETYPES:
+        raise ValueError(f"format must be one of: {', '.join(IMAGE_MIMETYPES)}.")
+    return fmt
+
+
+def _send_image(render, etag, fmt):
+    """Answer 304 if the client already has ``etag``, otherwise render and send raw bytes."""
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(render())
+        response.mimetype = IMAGE_MIMETYPES[fmt]
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
 @info_bp.route("/api/truss/plot", methods=["GET"])
 def api_truss_plot():
-    """Render the current truss to a PNG image and return it as base64."""
-    if not nodes and not elements:
+    """Render the current truss (undeformed, with loads) as a PNG or SVG image."""
+    try:
+        fmt = _image_format()
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+
+    truss = current_model().snapshot()
+    if not truss.n_nodes and not truss.n_elements:
         return jsonify({"ok": False, "errors": ["No truss data to visualize. Add nodes and elements first."]}), 400
 
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=160)
+    etag = f"model-{truss.content_key()}-{fmt}"
+    return _send_image(lambda: render_model(truss, fmt=fmt), etag, fmt)
+
+
+@info_bp.route("/api/truss/geometry", methods=["GET"])
+def api_truss_geometry():
+    """Return the model as flat arrays for client-side drawing.
 
-    if nodes:
-        xs = [n.x for n in nodes]
-        ys = [n.y for n in nodes]
-        span_x = max(xs) - min(xs) if len(xs) > 1 else 1.0
-        span_y = max(ys) - min(ys) if len(ys) > 1 else 1.0
-        span = max(span_x, span_y, 1.0)
+    ``coords`` is [x0, y0, x1, y1, ...], ``connectivity`` holds pairs of node
+    positions (indexes into ``node_ids``) and ``loads``/``restraints`` are
+    per node in the same order. When the last calculation was run on the
+    model exactly as it is now, its ``displacements`` and ``forces`` are
+    included under ``results``.
+    """
+    truss = current_model().snapshot()
+    solution = load_solution(project_dir())
+    if solution is not None and solution.model_key != truss.content_key():
+        solution = None
+
+    etag = f"geometry-{truss.content_key()}-{solution.results_hash if solution else 'none'}"
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
     else:
-        xs, ys, span = [], [], 1.0
-
-    for e in elements:
-        x_vals = [e.node_i.x, e.node_j.x]
-        y_vals = [e.node_i.y, e.node_j.y]
-        ax.plot(x_vals, y_vals, "-o", color="#38bdf8", linewidth=2.0, markersize=5)
-        mid_x = 0.5 * (e.node_i.x + e.node_j.x)
-        mid_y = 0.5 * (e.node_i.y + e.node_j.y)
-        ax.text(mid_x, mid_y, f"E{e.element_id}", color="#e5e7eb", fontsize=7, ha="center", va="center")
-
-    for n in nodes:
-        ax.scatter(n.x, n.y, s=35, color="#f97316", zorder=5)
-        ax.text(n.x, n.y, f"N{n.node_id}", color="#e5e7eb", fontsize=7, ha="left", va="bottom")
-
-        fx = float(n.loads.get("fx", 0.0))
-        fy = float(n.loads.get("fy", 0.0))
-        arrow_len = 0.08 * span
-        head_w = 0.03 * span
-        head_l = 0.04 * span
-
-        if fx != 0.0:
-            direction_x = 1.0 if fx > 0 else -1.0
-            ax.arrow(
-                n.x,
-                n.y,
-                direction_x * arrow_len,
-                0.0,
-                head_width=head_w,
-                head_length=head_l,
-                length_includes_head=True,
-                color="#f97373",
-                zorder=6,
-            )
-            text_x = n.x + direction_x * arrow_len * 1.3
-            text_y = n.y + 0.04 * span
-            ax.text(
-                text_x,
-                text_y,
-                f"Fx={fx:.1f}",
-                color="#fecaca",
-                fontsize=7,
-                ha="center",
-                va="bottom",
-            )
-
-        if fy != 0.0:
-            direction_y = 1.0 if fy > 0 else -1.0
-            ax.arrow(
-                n.x,
-                n.y,
-                0.0,
-                direction_y * arrow_len,
-                head_width=head_w,
-                head_length=head_l,
-                length_includes_head=True,
-                color="#f97373",
-                zorder=6,
-            )
-            text_x = n.x + 0.02 * span
-            text_y = n.y + direction_y * arrow_len * 1.3
-            ax.text(
-                text_x,
-                text_y,
-                f"Fy={fy:.1f}",
-                color="#fecaca",
-                fontsize=7,
-                ha="left",
-                va="center",
-            )
-
-    if nodes:
-        x_margin = max(1.0, 0.15 * (max(xs) - min(xs) or 1.0))
-        y_margin = max(1.0, 0.15 * (max(ys) - min(ys) or 1.0))
-        ax.set_xlim(min(xs) - x_margin, max(xs) + x_margin)
-        ax.set_ylim(min(ys) - y_margin, max(ys) + y_margin)
-
-    ax.set_aspect("equal", adjustable="datalim")
-    ax.set_xlabel("X")
-    ax.set_ylabel("Y")
-    ax.set_title("Truss visualization", color="#e5e7eb", fontsize=10)
-    ax.grid(True, linestyle="--", alpha=0.35)
-    ax.set_facecolor("#020617")
-    fig.patch.set_facecolor("#020617")
-
-    for spine in ax.spines.values():
-        spine.set_color("#4b5563")
-
-    buf = io.BytesIO()
-    fig.tight_layout()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    plt.close(fig)
-    buf.seek(0)
-    image_bytes = buf.read()
-    image_b64 = base64.b64encode(image_bytes).decode("ascii")
-
-    return jsonify({"ok": True, "image_base64": image_b64})
+        data = {
+            "ok": True,
+            "node_ids": truss.node_ids.tolist(),
+            "coords": truss.coords.ravel().tolist(),
+            "restraints": truss.restraints.astype(int).ravel().tolist(),
+            "loads": truss.loads.ravel().tolist(),
+            "element_ids": truss.element_ids.tolist(),
+            "connectivity": truss.connectivity.ravel().tolist(),
+            "results": None,
+        }
+        if solution is not None:
+            data["results"] = {
+                "results_hash": solution.results_hash,
+                "displacements": solution.displacements.ravel().tolist(),
+                "forces": solution.forces.tolist(),
+            }
+        response = jsonify(data)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def _calculation_input():
+    """Snapshot the current model for a calculation; raises ValueError if it cannot be solved."""
+    model = current_model()
+    options = _solver_options(request.get_json(silent=True) or {})
+
+    # Edits may continue while the snapshot is being solved.
+    with model.read():
+        if not model.nodes or not model.elements:
+            raise ValueError("No truss data to calculate. Add nodes and elements first.")
+        is_valid, error_msg = check_boundary_conditions(model.nodes)
+        truss = TrussArrays(model.nodes, model.elements)
+
+    if not is_valid:
+        raise ValueError(error_msg)
+    return truss, options
 
 
 @info_bp.route("/api/truss/calculate", methods=["POST"])
 def api_truss_calculate():
     """Calculate truss, save results, and generate plot."""
-    if not nodes or not elements:
-        return jsonify({"ok": False, "errors": ["No truss data to calculate. Add nodes and elements first."]}), 400
+    try:
+        truss, options = _calculation_input()
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
 
     try:
-        is_valid, error_msg = check_boundary_conditions(nodes)
-        if not is_valid:
-            return jsonify({"ok": False, "errors": [error_msg]}), 400
-
-        dof = 2 * len(nodes)
-        F = np.zeros(dof)
-        for n in nodes:
-            idx = 2 * (n.node_id - 1)
-            F[idx] = n.loads.get("fx", 0.0)
-            F[idx + 1] = n.loads.get("fy", 0.0)
-
-        K = assemble_global_stiffness(nodes, elements)
-        K_bc, F_bc = apply_boundary_conditions(K, F, nodes)
-        d = solve_displacements(K_bc, F_bc)
-        forces = compute_forces(elements, d)
-        results = check_element_failure(elements, forces)
-
-        displacements_data = []
-        for i in range(0, len(d), 2):
-            node_id = i // 2 + 1
-            displacements_data.append({
-                "node_id": node_id,
-                "ux": float(d[i]),
-                "uy": float(d[i + 1]),
-            })
-
-        forces_data = {}
-        for eid, f_val in forces.items():
-            forces_data[int(eid)] = {
-                "force": float(f_val),
-                "status": "Tension" if f_val > 0 else "Compression"
-            }
+        summary = run_calculation(truss, options, project_dir())
+        return jsonify({
+            "ok": True,
+            "message": "Truss calculated and results saved.",
+            **summary,
+            "image_path": "/api/truss/image",
+        })
 
-        results_data = {}
-        for eid, r in results.items():
-            results_data[int(eid)] = {
-                "force": float(r["force"]),
-                "stress": float(r["stress"]),
-                "status": r["status"]
-            }
+    except ValueError as e:
+        # MechanismError, or an iterative solve that did not converge.
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "errors": [f"Calculation error: {str(e)}"]}), 500
 
-        elements_data = {}
-        for elem in elements:
-            elements_data[int(elem.element_id)] = {
-                "node_i": elem.node_i.node_id,
-                "node_j": elem.node_j.node_id,
-                "area": float(elem.area),
-                "material": elem.material.name,
-                "length": float(elem.length()),
-                "young_modulus": float(elem.material.E),
-            }
 
-        truss_results = {
-            "displacements": displacements_data,
-            "forces": forces_data,
-            "element_results": results_data,
-            "elements": elements_data,
+def _id_rows(ids, requested, kind, key):
+    """Map the IDs listed under ``key`` to their rows in ``ids``; raises ValueError otherwise."""
+    if not isinstance(requested, list):
+        raise ValueError(f"{key} must be a list of {kind} IDs.")
+    rows = {i: k for k, i in enumerate(ids.tolist())}
+    missing = [i for i in requested if i not in rows]
+    if missing:
+        raise ValueError(f"{key} refers to unknown {kind}(s): {', '.join(str(i) for i in missing)}.")
+    return np.array([rows[i] for i in requested], dtype=np.intp)
+
+
+@info_bp.route("/api/truss/sweep", methods=["POST"])
+def api_truss_sweep():
+    """Evaluate the model for every combination of swept parameter values.
+
+    The body lists "parameters", e.g. {"parameter": "area", "element_id": 3,
+    "start": 0.001, "stop": 0.01, "steps": 10} ("fx"/"fy"/"x"/"y" take a
+    "node_id"; "values" may replace the range). Optional "node_ids" and
+    "element_ids" limit the reported rows, and "sensitivities" lists up to
+    MAX_SENSITIVITY_ELEMENTS elements whose d(force)/d(area) is returned for
+    the reported elements.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        truss, _ = _calculation_input()
+        params = parse_sweep(data.get("parameters"), truss)
+        node_rows = _id_rows(truss.node_ids, data.get("node_ids", truss.node_ids.tolist()), "node", "node_ids")
+        element_rows = _id_rows(
+            truss.element_ids, data.get("element_ids", truss.element_ids.tolist()), "element", "element_ids",
+        )
+        responses = _id_rows(truss.element_ids, data.get("sensitivities", []), "element", "sensitivities")
+        if len(responses) > MAX_SENSITIVITY_ELEMENTS:
+            raise ValueError(f"At most {MAX_SENSITIVITY_ELEMENTS} elements can be listed in sensitivities.")
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+
+    try:
+        combos, displacements, forces, sensitivities, errors = run_sweep(
+            truss, params, responses, executor=job_manager,
+        )
+    except Exception as e:
+        return jsonify({"ok": False, "errors": [f"Calculation error: {str(e)}"]}), 500
+
+    response_ids = truss.element_ids[responses].tolist()
+    variants = []
+    for combo, d, f, sens, error in zip(combos, displacements, forces, sensitivities, errors):
+        if error is not None:
+            variants.append({"values": list(combo), "error": error})
+            continue
+        d = d.reshape(-1, 2)
+        variant = {
+            "values": list(combo),
+            "max_displacement": float(np.max(np.hypot(d[:, 0], d[:, 1]))),
+            "displacements": d[node_rows].tolist(),
+            "forces": f[element_rows].tolist(),
         }
-        
-        with open(RESULTS_FILE, "w") as f:
-            json.dump(truss_results, f, indent=2)
+        if sens is not None:
+            variant["sensitivities"] = dict(zip(response_ids, sens[:, element_rows].tolist()))
+        variants.append(variant)
 
-        plot_truss(nodes, elements, d, forces, scale=100, filepath=str(IMAGE_FILE))
+    return jsonify({
+        "ok": True,
+        "parameters": [p.to_dict() for p in params],
+        "node_ids": truss.node_ids[node_rows].tolist(),
+        "element_ids": truss.element_ids[element_rows].tolist(),
+        "variants": variants,
+    })
 
-        return jsonify({
-            "ok": True,
-            "message": "Truss calculated and results saved.",
-            "image_path": str(IMAGE_FILE.relative_to(Path(__file__).parent.parent)),
-        })
 
+def _sizing_options(data):
+    """Read the optional settings of a sizing request."""
+    try:
+        safety_factor = float(data.get("safety_factor", DEFAULT_SAFETY_FACTOR))
+        min_area = float(data.get("min_area", DEFAULT_MIN_AREA))
+        max_iterations = int(data.get("max_iterations", MAX_SIZING_ITERATIONS))
+    except (TypeError, ValueError):
+        raise ValueError("safety_factor and min_area must be numbers and max_iterations an integer.")
+    if not 1 <= max_iterations <= MAX_SIZING_ITERATIONS:
+        raise ValueError(f"max_iterations must be between 1 and {MAX_SIZING_ITERATIONS}.")
+    names = data.get("materials", list(materials))
+    if not isinstance(names, list) or not names:
+        raise ValueError("materials must be a non-empty list of material names.")
+    unknown = [str(name) for name in names if name not in materials]
+    if unknown:
+        raise ValueError(f"Unknown material(s): {', '.join(unknown)}.")
+    return {
+        "materials": [materials[name] for name in names],
+        "safety_factor": safety_factor,
+        "min_area": min_area,
+        "max_iterations": max_iterations,
+    }
+
+
+@info_bp.route("/api/truss/size", methods=["POST"])
+def api_truss_size():
+    """Find minimum-mass member areas and materials that keep every stress below Sy / safety_factor.
+
+    Optional body: "safety_factor", "min_area", "max_iterations", "materials"
+    (names to choose from; all by default) and "apply": true to write the
+    sized areas and materials into the model.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        truss, _ = _calculation_input()
+        options = _sizing_options(data)
+        result = size_members(truss, **options)
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
     except Exception as e:
         return jsonify({"ok": False, "errors": [f"Calculation error: {str(e)}"]}), 500
 
+    applied = False
+    if data.get("apply"):
+        model = current_model()
+        conflict = jsonify({"ok": False, "errors": ["The model changed while it was being sized. Run the sizing again."]}), 409
+        with model.write():
+            with model.transaction():
+                # The sizing ran on a snapshot; refuse to apply it to a model
+                # edited since (geometry, loads, materials or element IDs).
+                if TrussArrays(model.nodes, model.elements).content_key() != truss.content_key():
+                    return conflict
+                sized = result.truss
+                elements = [model.get_element(eid) for eid in sized.element_ids.tolist()]
+                if any(element is None for element in elements):
+                    return conflict
+                for element, area, name in zip(elements, sized.area.tolist(), sized.material_names):
+                    model.update_element(element, area=area, material=materials[name])
+            save_model(model)
+        applied = True
+
+    return jsonify({
+        "ok": True,
+        "converged": result.converged,
+        "iterations": result.iterations,
+        "safety_factor": options["safety_factor"],
+        "mass": {"initial": result.history[0], "final": result.mass},
+        "history": result.history,
+        "elements": sizing_report(result, options["safety_factor"]),
+        "applied": applied,
+    })
+
+
+@info_bp.route("/api/truss/jobs", methods=["POST"])
+def api_truss_submit_job():
+    """Queue a calculation on the worker pool and return its job ID immediately."""
+    try:
+        truss, options = _calculation_input()
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+
+    status = job_manager.submit(project_dir(), truss, options)
+    return jsonify({
+        "ok": True,
+        "job": status,
+        "status_url": f"/api/truss/jobs/{status['job_id']}",
+    }), 202
+
+
+@info_bp.route("/api/truss/jobs/<job_id>", methods=["GET"])
+def api_truss_job_status(job_id):
+    """Report a job's status (queued, running, done, failed, cancelled), stage and progress."""
+    status = job_manager.status(project_dir(), job_id)
+    if status is None:
+        return jsonify({"ok": False, "errors": ["Job not found."]}), 404
+    return jsonify({"ok": True, "job": status})
+
+
+@info_bp.route("/api/truss/jobs/<job_id>/cancel", methods=["POST"])
+def api_truss_cancel_job(job_id):
+    """Cancel a queued job, or ask a running one to stop at its next stage."""
+    status = job_manager.cancel(project_dir(), job_id)
+    if status is None:
+        return jsonify({"ok": False, "errors": ["Job not found."]}), 404
+    return jsonify({"ok": True, "job": status})
+
+
+@info_bp.route("/api/truss/jobs/<job_id>/result", methods=["GET"])
+def api_truss_job_result(job_id):
+    """Return the results a finished job computed (same options as /api/truss/results)."""
+    folder = project_dir()
+    status = job_manager.status(folder, job_id)
+    if status is None:
+        return jsonify({"ok": False, "errors": ["Job not found."]}), 404
+    if status["status"] != "done":
+        return jsonify({"ok": False, "errors": [f"Job is {status['status']}, no results yet."], "job": status}), 409
+    solution = read_solution(job_manager.result_path(folder, job_id))
+    if solution is None:
+        return jsonify({"ok": False, "errors": ["Job results are no longer available."]}), 404
+    return _results_response(solution, job=status, image_path="/api/truss/image")
+
+
+def _results_query():
+    """Parse ``fields``, ``offset``, ``limit`` and the wanted format of a results request."""
+    fields = tuple(f for f in request.args.get("fields", "").split(",") if f) or tuple(RESULT_SECTIONS)
+    unknown = [f for f in fields if f not in RESULT_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown result field(s): {', '.join(unknown)}. Use: {', '.join(RESULT_SECTIONS)}.")
+    try:
+        offset = int(request.args.get("offset", 0))
+        limit = request.args.get("limit")
+        limit = int(limit) if limit is not None else None
+        if offset < 0 or (limit is not None and not 0 < limit <= MAX_RESULTS_PAGE):
+            raise ValueError
+    except (TypeError, ValueError):
+        raise ValueError(f"offset must be >= 0 and limit between 1 and {MAX_RESULTS_PAGE}.")
+
+    fmt = request.args.get("format")
+    if fmt is None:
+        best = request.accept_mimetypes.best_match(["application/json", NPZ_MIMETYPE])
+        fmt = "npz" if best == NPZ_MIMETYPE else "json"
+    if fmt not in ("json", "npz"):
+        raise ValueError("format must be 'json' or 'npz'.")
+    return fields, offset, limit, fmt
+
+
+def _results_response(solution, **extra):
+    """Serve a page of ``solution`` as JSON or .npz, with ETag and gzip."""
+    try:
+        fields, offset, limit, fmt = _results_query()
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+
+    etag = f"{solution.results_hash}-{fmt}-{','.join(fields)}-{offset}-{limit}"
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    elif fmt == "npz":
+        response = make_response(solution.to_npz(fields, offset, limit))
+        response.mimetype = NPZ_MIMETYPE
+    else:
+        response = jsonify({
+            "ok": True,
+            **extra,
+            "results_hash": solution.results_hash,
+            "total_nodes": solution.n_nodes,
+            "total_elements": solution.n_elements,
+            "offset": offset,
+            "limit": limit,
+            "results": solution.to_results(fields, offset, limit),
+        })
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    response.vary.add("Accept")
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.status_code == 200
+        and "gzip" in request.accept_encodings
+        and response.content_length
+        and response.content_length >= GZIP_MIN_SIZE
+    ):
+        response.set_data(gzip.compress(response.get_data(), compresslevel=5))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
 
 @info_bp.route("/api/truss/results", methods=["GET"])
 def api_truss_results():
-    """Get saved truss calculation results."""
-    if not RESULTS_FILE.exists():
+    """Get the last calculation's results.
+
+    ``fields`` (comma-separated sections), ``offset`` and ``limit`` select
+    what to return; ``format=npz`` or ``Accept: application/x-npz`` returns
+    the selected columns as a NumPy archive instead of JSON.
+    """
+    solution = load_solution(project_dir())
+    if solution is None:
         return jsonify({"ok": False, "errors": ["No calculation results found."]}), 404
-    
-    try:
-        with open(RESULTS_FILE, "r") as f:
-            results = json.load(f)
-        return jsonify({"ok": True, "results": results})
-    except Exception as e:
-        return jsonify({"ok": False, "errors": [f"Error reading results: {str(e)}"]}), 500
+    return _results_response(solution)
 
 
 @info_bp.route("/api/truss/image", methods=["GET"])
 def api_truss_image():
-    """Serve the saved truss deformation image."""
-    if not IMAGE_FILE.exists():
+    """Render (or serve from cache) the deformation plot of the last calculation."""
+    try:
+        fmt = _image_format()
+    except ValueError as e:
+        return jsonify({"ok": False, "errors": [str(e)]}), 400
+    try:
+        scale = float(request.args.get("scale", DEFAULT_PLOT_SCALE))
+        dpi = int(request.args.get("dpi", DEFAULT_PLOT_DPI))
+        if not 0 < scale <= 1e6 or not MIN_PLOT_DPI <= dpi <= MAX_PLOT_DPI:
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "errors": [
+            f"scale must be a positive number and dpi an integer between {MIN_PLOT_DPI} and {MAX_PLOT_DPI}."
+        ]}), 400
+
+    solution = load_solution(project_dir())
+    if solution is None:
         return jsonify({"ok": False, "errors": ["No truss image found."]}), 404
-    
-    return send_from_directory(LOGIC_FOLDER, IMAGE_FILE.name)
+
+    etag = f"{solution.results_hash}-{scale:g}-{dpi}-{fmt}"
+    return _send_image(lambda: render_deformation(solution, scale=scale, dpi=dpi, fmt=fmt), etag, fmt)
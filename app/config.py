@@ -6,4 +6,29 @@ SECRET_KEY = getenv('SECRET_KEY')
 BASE_URL = getenv('BASE_URL')
 USERNAME = getenv('USERNAME')
 PASSWORD = getenv('PASSWORD')
-SK = getenv("SK")
\ No newline at end of file
+SK = getenv("SK")
+# Per-project model storage
+MODEL_STORE_DIR = getenv("MODEL_STORE_DIR")
+MODEL_STORE_SIZE = int(getenv("MODEL_STORE_SIZE", "64"))
+MODEL_STORE_PERSIST = getenv("MODEL_STORE_PERSIST", "0").lower() in ("1", "true", "yes")
+# Projects (model, results, jobs) unused for this many days are deleted; 0 keeps them
+PROJECT_MAX_AGE_DAYS = float(getenv("PROJECT_MAX_AGE_DAYS", "31"))
+# Worker processes for background calculation jobs
+CALC_WORKERS = int(getenv("CALC_WORKERS", "2"))
+# Approximate tokens of truss data sent to the chat model per question
+CHAT_CONTEXT_TOKENS = int(getenv("CHAT_CONTEXT_TOKENS", "4000"))
+# Chat model HTTP client: timeouts in seconds, retries of failed calls (with
+# exponential backoff) and how many calls may wait on the model at once
+CHAT_CONNECT_TIMEOUT = float(getenv("CHAT_CONNECT_TIMEOUT", "5"))
+CHAT_READ_TIMEOUT = float(getenv("CHAT_READ_TIMEOUT", "60"))
+CHAT_MAX_RETRIES = int(getenv("CHAT_MAX_RETRIES", "2"))
+CHAT_MAX_CONCURRENCY = int(getenv("CHAT_MAX_CONCURRENCY", "8"))
+# Seconds a chat request waits for a free slot before getting a 503
+CHAT_QUEUE_TIMEOUT = float(getenv("CHAT_QUEUE_TIMEOUT", "10"))
+# Answers of the chat model reused for repeated questions about the same results
+CHAT_CACHE_SIZE = int(getenv("CHAT_CACHE_SIZE", "256"))
+CHAT_CACHE_TTL = float(getenv("CHAT_CACHE_TTL", "86400"))
+# Earlier messages of the conversation that are part of the cache key
+CHAT_CACHE_HISTORY = int(getenv("CHAT_CACHE_HISTORY", "2"))
+# Also keep answers on disk, shared by all workers (unset: memory only)
+CHAT_CACHE_DIR = getenv("CHAT_CACHE_DIR")
@@ -1,29 +1,35 @@
-from .truss_data import nodes , elements
+from .truss_data import model_store
 from .truss_calculator import *
+from .models import TrussArrays
 
-dof = 2 * len(nodes)
-F = np.zeros(dof)
+model = model_store.get("local")
+nodes, elements = model.nodes, model.elements
 
-for n in nodes:
-    idx = 2 * (n.node_id - 1)
-    F[idx] = n.loads["fx"]
-    F[idx + 1] = n.loads["fy"]
+truss = TrussArrays(nodes, elements)
+F = truss.load_vector()
 
-K = assemble_global_stiffness(nodes, elements)
-K_bc, F_bc = apply_boundary_conditions(K, F, nodes)
-d = solve_displacements(K_bc, F_bc)
+K = assemble_global_stiffness(truss)
+K_ff, F_f = apply_boundary_conditions(K, F, truss)
+d = expand_displacements(truss, solve_displacements(K_ff, F_f, truss))
+reactions = compute_reactions(K, F, d, truss)
 
-forces = compute_forces(elements, d)
-results = check_element_failure(elements, forces)
+forces = compute_forces(truss, d)
+results = check_element_failure(truss, forces)
 
 # ================== WRITE RESULTS ==================
 with open("RESULT.txt", "w") as file:
 
     file.write("Displacements (m):\n")
-    for i in range(0, len(d), 2):
-        node_id = i // 2 + 1
+    for node_id, (ux, uy) in zip(truss.node_ids.tolist(), d.reshape(-1, 2)):
         file.write(
-            f"Node {node_id}: ux = {d[i]:.6e}, uy = {d[i + 1]:.6e}\n"
+            f"Node {node_id}: ux = {ux:.6e}, uy = {uy:.6e}\n"
+        )
+
+    file.write("\nSupport Reactions (N):\n")
+    for dof, r in zip(truss.restrained_dofs(), reactions):
+        node_id = truss.node_ids[dof // 2]
+        file.write(
+            f"Node {node_id}: {'rx' if dof % 2 == 0 else 'ry'} = {r:.2f}\n"
         )
 
     file.write("\nElement Axial Forces (N):\n")
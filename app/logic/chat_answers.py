@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+from app.config import CHAT_CACHE_SIZE, CHAT_CACHE_TTL, CHAT_CACHE_HISTORY, CHAT_CACHE_DIR
+from app.utils.cache import TTLCache
+from app.utils.text import ascii_digits
+
+# Answers kept on disk at most; the least recently used are removed first.
+DISK_CACHE_SIZE = 4096
+# The disk tier is pruned once per this many answers written by a process,
+# so it may briefly hold a few more than DISK_CACHE_SIZE files.
+PRUNE_EVERY = 64
+
+
+def normalize_message(text):
+    """Fold the differences that do not change a question: case, spacing,
+    Persian/Arabic digits and letter forms, and trailing punctuation."""
+    text = ascii_digits(unicodedata.normalize("NFKC", text)).casefold()
+    text = text.replace("ي", "ی").replace("ك", "ک")
+    return " ".join(text.split()).rstrip(" ?!.؟")
+
+
+def answer_key(results_hash, message, history):
+    """Cache key of a question about the results ``results_hash``.
+
+    Only the last CHAT_CACHE_HISTORY messages of ``history`` count, so the
+    same question asked later in a conversation still finds its answer.
+    """
+    recent = history[-CHAT_CACHE_HISTORY:] if CHAT_CACHE_HISTORY > 0 else []
+    payload = [
+        results_hash,
+        normalize_message(message),
+        [[m["role"], normalize_message(m["content"])] for m in recent],
+    ]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Chat model answers by ``answer_key``, expiring ``ttl`` seconds after they were given.
+
+    The memory tier is an LRU of ``maxsize`` answers per process. With a
+    ``directory``, answers are also written to ``<directory>/<key>.json`` so
+    every worker (and a restarted one) can reuse them; a file's mtime is
+    refreshed on each hit and, every PRUNE_EVERY writes, expired files and
+    the least recently used past ``disk_maxsize`` are removed. Disk errors
+    only make the cache miss.
+    """
+
+    def __init__(self, maxsize=CHAT_CACHE_SIZE, ttl=CHAT_CACHE_TTL, directory=None, disk_maxsize=DISK_CACHE_SIZE):
+        self.ttl = float(ttl)
+        self.directory = Path(directory) if directory else None
+        self.disk_maxsize = int(disk_maxsize)
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self._writes = 0
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached answer for ``key``, or None."""
+        answer = self._memory.get(key)
+        if answer is not None or self.directory is None:
+            return answer
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            remaining = entry["expires"] - time.time()
+            if remaining <= 0:
+                path.unlink(missing_ok=True)
+                return None
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._memory.set(key, entry["answer"], ttl=remaining)
+        with self._lock:
+            self.disk_hits += 1
+        return entry["answer"]
+
+    def set(self, key, answer):
+        self._memory.set(key, answer)
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expires": time.time() + self.ttl, "answer": answer}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % PRUNE_EVERY == 0
+            if prune:
+                self._prune()
+        except OSError:
+            pass
+
+    def _prune(self):
+        """Remove expired answer files and the least recently used past ``disk_maxsize``."""
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort(reverse=True)
+        cutoff = time.time() - self.ttl
+        for k, (mtime, path) in enumerate(files):
+            if k >= self.disk_maxsize or mtime < cutoff:
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self):
+        memory = self._memory.stats()
+        with self._lock:
+            disk_hits = self.disk_hits
+        return {
+            "hits": memory["hits"] + disk_hits,
+            "misses": memory["misses"] - disk_hits,
+            "memory": memory,
+            "disk": None if self.directory is None else {"hits": disk_hits, "maxsize": self.disk_maxsize},
+            "ttl": self.ttl,
+        }
+
+
+# Shared by the chat endpoints of this process.
+answer_cache = AnswerCache(directory=CHAT_CACHE_DIR)
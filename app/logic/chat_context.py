@@ -0,0 +1,256 @@
+import math
+import re
+from pathlib import Path
+import numpy as np
+
+from app.config import CHAT_CONTEXT_TOKENS
+from app.logic.models import STATUS_NAMES, STATUS_YIELDED, STATUS_FAILED
+from app.logic.results import load_solution
+from app.utils.cache import LRUCache
+from app.utils.text import ascii_digits
+
+# Rough number of characters per token for the mix of words and numbers sent
+# to the model. There is no tokenizer dependency, so budgets are estimates.
+CHARS_PER_TOKEN = 3.5
+# Rows in the "most stressed" / "largest displacement" lists.
+CRITICAL_COUNT = 10
+# IDs listed per failure status before the list is cut short.
+MAX_LISTED_IDS = 100
+# Nodes or elements a single question can pull into the prompt.
+MAX_REFERENCED = 50
+
+PROMPT_HEADER = (
+    "Truss calculation data (authoritative, use this to answer). Units: m, m², N, Pa; "
+    "forces are positive in tension. Sections marked as truncated do not list every row."
+)
+ELEMENT_COLUMNS = "id, node_i, node_j, area, material, length, force, stress, status"
+NODE_COLUMNS = "id, x, y, ux, uy, rx, ry"
+
+_ID_LIST = r"#?\s*(\d+(?:\s*(?:-|–|to|,|and|&|و)\s*#?\s*\d+)*)"
+_ELEMENT_REFERENCE = re.compile(r"\b(?:elements?|members?|bars?)\s*" + _ID_LIST + r"|(?:عضو|المان)\s*" + _ID_LIST, re.I)
+_NODE_REFERENCE = re.compile(r"\b(?:nodes?|joints?)\s*" + _ID_LIST + r"|(?:گره)\s*" + _ID_LIST, re.I)
+
+
+def estimate_tokens(text):
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def _referenced_ids(pattern, message):
+    """IDs named after an element or node word: "element 12", "members 3, 5 and 7", "nodes 1-4"."""
+    ids = []
+    for match in pattern.finditer(ascii_digits(message)):
+        text = next(group for group in match.groups() if group)
+        for part in re.split(r"\s*(?:,|and|&|و)\s*", text):
+            bounds = [int(n) for n in re.findall(r"\d+", part)]
+            if len(bounds) == 2 and bounds[0] <= bounds[1]:
+                ids.extend(range(bounds[0], min(bounds[1], bounds[0] + MAX_REFERENCED) + 1))
+            else:
+                ids.extend(bounds)
+    return list(dict.fromkeys(ids))[:MAX_REFERENCED]
+
+
+def _id_list(ids):
+    shown = ", ".join(str(i) for i in ids[:MAX_LISTED_IDS])
+    hidden = len(ids) - MAX_LISTED_IDS
+    return shown + (f" (truncated, {hidden} more)" if hidden > 0 else "")
+
+
+class ChatContext:
+    """What the chat assistant knows about one calculation, built on first use.
+
+    Questions answered without the language model never pay for the results
+    document, the summary text or the prompt. The prompt is assembled per
+    question to fit a token budget (see ``prompt``); the sections that do
+    not depend on the question are kept.
+    """
+
+    def __init__(self, solution):
+        self.solution = solution
+        self.results_hash = solution.results_hash
+        self._results = None
+        self._summary = None
+        self._sections = None
+
+    @property
+    def results(self):
+        if self._results is None:
+            self._results = self.solution.to_results()
+        return self._results
+
+    @property
+    def summary(self):
+        """Human-readable listing of the results."""
+        if self._summary is None:
+            self._summary = calculation_summary(self.results)
+        return self._summary
+
+    def _element_line(self, k):
+        s = self.solution
+        ni, nj = s.node_ids[s.connectivity[k]].tolist()
+        return (
+            f"{s.element_ids[k]}, {ni}, {nj}, {s.area[k]:.6g}, {s.materials[k]}, {s.lengths[k]:.6g}, "
+            f"{s.forces[k]:.6g}, {s.stresses[k]:.6g}, {STATUS_NAMES[s.status[k]]}"
+        )
+
+    def _node_line(self, k):
+        s = self.solution
+        (x, y), (ux, uy) = s.coords[k].tolist(), s.displacements[k].tolist()
+        rx, ry = ("-" if np.isnan(r) else f"{r:.6g}" for r in s.reactions[k].tolist())
+        return f"{s.node_ids[k]}, {x:.6g}, {y:.6g}, {ux:.6e}, {uy:.6e}, {rx}, {ry}"
+
+    def _overview(self):
+        s = self.solution
+        lines = [f"Nodes: {s.n_nodes}, elements: {s.n_elements}, supported nodes: {int(s.restraints.any(axis=1).sum())}"]
+        materials, counts = np.unique(s.materials, return_counts=True)
+        lines.append("Materials: " + ", ".join(f"{m} ({c} elements)" for m, c in zip(materials.tolist(), counts.tolist())))
+        if s.n_nodes:
+            magnitude = np.hypot(s.displacements[:, 0], s.displacements[:, 1])
+            k = int(np.argmax(magnitude))
+            ux, uy = s.displacements[k].tolist()
+            lines.append(f"Max displacement: {magnitude[k]:.6e} at node {s.node_ids[k]} (ux = {ux:.6e}, uy = {uy:.6e})")
+            rx, ry = np.nansum(s.reactions, axis=0).tolist()
+            lines.append(f"Sum of reactions: rx = {rx:.6g}, ry = {ry:.6g}")
+        if s.n_elements:
+            t, c, k = int(np.argmax(s.forces)), int(np.argmin(s.forces)), int(np.argmax(np.abs(s.stresses)))
+            lines.append(f"Max tension: {s.forces[t]:.6g} in element {s.element_ids[t]}")
+            lines.append(f"Max compression: {s.forces[c]:.6g} in element {s.element_ids[c]}")
+            lines.append(f"Max |stress|: {abs(s.stresses[k]):.6g} in element {s.element_ids[k]}")
+            counts = np.bincount(s.status, minlength=len(STATUS_NAMES))
+            lines.append("Status: " + ", ".join(f"{c} {name}" for name, c in zip(STATUS_NAMES, counts.tolist())))
+        return "Overview", lines
+
+    def _failures(self):
+        s = self.solution
+        lines = []
+        for code in (STATUS_FAILED, STATUS_YIELDED):
+            ids = s.element_ids[s.status == code].tolist()
+            lines.append(f"{STATUS_NAMES[code]} elements: {_id_list(ids) if ids else 'none'}")
+        return "Failure check (stress against yield Sy and ultimate Su)", lines
+
+    def _critical(self):
+        s = self.solution
+        sections = []
+        if s.n_elements:
+            order = np.argsort(-np.abs(s.stresses), kind="stable")[:CRITICAL_COUNT]
+            sections.append((f"Most stressed elements ({ELEMENT_COLUMNS})", [self._element_line(k) for k in order]))
+        if s.n_nodes:
+            magnitude = np.hypot(s.displacements[:, 0], s.displacements[:, 1])
+            order = np.argsort(-magnitude, kind="stable")[:CRITICAL_COUNT]
+            sections.append((f"Largest displacements ({NODE_COLUMNS})", [self._node_line(k) for k in order]))
+        return sections
+
+    def _static_sections(self):
+        """Sections that do not depend on the question, in order of importance."""
+        if self._sections is None:
+            self._sections = [self._overview(), self._failures(), *self._critical()]
+        return self._sections
+
+    def _referenced(self, message):
+        s = self.solution
+        sections = []
+        for pattern, ids, kind, columns, line in (
+            (_ELEMENT_REFERENCE, s.element_ids, "element", ELEMENT_COLUMNS, self._element_line),
+            (_NODE_REFERENCE, s.node_ids, "node", NODE_COLUMNS, self._node_line),
+        ):
+            wanted = _referenced_ids(pattern, message)
+            if not wanted:
+                continue
+            lines = []
+            for i in wanted:
+                match = np.flatnonzero(ids == i)
+                lines.append(line(match[0]) if match.size else f"{i}: no such {kind} in the model")
+            sections.append((f"{kind.capitalize()}s named in the question ({columns})", lines))
+        return sections
+
+    def _tables(self):
+        s = self.solution
+        supported = np.flatnonzero(s.restraints.any(axis=1))
+        return [
+            (f"Supports ({NODE_COLUMNS})", len(supported), (self._node_line(k) for k in supported)),
+            (f"All elements ({ELEMENT_COLUMNS})", s.n_elements, (self._element_line(k) for k in range(s.n_elements))),
+            (f"All nodes ({NODE_COLUMNS})", s.n_nodes, (self._node_line(k) for k in range(s.n_nodes))),
+        ]
+
+    def prompt(self, message="", budget=CHAT_CONTEXT_TOKENS):
+        """System message with as much of the results as fits in about ``budget`` tokens.
+
+        In order: overview, failure lists, the nodes and elements named in
+        ``message``, the most critical members and nodes, supports, then the
+        full element and node tables. A section that does not fit is cut
+        short and marked as truncated, and nothing after it is added.
+        """
+        remaining = int(budget * CHARS_PER_TOKEN) - len(PROMPT_HEADER)
+        parts = [PROMPT_HEADER]
+        sections = self._static_sections()
+        sections = sections[:2] + self._referenced(message) + sections[2:]
+        sections = [(title, len(lines), iter(lines)) for title, lines in sections] + self._tables()
+
+        for title, total, lines in sections:
+            heading = f"\n\n{title}:"
+            if remaining < len(heading) + 80:
+                break
+            parts.append(heading)
+            remaining -= len(heading)
+            shown = 0
+            for line in lines:
+                if len(line) + 1 > remaining - 40:
+                    break
+                parts.append("\n" + line)
+                remaining -= len(line) + 1
+                shown += 1
+            if shown < total:
+                parts.append(f"\n(truncated: {shown} of {total} rows shown)")
+                break
+        return "".join(parts)
+
+
+def calculation_summary(results):
+    calc_summary = ["Truss Calculation Results:\n"]
+
+    calc_summary.append("\nDisplacements:")
+    for disp in results.get("displacements", []):
+        calc_summary.append(
+            f"  Node {disp['node_id']}: ux = {disp['ux']:.6e} m, uy = {disp['uy']:.6e} m"
+        )
+
+    calc_summary.append("\nElement Properties:")
+    for eid, elem_data in results.get("elements", {}).items():
+        calc_summary.append(
+            f"  Element {eid}: Area = {elem_data['area']:.6e} m², "
+            f"Length = {elem_data['length']:.4f} m, Material = {elem_data['material']}, "
+            f"E = {elem_data['young_modulus']:.2e} Pa"
+        )
+
+    calc_summary.append("\nElement Forces:")
+    for eid, force_data in results.get("forces", {}).items():
+        calc_summary.append(
+            f"  Element {eid}: {force_data['force']:.2f} N ({force_data['status']})"
+        )
+
+    calc_summary.append("\nElement Stress Analysis:")
+    for eid, result in results.get("element_results", {}).items():
+        calc_summary.append(
+            f"  Element {eid}: Force = {result['force']:.2f} N, "
+            f"Stress = {result['stress']:.2e} Pa, Status = {result['status']}"
+        )
+
+    return "\n".join(calc_summary)
+
+
+# Project folder -> ChatContext of its latest results. An entry is replaced
+# as soon as a calculation stores results with a different hash.
+_contexts = LRUCache(maxsize=32)
+
+
+def chat_context(folder):
+    """Return the ``ChatContext`` of the latest results in ``folder``, or None."""
+    solution = load_solution(folder)
+    key = str(Path(folder))
+    if solution is None:
+        _contexts.pop(key)
+        return None
+    context = _contexts.get(key)
+    if context is None or context.results_hash != solution.results_hash:
+        context = ChatContext(solution)
+        _contexts.set(key, context)
+    return context
@@ -0,0 +1,238 @@
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+
+from app.logic.truss_calculator import (
+    factorize_system,
+    solve_system,
+    classify_stresses,
+)
+from app.logic.solvers import IterativeSolver, LowRankUpdate, MechanismError
+from app.logic.results import Solution, store_solution, SOLUTION_FILE_NAME
+
+JOBS_DIR_NAME = "jobs"
+
+# Stages reported while a calculation runs, in order. The deformation plot
+# is not rendered here but on request (see render_deformation).
+STAGES = ("assembly", "solve", "post-processing")
+FINAL_STATES = ("done", "failed", "cancelled")
+# Finished jobs kept per project; older status and result files are pruned.
+MAX_FINISHED_JOBS = 20
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+def solver_info(system):
+    if isinstance(system.factor, IterativeSolver):
+        return system.factor.info()
+    if isinstance(system.factor, LowRankUpdate):
+        return {"method": "direct", "low_rank_update": system.factor.rank}
+    return {"method": "direct"}
+
+
+def run_calculation(truss, options, folder, solution_path=None, report=None, cancelled=None):
+    """Solve ``truss`` and store its ``Solution`` in ``folder``.
+
+    ``report(stage)`` is called before each of ``STAGES``; if ``cancelled()``
+    is true once the solution is ready, ``JobCancelled`` is raised instead of
+    storing it. Returns the
+    solver summary; raises ``MechanismError`` for an unstable truss and
+    ValueError when the iterative solver does not converge, in which case
+    nothing is stored.
+    """
+    report = report or (lambda stage: None)
+    folder = Path(folder)
+    latest_path = folder / SOLUTION_FILE_NAME
+
+    report("assembly")
+    system, cached = factorize_system(truss, **options)
+
+    report("solve")
+    d, reactions = solve_system(system, truss)
+    if not np.isfinite(d).all():
+        # Never replace the last good results with a broken solve.
+        raise MechanismError([], "The solve produced non-finite displacements. The truss structure is not properly constrained.")
+
+    report("post-processing")
+    forces = truss.axial_forces(d)
+    stresses, status = classify_stresses(truss, forces)
+
+    solution = Solution.from_truss(truss, d, reactions, forces, stresses, status)
+    if cancelled is not None and cancelled():
+        raise JobCancelled()
+    if solution_path is not None:
+        store_solution(solution, solution_path)
+    store_solution(solution, latest_path)
+
+    return {
+        "factorization_cached": cached,
+        "solver": solver_info(system),
+        "results_hash": solution.results_hash,
+    }
+
+
+def _write_json(path, data):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _update_status(status_path, **fields):
+    """Merge ``fields`` into a job's status file; a final status is never changed.
+
+    Only the process running the job writes its status while it runs (the
+    web side just drops a ``.cancel`` marker), so there is one writer at a time.
+    """
+    status = _read_json(status_path) or {}
+    if status.get("status") in FINAL_STATES:
+        return status
+    status.update(fields, updated=time.time())
+    _write_json(status_path, status)
+    return status
+
+
+def _run_job(jobs_dir, job_id, truss, options, folder):
+    """Process-pool entry point: run one calculation, recording progress in files."""
+    jobs_dir = Path(jobs_dir)
+    status_path = jobs_dir / f"{job_id}.json"
+    cancel_path = jobs_dir / f"{job_id}.cancel"
+
+    def report(stage):
+        if cancel_path.exists():
+            raise JobCancelled()
+        _update_status(
+            status_path, status="running", stage=stage,
+            progress=STAGES.index(stage) / len(STAGES),
+        )
+
+    try:
+        summary = run_calculation(
+            truss, options, folder, solution_path=jobs_dir / f"{job_id}.npz", report=report,
+            cancelled=cancel_path.exists,
+        )
+    except JobCancelled:
+        _update_status(status_path, status="cancelled")
+        return
+    except ValueError as e:
+        _update_status(status_path, status="failed", error=str(e))
+        return
+    except Exception as e:
+        _update_status(status_path, status="failed", error=f"Calculation error: {str(e)}")
+        return
+    _update_status(status_path, status="done", stage=None, progress=1.0, result=summary)
+
+
+class JobManager:
+    """Runs calculations on a process pool and tracks them per project folder.
+
+    Job state lives in ``<project>/jobs/<job_id>.json`` so any web worker
+    can report it. Cancelling a queued job removes it from the pool; a
+    running job notices a ``.cancel`` marker at its next stage boundary and
+    before storing its results. The marker never rewrites the status file.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = {}
+
+    def _pool(self):
+        if self._executor is None:
+            # Spawned workers do not inherit the web server's threads and locks.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @staticmethod
+    def jobs_dir(folder):
+        path = Path(folder) / JOBS_DIR_NAME
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def submit(self, folder, truss, options):
+        jobs_dir = self.jobs_dir(folder)
+        self._prune(jobs_dir)
+        job_id = uuid.uuid4().hex
+        status_path = jobs_dir / f"{job_id}.json"
+        now = time.time()
+        status = {
+            "job_id": job_id, "status": "queued", "stage": None, "progress": 0.0,
+            "created": now, "updated": now,
+        }
+        _write_json(status_path, status)
+
+        future = self._pool().submit(_run_job, str(jobs_dir), job_id, truss, options, str(folder))
+        self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finished(job_id, status_path, f))
+        return status
+
+    def _finished(self, job_id, status_path, future):
+        self._futures.pop(job_id, None)
+        if future.cancelled():
+            _update_status(status_path, status="cancelled")
+        elif future.exception() is not None:
+            # The worker process died (e.g. out of memory) before recording an outcome.
+            _update_status(status_path, status="failed", error=f"Calculation error: {future.exception()}")
+
+    def map(self, fn, *iterables):
+        """Run ``fn`` over ``iterables`` on the worker pool and wait for all results.
+
+        For work the caller splits itself (e.g. a parameter sweep); it is not
+        tracked as a job.
+        """
+        return list(self._pool().map(fn, *iterables))
+
+    def status(self, folder, job_id):
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        jobs_dir = Path(folder) / JOBS_DIR_NAME
+        status = _read_json(jobs_dir / f"{job_id}.json")
+        if status is not None and status["status"] not in FINAL_STATES:
+            status["cancel_requested"] = (jobs_dir / f"{job_id}.cancel").exists()
+        return status
+
+    def cancel(self, folder, job_id):
+        status = self.status(folder, job_id)
+        if status is None or status["status"] in FINAL_STATES:
+            return status
+        jobs_dir = Path(folder) / JOBS_DIR_NAME
+        (jobs_dir / f"{job_id}.cancel").touch()
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            # Never started, so no worker writes this status.
+            _update_status(jobs_dir / f"{job_id}.json", status="cancelled")
+        return self.status(folder, job_id)
+
+    def result_path(self, folder, job_id):
+        return Path(folder) / JOBS_DIR_NAME / f"{job_id}.npz"
+
+    def _prune(self, jobs_dir):
+        finished = []
+        for path in jobs_dir.glob("*.json"):
+            status = _read_json(path)
+            if status and status.get("status") in FINAL_STATES:
+                finished.append((status.get("updated", 0), path.stem))
+        finished.sort(reverse=True)
+        for _, job_id in finished[MAX_FINISHED_JOBS:]:
+            for suffix in (".json", ".npz", ".cancel"):
+                (jobs_dir / f"{job_id}{suffix}").unlink(missing_ok=True)
@@ -0,0 +1,227 @@
+import codecs
+import csv
+import json
+from app.logic.models import Node, Element, CoordinateGrid, NODE_TOLERANCE, check_position
+
+FORMATS = ("text", "csv", "jsonl")
+CHUNK_SIZE = 1 << 16
+# Stop collecting after this many problems; the rest are only counted.
+MAX_IMPORT_ERRORS = 20
+
+# Column order shared by the text (TRUSS_INPUT.txt) and CSV formats.
+NODE_COLUMNS = ("id", "x", "y", "ux", "uy", "fx", "fy", "dx", "dy")
+ELEMENT_COLUMNS = ("id", "node_i", "node_j", "area", "material")
+NODE_REQUIRED = 7
+
+
+class ModelImportError(ValueError):
+    """The input could not be imported; ``errors`` lists the problems by line."""
+
+    def __init__(self, errors, total=None):
+        self.errors = list(errors)
+        self.total = len(self.errors) if total is None else total
+        super().__init__("; ".join(self.errors))
+
+    def messages(self):
+        hidden = self.total - len(self.errors)
+        return self.errors + ([f"... and {hidden} more error(s)."] if hidden > 0 else [])
+
+
+def iter_lines(stream, chunk_size=CHUNK_SIZE):
+    """Yield decoded lines from a binary stream, reading it in fixed-size chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _text_records(lines):
+    mode = None
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        if line.lower() in ("nodes", "elements"):
+            mode = line.lower()[:-1]
+            continue
+        if mode is None:
+            yield lineno, None, "data before a 'Nodes' or 'Elements' header"
+            continue
+        yield lineno, mode, line.split()
+
+
+def _csv_records(lines):
+    # Each row starts with its record type: node,ID,X,Y,... or element,ID,NI,...
+    for lineno, row in enumerate(csv.reader(lines), 1):
+        row = [cell.strip() for cell in row]
+        if not any(row) or row[0].startswith("#") or row[0].lower() == "type":
+            continue
+        kind = row[0].lower()
+        if kind not in ("node", "element"):
+            yield lineno, None, f"unknown record type '{row[0]}'"
+            continue
+        yield lineno, kind, row[1:]
+
+
+def _jsonl_records(lines):
+    # {"type": "node", "id": 1, "x": 0, ...} or {"type": "element", "id": 1, ...}
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield lineno, None, "invalid JSON"
+            continue
+        if not isinstance(record, dict) or record.get("type") not in ("node", "element"):
+            yield lineno, None, "expected an object with type 'node' or 'element'"
+            continue
+        yield lineno, record["type"], record
+
+
+_READERS = {"text": _text_records, "csv": _csv_records, "jsonl": _jsonl_records}
+
+
+def _fields(kind, values):
+    """Map a positional row or a JSON object onto named fields."""
+    if isinstance(values, dict):
+        return values
+    columns = NODE_COLUMNS if kind == "node" else ELEMENT_COLUMNS
+    required = NODE_REQUIRED if kind == "node" else len(ELEMENT_COLUMNS)
+    if len(values) < required or len(values) > len(columns):
+        expected = f"{required} to {len(columns)}" if required < len(columns) else str(required)
+        raise ValueError(f"expected {expected} columns, got {len(values)}")
+    return dict(zip(columns, values))
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return bool(int(value))
+    return bool(value)
+
+
+class ModelBuilder:
+    """Validate node and element records as they arrive and collect them.
+
+    Elements may refer to nodes earlier in the same input or, when merged
+    with ``attach``, to nodes already in the model. Nothing touches the model
+    until the whole input has been read without errors.
+    """
+
+    def __init__(self, materials, tolerance=NODE_TOLERANCE):
+        self.materials = materials
+        self.nodes = []
+        self.elements = []
+        self._nodes_by_id = {}
+        self._element_ids = set()
+        self._grid = CoordinateGrid(tolerance)
+        # (element, lineno, attribute, node_id) for nodes not in this input.
+        self._unresolved = []
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, lineno, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            if lineno is None:
+                self.errors.append(f"{message[0].upper()}{message[1:]}.")
+            else:
+                self.errors.append(f"Line {lineno}: {message}.")
+
+    def add(self, lineno, kind, values):
+        if kind is None:
+            self.error(lineno, values)
+            return
+        try:
+            fields = _fields(kind, values)
+            if kind == "node":
+                self._add_node(lineno, fields)
+            else:
+                self._add_element(lineno, fields)
+        except (KeyError, TypeError, ValueError) as e:
+            detail = f"missing field {e}" if isinstance(e, KeyError) else str(e) or "invalid value"
+            self.error(lineno, f"invalid {kind} ({detail})")
+
+    def _add_node(self, lineno, f):
+        nid = int(f["id"])
+        x, y = float(f["x"]), float(f["y"])
+        restraints = {"ux": _flag(f.get("ux", 0)), "uy": _flag(f.get("uy", 0))}
+        loads = {"fx": float(f.get("fx", 0.0)), "fy": float(f.get("fy", 0.0))}
+        settlements = {"ux": float(f.get("dx", 0.0)), "uy": float(f.get("dy", 0.0))}
+        check_position(x, y)
+        if nid in self._nodes_by_id:
+            return self.error(lineno, f"node {nid} is defined twice")
+        for axis, name in (("ux", "dx"), ("uy", "dy")):
+            if settlements[axis] and not restraints[axis]:
+                return self.error(lineno, f"settlement {name} on node {nid}, which is not restrained in {axis}")
+        other = self._grid.find(x, y)
+        if other is not None:
+            return self.error(lineno, f"node {nid} is at the same position as node {other.node_id}")
+        node = Node(nid, x, y, restraints, loads, settlements)
+        self.nodes.append(node)
+        self._nodes_by_id[nid] = node
+        self._grid.add(node)
+
+    def _add_element(self, lineno, f):
+        eid = int(f["id"])
+        ni, nj = int(f["node_i"]), int(f["node_j"])
+        area = float(f["area"])
+        material = self.materials.get(str(f["material"]))
+        if eid in self._element_ids:
+            return self.error(lineno, f"element {eid} is defined twice")
+        if ni == nj:
+            return self.error(lineno, f"element {eid} connects node {ni} to itself")
+        if not area > 0:
+            return self.error(lineno, f"element {eid} must have a positive area")
+        if material is None:
+            return self.error(lineno, f"element {eid} has unknown material '{f['material']}'")
+        element = Element(eid, self._nodes_by_id.get(ni), self._nodes_by_id.get(nj), area, material)
+        for attr, nid in (("node_i", ni), ("node_j", nj)):
+            if getattr(element, attr) is None:
+                self._unresolved.append((element, lineno, attr, nid))
+        self.elements.append(element)
+        self._element_ids.add(eid)
+
+    def read(self, lines, fmt="text"):
+        if fmt not in _READERS:
+            raise ValueError(f"Unknown import format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+        for lineno, kind, values in _READERS[fmt](lines):
+            self.add(lineno, kind, values)
+        return self
+
+    def attach(self, model=None):
+        """Resolve references against ``model`` and raise if anything is wrong.
+
+        With a model, the caller must hold its write lock; the imported IDs
+        and positions must then not clash with the nodes already there.
+        """
+        if model is not None:
+            for node in self.nodes:
+                if model.get_node(node.node_id) is not None:
+                    self.error(None, f"node {node.node_id} already exists in the model")
+                else:
+                    other = model.find_node(node.x, node.y)
+                    if other is not None:
+                        self.error(None, f"node {node.node_id} is at the same position as node {other.node_id}")
+            for element in self.elements:
+                if model.get_element(element.element_id) is not None:
+                    self.error(None, f"element {element.element_id} already exists in the model")
+        for element, lineno, attr, nid in self._unresolved:
+            node = model.get_node(nid) if model is not None else None
+            if node is None:
+                self.error(lineno, f"element {element.element_id} refers to unknown node {nid}")
+            else:
+                setattr(element, attr, node)
+        if self.error_count:
+            raise ModelImportError(self.errors, self.error_count)
+        return self.nodes, self.elements
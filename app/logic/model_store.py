@@ -0,0 +1,171 @@
+from pathlib import Path
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, see ModelStore
+    fcntl = None
+
+from .models import TrussModel
+from app.utils.cache import LRUCache
+
+_PROJECT_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# A project's folder mtime is refreshed at most this often (seconds) while it is used.
+TOUCH_INTERVAL = 60
+# Seconds between two sweeps for abandoned projects.
+PRUNE_INTERVAL = 3600
+
+
+class StaleModelError(Exception):
+    """Raised by ``ModelStore.save`` when another worker saved the project first."""
+
+
+def _version(path):
+    """Identify one write of ``path``; os.replace gives every save a new file."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino)
+
+
+class ModelStore:
+    """Truss models keyed by project ID, with LRU eviction and optional disk backing.
+
+    Every project also gets a working directory for its results and images.
+    When ``persist`` is enabled, models are written through to
+    ``<directory>/<project_id>/model.pkl`` on every ``save``. ``get``
+    reloads a model whenever that file changed since the copy held in
+    memory was read, so an evicted model is restored and several worker
+    processes can serve the same project. ``save`` holds a file lock on the
+    project and raises ``StaleModelError`` instead of writing when another
+    process saved the project after this copy was read; the stale copy is
+    dropped, so a retried request starts from the saved model. (Without
+    ``fcntl`` the check still runs, but two saves can race.)
+
+    Sessions live in the browser, so the store cannot tell when one ends.
+    With ``max_age`` (seconds), projects whose folder has not been used for
+    that long are deleted; the check runs at most once per PRUNE_INTERVAL.
+    """
+
+    def __init__(self, directory, maxsize=64, persist=False, max_age=None):
+        self.directory = Path(directory)
+        self.persist = bool(persist)
+        self.max_age = max_age
+        self._models = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._touched = {}
+        # Model object -> version of model.pkl it was read from or saved as.
+        self._versions = weakref.WeakKeyDictionary()
+        self._last_prune = 0.0
+
+    def project_dir(self, project_id):
+        path = self._project_path(project_id)
+        with self._lock:
+            due = self._prune_due()
+        if due:
+            self.prune()
+        return path
+
+    def _project_path(self, project_id):
+        """Create and touch the folder of ``project_id``; never prunes, so it is safe under the lock."""
+        if not _PROJECT_ID.match(str(project_id)):
+            raise ValueError(f"Invalid project id: {project_id!r}")
+        path = self.directory / str(project_id)
+        path.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        if now - self._touched.get(project_id, 0.0) > TOUCH_INTERVAL:
+            os.utime(path)
+            self._touched[project_id] = now
+        return path
+
+    def _prune_due(self):
+        """Claim the next prune if one is due; call with the lock held and prune after releasing it."""
+        now = time.time()
+        if self.max_age is None or now - self._last_prune <= PRUNE_INTERVAL:
+            return False
+        self._last_prune = now
+        return True
+
+    def _model_file(self, project_id):
+        return self._project_path(project_id) / "model.pkl"
+
+    def get(self, project_id):
+        """Return the model of ``project_id``, creating an empty one on first use."""
+        with self._lock:
+            entry = self._models.get(project_id)
+            if self.persist:
+                path = self._model_file(project_id)
+                version = _version(path)
+                if version is not None and (entry is None or entry[1] != version):
+                    with open(path, "rb") as f:
+                        entry = (pickle.load(f), version)
+                    self._models.set(project_id, entry)
+                    self._versions[entry[0]] = version
+            if entry is None:
+                entry = (TrussModel(project_id), None)
+                self._models.set(project_id, entry)
+            due = self._prune_due()
+        if due:
+            self.prune()
+        return entry[0]
+
+    def save(self, model):
+        """Write ``model`` through to disk when persistence is enabled.
+
+        Raises ``StaleModelError`` if the saved model changed since ``model``
+        was read (another worker saved it first).
+        """
+        if not self.persist:
+            return
+        with self._lock:
+            path = self._model_file(model.project_id)
+            with open(path.with_name("model.lock"), "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                if self._versions.get(model) != _version(path):
+                    entry = self._models.get(model.project_id)
+                    if entry is not None and entry[0] is model:
+                        self._models.pop(model.project_id)
+                    raise StaleModelError(
+                        "The model was changed by another request in the meantime. Reload it and try again."
+                    )
+                tmp = path.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
+                    pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+                version = _version(path)
+                self._versions[model] = version
+                self._models.set(model.project_id, (model, version))
+            due = self._prune_due()
+        if due:
+            self.prune()
+
+    def discard(self, project_id):
+        """Forget a project: its in-memory model, saved model, results and images."""
+        with self._lock:
+            self._models.pop(project_id)
+            if _PROJECT_ID.match(str(project_id)):
+                shutil.rmtree(self.directory / str(project_id), ignore_errors=True)
+
+    def prune(self, max_age=None):
+        """Discard every project whose folder was last used more than ``max_age`` seconds ago."""
+        max_age = self.max_age if max_age is None else max_age
+        cutoff = time.time() - max_age
+        removed = []
+        for path in self.directory.iterdir() if self.directory.is_dir() else ():
+            try:
+                stale = path.is_dir() and _PROJECT_ID.match(path.name) and path.stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if stale:
+                self.discard(path.name)
+                self._touched.pop(path.name, None)
+                removed.append(path.name)
+        return removed
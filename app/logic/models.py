@@ -1,19 +1,83 @@
+import hashlib
+import math
+import re
+from contextlib import contextmanager
 import numpy as np
+from app.utils.locks import RWLock
+
+# Density (kg/m³) of materials defined without one: structural steel.
+DEFAULT_DENSITY = 7850.0
+
+# Member status codes from the stress check; STATUS_NAMES[code] is the label.
+STATUS_SAFE, STATUS_YIELDED, STATUS_FAILED = 0, 1, 2
+STATUS_NAMES = ("SAFE", "YIELDED", "FAILED")
 
 class Material:
-    def __init__(self, name, young_modulus, Sy, Su):
+    def __init__(self, name, young_modulus, Sy, Su, density=DEFAULT_DENSITY):
         self.name = name
         self.E = float(young_modulus)
         self.Sy = float(Sy)
         self.Su = float(Su)
+        self.density = float(density)
 
 class Node:
-    def __init__(self, node_id, x, y, restraints=None, loads=None):
+    def __init__(self, node_id, x, y, restraints=None, loads=None, settlements=None):
         self.node_id = int(node_id)
         self.x = float(x)
         self.y = float(y)
         self.restraints = restraints or {"ux": False, "uy": False}
         self.loads = loads or {"fx": 0.0, "fy": 0.0}
+        # Prescribed displacements of restrained DOFs (support settlements).
+        self.settlements = settlements or {"ux": 0.0, "uy": 0.0}
+
+class LoadCase:
+    """A named set of nodal loads, e.g. dead load "D" or live load "L"."""
+
+    def __init__(self, name, loads=None):
+        self.name = str(name)
+        # node_id -> {"fx": ..., "fy": ...}
+        self.loads = loads or {}
+
+    def add_load(self, node_id, fx=0.0, fy=0.0):
+        load = self.loads.setdefault(int(node_id), {"fx": 0.0, "fy": 0.0})
+        load["fx"] += float(fx)
+        load["fy"] += float(fy)
+
+# One term of a load combination: sign, factor and case name. A factor
+# written with an exponent must be followed by "*", since "1e3L" could also
+# be 1 x case "e3L" and "1.0E+1L" is 1.0 E + 1 L.
+_DECIMAL = r"(?:\d+\.?\d*|\.\d+)"
+_COMBINATION_TERM = re.compile(
+    rf"([+-]?)(?:({_DECIMAL}(?:[eE][+-]?\d+)?)\*|({_DECIMAL})?)([A-Za-z_]\w*)"
+)
+
+class LoadCombination:
+    """A factored sum of load cases, e.g. 1.2D+1.6L -> {"D": 1.2, "L": 1.6}."""
+
+    def __init__(self, name, factors):
+        self.name = str(name)
+        self.factors = {str(case): float(f) for case, f in factors.items()}
+
+    @classmethod
+    def from_expression(cls, expression, name=None):
+        """Parse an expression such as "1.2D+1.6L", "0.9D - 1.0W" or "1e3*L"."""
+        text = expression.replace(" ", "")
+        terms = list(_COMBINATION_TERM.finditer(text))
+        malformed = any(not term.group(1) for term in terms[1:])
+        if not terms or malformed or "".join(term.group(0) for term in terms) != text:
+            raise ValueError(f"Cannot parse load combination '{expression}'.")
+        factors = {}
+        for term in terms:
+            sign, scaled, number, case = term.groups()
+            if number and re.match(r"[eE]\d", case):
+                raise ValueError(
+                    f"Load combination '{expression}' is ambiguous at '{number}{case}'. Write "
+                    f"'{number}*{case}' for load case '{case}', or end an exponent factor with '*' (e.g. '1e3*L')."
+                )
+            value = scaled or number
+            factor = float(value) if value else 1.0
+            factors[case] = factors.get(case, 0.0) + (-factor if sign == "-" else factor)
+        return cls(name or expression, factors)
 
 class Element:
     def __init__(self, element_id, node_i, node_j, area, material):
@@ -23,32 +87,507 @@ class Element:
         self.area = float(area)
         self.material = material
 
-    def length(self):
-        dx = self.node_j.x - self.node_i.x
-        dy = self.node_j.y - self.node_i.y
-        return (dx*dx + dy*dy)**0.5
+
+# Two nodes closer than this (in model units) are treated as the same point.
+NODE_TOLERANCE = 1e-6
+
+
+def check_position(x, y):
+    """Raise ValueError unless (x, y) are finite coordinates."""
+    if not (math.isfinite(x) and math.isfinite(y)):
+        raise ValueError("Node coordinates x and y must be finite numbers.")
+
+
+class CoordinateGrid:
+    """Uniform-grid spatial hash of node positions for tolerance-based lookups.
+
+    The cell size equals the tolerance, so any point within the tolerance of
+    (x, y) lies in the 3x3 block of cells around it and a lookup is O(1).
+    """
+
+    def __init__(self, tolerance=NODE_TOLERANCE):
+        self.tolerance = float(tolerance)
+        self._cells = {}
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.tolerance), math.floor(y / self.tolerance))
+
+    def add(self, node):
+        self._cells.setdefault(self._cell(node.x, node.y), []).append(node)
+
+    def remove(self, node):
+        key = self._cell(node.x, node.y)
+        bucket = self._cells.get(key, [])
+        if node in bucket:
+            bucket.remove(node)
+        if not bucket:
+            self._cells.pop(key, None)
+
+    def find(self, x, y):
+        """Return a node within the tolerance of (x, y), or None."""
+        cx, cy = self._cell(x, y)
+        tol2 = self.tolerance * self.tolerance
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for node in self._cells.get((i, j), ()):
+                    if (node.x - x) ** 2 + (node.y - y) ** 2 <= tol2:
+                        return node
+        return None
+
+    def clear(self):
+        self._cells.clear()
+
+
+class TrussModel:
+    """One project's editable truss: nodes, elements and load cases.
+
+    Reads go through ``read()`` and edits through ``write()``; the mutating
+    methods below expect the caller to hold the write lock, so several edits
+    can be applied atomically. IDs come from monotonic counters, so two
+    concurrent adds can never receive the same ID. Lookups by ID and by
+    position go through indexes kept in step with the lists, so building a
+    model edit by edit stays linear in its size. Inside ``transaction()``
+    every per-item edit records its inverse so the block can be rolled back.
+    """
+
+    def __init__(self, project_id, tolerance=NODE_TOLERANCE):
+        self.project_id = str(project_id)
+        self.tolerance = float(tolerance)
+        self.nodes = []
+        self.elements = []
+        # name -> LoadCase / LoadCombination
+        self.load_cases = {}
+        self.load_combinations = {}
+        self._next_node_id = 1
+        self._next_element_id = 1
+        self._lock = RWLock()
+        self._undo = None
+        self._build_indexes()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ("_lock", "_undo", "_nodes_by_id", "_elements_by_id", "_node_elements", "_grid"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault("tolerance", NODE_TOLERANCE)
+        self._lock = RWLock()
+        self._undo = None
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self._nodes_by_id = {n.node_id: n for n in self.nodes}
+        self._elements_by_id = {e.element_id: e for e in self.elements}
+        # node_id -> IDs of the elements connected to it
+        self._node_elements = {n.node_id: set() for n in self.nodes}
+        for e in self.elements:
+            self._connect(e)
+        self._grid = CoordinateGrid(self.tolerance)
+        for n in self.nodes:
+            self._grid.add(n)
+
+    def _connect(self, element):
+        for node in (element.node_i, element.node_j):
+            self._node_elements.setdefault(node.node_id, set()).add(element.element_id)
+
+    def _disconnect(self, element):
+        for node in (element.node_i, element.node_j):
+            self._node_elements.get(node.node_id, set()).discard(element.element_id)
+
+    def read(self):
+        return self._lock.read()
+
+    def write(self):
+        return self._lock.write()
+
+    def snapshot(self):
+        """Return a consistent ``TrussArrays`` copy that later edits cannot touch."""
+        with self.read():
+            return TrussArrays(self.nodes, self.elements)
+
+    @contextmanager
+    def transaction(self):
+        """Apply the edits made in the block all or none (caller holds the write lock)."""
+        self._undo = []
+        try:
+            yield self
+        except BaseException:
+            for undo in reversed(self._undo):
+                undo()
+            raise
+        finally:
+            self._undo = None
+
+    def _record(self, undo):
+        if self._undo is not None:
+            self._undo.append(undo)
+
+    def allocate_node_id(self):
+        node_id = self._next_node_id
+        self._next_node_id += 1
+        return node_id
+
+    def allocate_element_id(self):
+        element_id = self._next_element_id
+        self._next_element_id += 1
+        return element_id
+
+    def _check_position(self, x, y, node=None):
+        check_position(x, y)
+        existing = self.find_node(x, y)
+        if existing is not None and existing is not node:
+            raise ValueError(f"Node already exists (node {existing.node_id} is at the same position).")
+
+    def add_node(self, x, y, restraints=None, loads=None, settlements=None):
+        self._check_position(x, y)
+        next_id = self._next_node_id
+        node = Node(self.allocate_node_id(), x, y, restraints, loads, settlements)
+        self.nodes.append(node)
+        self._nodes_by_id[node.node_id] = node
+        self._node_elements[node.node_id] = set()
+        self._grid.add(node)
+
+        def undo():
+            self.nodes.pop()
+            del self._nodes_by_id[node.node_id]
+            del self._node_elements[node.node_id]
+            self._grid.remove(node)
+            self._next_node_id = next_id
+
+        self._record(undo)
+        return node
+
+    def get_node(self, node_id):
+        return self._nodes_by_id.get(node_id)
+
+    def find_node(self, x, y):
+        """Return the node within ``tolerance`` of (x, y), or None."""
+        return self._grid.find(float(x), float(y))
+
+    def update_node(self, node, x=None, y=None, restraints=None, loads=None, settlements=None):
+        """Move a node or replace its restraints, loads or settlements."""
+        x = node.x if x is None else float(x)
+        y = node.y if y is None else float(y)
+        self._check_position(x, y, node)
+        before = (node.x, node.y, dict(node.restraints), dict(node.loads), dict(node.settlements))
+        self._grid.remove(node)
+        node.x, node.y = x, y
+        self._grid.add(node)
+        if restraints is not None:
+            node.restraints = dict(restraints)
+        if loads is not None:
+            node.loads = dict(loads)
+        if settlements is not None:
+            node.settlements = dict(settlements)
+
+        def undo():
+            self._grid.remove(node)
+            node.x, node.y, node.restraints, node.loads, node.settlements = before
+            self._grid.add(node)
+
+        self._record(undo)
+        return node
+
+    def add_load(self, node, fx=0.0, fy=0.0):
+        """Add fx, fy to the node's base load."""
+        loads = {
+            "fx": float(node.loads.get("fx", 0.0)) + float(fx),
+            "fy": float(node.loads.get("fy", 0.0)) + float(fy),
+        }
+        return self.update_node(node, loads=loads)
+
+    def remove_node(self, node):
+        """Delete a node that no element or load case refers to."""
+        connected = self._node_elements.get(node.node_id)
+        if connected:
+            ids = ", ".join(str(eid) for eid in sorted(connected))
+            raise ValueError(f"Node {node.node_id} is used by element(s) {ids}; delete them first.")
+        cases = [name for name, case in self.load_cases.items() if node.node_id in case.loads]
+        if cases:
+            raise ValueError(f"Node {node.node_id} carries loads in load case(s) {', '.join(cases)}.")
+        position = self.nodes.index(node)
+        del self.nodes[position]
+        del self._nodes_by_id[node.node_id]
+        self._node_elements.pop(node.node_id, None)
+        self._grid.remove(node)
+
+        def undo():
+            self.nodes.insert(position, node)
+            self._nodes_by_id[node.node_id] = node
+            self._node_elements[node.node_id] = set()
+            self._grid.add(node)
+
+        self._record(undo)
+
+    def get_element(self, element_id):
+        return self._elements_by_id.get(element_id)
+
+    def add_element(self, node_i, node_j, area, material):
+        next_id = self._next_element_id
+        element = Element(self.allocate_element_id(), node_i, node_j, area, material)
+        self.elements.append(element)
+        self._elements_by_id[element.element_id] = element
+        self._connect(element)
+
+        def undo():
+            self.elements.pop()
+            del self._elements_by_id[element.element_id]
+            self._disconnect(element)
+            self._next_element_id = next_id
+
+        self._record(undo)
+        return element
+
+    def update_element(self, element, node_i=None, node_j=None, area=None, material=None):
+        """Reconnect an element or change its section or material."""
+        before = (element.node_i, element.node_j, element.area, element.material)
+        node_i = node_i or element.node_i
+        node_j = node_j or element.node_j
+        if node_i is node_j:
+            raise ValueError("node_i and node_j must be different nodes.")
+        self._disconnect(element)
+        element.node_i, element.node_j = node_i, node_j
+        if area is not None:
+            element.area = float(area)
+        if material is not None:
+            element.material = material
+        self._connect(element)
+
+        def undo():
+            self._disconnect(element)
+            element.node_i, element.node_j, element.area, element.material = before
+            self._connect(element)
+
+        self._record(undo)
+        return element
+
+    def remove_element(self, element):
+        position = self.elements.index(element)
+        del self.elements[position]
+        del self._elements_by_id[element.element_id]
+        self._disconnect(element)
+
+        def undo():
+            self.elements.insert(position, element)
+            self._elements_by_id[element.element_id] = element
+            self._connect(element)
+
+        self._record(undo)
+
+    def extend(self, nodes, elements):
+        """Append already-numbered nodes and elements (e.g. from an input file)."""
+        self.nodes.extend(nodes)
+        self.elements.extend(elements)
+        for n in nodes:
+            self._nodes_by_id[n.node_id] = n
+            self._node_elements.setdefault(n.node_id, set())
+            self._grid.add(n)
+        for e in elements:
+            self._elements_by_id[e.element_id] = e
+            self._connect(e)
+        self._next_node_id = max([self._next_node_id] + [n.node_id + 1 for n in nodes])
+        self._next_element_id = max([self._next_element_id] + [e.element_id + 1 for e in elements])
+
+    def clear(self):
+        self.nodes.clear()
+        self.elements.clear()
+        self.load_cases.clear()
+        self.load_combinations.clear()
+        self._next_node_id = 1
+        self._next_element_id = 1
+        self._nodes_by_id.clear()
+        self._elements_by_id.clear()
+        self._node_elements.clear()
+        self._grid.clear()
+
+
+class TrussArrays:
+    """Array-backed (structure-of-arrays) view of a list of nodes and elements.
+
+    Node positions in ``node_ids`` define the DOF numbering: node ``k`` owns
+    DOFs ``2k`` (x) and ``2k + 1`` (y). Element geometry is computed once, in
+    a single vectorized pass, the first time it is needed.
+    """
+
+    def __init__(self, nodes, elements):
+        self.node_ids = np.array([n.node_id for n in nodes], dtype=np.int64)
+        self.coords = np.array([(n.x, n.y) for n in nodes], dtype=float).reshape(-1, 2)
+        self.restraints = np.array(
+            [(bool(n.restraints.get("ux", False)), bool(n.restraints.get("uy", False))) for n in nodes],
+            dtype=bool,
+        ).reshape(-1, 2)
+        self.loads = np.array(
+            [(float(n.loads.get("fx", 0.0)), float(n.loads.get("fy", 0.0))) for n in nodes],
+            dtype=float,
+        ).reshape(-1, 2)
+        self.settlements = np.array(
+            [(float(n.settlements.get("ux", 0.0)), float(n.settlements.get("uy", 0.0))) for n in nodes],
+            dtype=float,
+        ).reshape(-1, 2)
+
+        index = {nid: k for k, nid in enumerate(self.node_ids.tolist())}
+        self.element_ids = np.array([e.element_id for e in elements], dtype=np.int64)
+        self.connectivity = np.array(
+            [(index[e.node_i.node_id], index[e.node_j.node_id]) for e in elements],
+            dtype=np.intp,
+        ).reshape(-1, 2)
+        self.area = np.array([e.area for e in elements], dtype=float)
+        self.E = np.array([e.material.E for e in elements], dtype=float)
+        self.Sy = np.array([e.material.Sy for e in elements], dtype=float)
+        self.Su = np.array([e.material.Su for e in elements], dtype=float)
+        # Materials saved before densities were recorded count as steel.
+        self.density = np.array([getattr(e.material, "density", DEFAULT_DENSITY) for e in elements], dtype=float)
+        self.material_names = [e.material.name for e in elements]
+
+        self._lengths = None
+        self._cosines = None
+
+    def copy(self):
+        """Return a copy whose coordinates, loads and element properties can be changed freely."""
+        other = object.__new__(TrussArrays)
+        other.__dict__.update(self.__dict__)
+        for name in ("coords", "loads", "settlements", "area", "E", "Sy", "Su", "density"):
+            setattr(other, name, getattr(self, name).copy())
+        other.material_names = list(self.material_names)
+        other._lengths = None
+        other._cosines = None
+        return other
+
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def n_elements(self):
+        return len(self.element_ids)
+
+    @property
+    def n_dof(self):
+        return 2 * self.n_nodes
+
+    def stiffness_key(self):
+        """Fingerprint of everything that enters the constrained stiffness matrix.
+
+        Loads and settlements only change the right-hand side and are left out,
+        so two models with the same key can share one factorization.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (self.coords, self.restraints, self.connectivity, self.area, self.E):
+            h.update(np.ascontiguousarray(arr).tobytes())
+            h.update(str(arr.shape).encode())
+        return h.hexdigest()
+
+    def topology_key(self):
+        """Fingerprint of geometry, connectivity and restraints, without areas and materials.
+
+        Models with the same key differ only in their element stiffnesses E*A/L.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (self.coords, self.restraints, self.connectivity):
+            h.update(np.ascontiguousarray(arr).tobytes())
+            h.update(str(arr.shape).encode())
+        return h.hexdigest()
+
+    def dof_key(self):
+        """Fingerprint of the DOF layout (node IDs and restraints) only."""
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (self.node_ids, self.restraints):
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+    def content_key(self):
+        """Fingerprint of the whole model: IDs, geometry, supports, loads, settlements, areas and materials."""
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (self.node_ids, self.element_ids, self.coords, self.restraints, self.loads,
+                    self.settlements, self.connectivity, self.area, self.E, self.Sy, self.Su, self.density):
+            h.update(np.ascontiguousarray(arr).tobytes())
+            h.update(str(arr.shape).encode())
+        h.update("\0".join(self.material_names).encode())
+        return h.hexdigest()
+
+    def _compute_geometry(self):
+        delta = self.coords[self.connectivity[:, 1]] - self.coords[self.connectivity[:, 0]]
+        L = np.hypot(delta[:, 0], delta[:, 1])
+        zero = np.flatnonzero(L == 0)
+        if zero.size:
+            raise ValueError(f"Element {self.element_ids[zero[0]]} has zero length")
+        self._lengths = L
+        self._cosines = delta / L[:, None]
+
+    def lengths(self):
+        if self._lengths is None:
+            self._compute_geometry()
+        return self._lengths
 
     def direction_cosines(self):
-        L = self.length()
-        if L == 0:
-            raise ValueError(f"Element {self.element_id} has zero length")
-        cx = (self.node_j.x - self.node_i.x) / L
-        cy = (self.node_j.y - self.node_i.y) / L
-        return cx, cy
-
-    def local_stiffness(self):
-        """Return the 4x4 local stiffness matrix (as a NumPy array) for a 2D truss element."""
-        E = float(self.material.E)
-        A = float(self.area)
-        L = self.length()
-        cx, cy = self.direction_cosines()
-
-        stiffness_local = np.array([
-            [ cx*cx, cx*cy, -cx*cx, -cx*cy ],
-            [ cx*cy, cy*cy, -cx*cy, -cy*cy ],
-            [ -cx*cx, -cx*cy, cx*cx, cx*cy ],
-            [ -cx*cy, -cy*cy, cx*cy, cy*cy ]
-        ], dtype=float)
-
-        return (E * A / L) * stiffness_local
+        """Return the (m, 2) array of (cx, cy) for every element."""
+        if self._cosines is None:
+            self._compute_geometry()
+        return self._cosines
+
+    def dof_indices(self):
+        """Return the (m, 4) global DOF indices [ix, iy, jx, jy] of every element."""
+        i = 2 * self.connectivity[:, 0]
+        j = 2 * self.connectivity[:, 1]
+        return np.stack([i, i + 1, j, j + 1], axis=1)
+
+    def strain_vectors(self):
+        """Return the (m, 4) vectors [-cx, -cy, cx, cy] mapping element DOFs to elongation."""
+        c = self.direction_cosines()
+        return np.concatenate([-c, c], axis=1)
+
+    def axial_stiffness(self):
+        """Return E*A/L for every element."""
+        return self.E * self.area / self.lengths()
+
+    def stiffness_blocks(self):
+        """Return the (m, 4, 4) global element stiffness matrices."""
+        b = self.strain_vectors()
+        return self.axial_stiffness()[:, None, None] * b[:, :, None] * b[:, None, :]
+
+    def load_vector(self):
+        return self.loads.ravel().copy()
+
+    def load_matrix(self, load_cases):
+        """Return the (n_dof, k) matrix whose columns are the load vectors of ``load_cases``."""
+        index = {nid: k for k, nid in enumerate(self.node_ids.tolist())}
+        F = np.zeros((self.n_dof, len(load_cases)))
+        for col, case in enumerate(load_cases):
+            for node_id, load in case.loads.items():
+                if node_id not in index:
+                    raise ValueError(f"Load case '{case.name}' references unknown node {node_id}.")
+                k = index[node_id]
+                F[2 * k, col] += float(load.get("fx", 0.0))
+                F[2 * k + 1, col] += float(load.get("fy", 0.0))
+        return F
+
+    def restrained_dofs(self):
+        return np.flatnonzero(self.restraints.ravel())
+
+    def free_dofs(self):
+        return np.flatnonzero(~self.restraints.ravel())
+
+    def prescribed_displacements(self):
+        """Return the settlement of every restrained DOF, ordered like ``restrained_dofs()``."""
+        return self.settlements.ravel()[self.restrained_dofs()]
+
+    def elongations(self, displacements):
+        """Return the elongation of every element for a DOF vector or an (n_dof, k) matrix."""
+        d = np.asarray(displacements, dtype=float)
+        u = d[self.dof_indices()]
+        if d.ndim == 1:
+            return np.einsum("ij,ij->i", self.strain_vectors(), u)
+        return np.einsum("ij,ijk->ik", self.strain_vectors(), u)
+
+    def axial_forces(self, displacements):
+        """Return the axial force of every element (positive = tension).
 
+        ``displacements`` may be a DOF vector or an (n_dof, k) matrix holding
+        one displacement field per column; the result is then (m, k).
+        """
+        elongation = self.elongations(displacements)
+        if elongation.ndim == 1:
+            return self.axial_stiffness() * elongation
+        return self.axial_stiffness()[:, None] * elongation
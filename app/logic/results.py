@@ -0,0 +1,260 @@
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+from app.logic.models import STATUS_NAMES
+from app.utils.cache import LRUCache
+
+SOLUTION_FILE_NAME = "truss_solution.npz"
+
+# Sections of the results document, and whether their rows are nodes or elements.
+RESULT_SECTIONS = {
+    "displacements": "nodes",
+    "reactions": "nodes",
+    "forces": "elements",
+    "element_results": "elements",
+    "elements": "elements",
+}
+# Columns shipped for each section in the binary (.npz) form.
+SECTION_COLUMNS = {
+    "displacements": ("node_ids", "displacements"),
+    "reactions": ("node_ids", "restraints", "reactions"),
+    "forces": ("element_ids", "forces"),
+    "element_results": ("element_ids", "forces", "stresses", "status"),
+    "elements": ("element_ids", "end_nodes", "area", "materials", "lengths", "E"),
+}
+
+
+class Solution:
+    """Geometry and results of one calculation, stored column-wise as ``.npz``.
+
+    One array per quantity (node rows or element rows) keeps the file a
+    fraction of the size of the equivalent JSON and lets a reader slice
+    rows and pick columns without parsing everything. ``results_hash``
+    identifies the content; ``model_key`` is the ``content_key`` of the
+    model that was solved (empty for files written before it was stored).
+    """
+
+    FIELDS = (
+        "node_ids", "coords", "restraints", "displacements", "reactions",
+        "element_ids", "connectivity", "area", "E", "lengths", "materials",
+        "forces", "stresses", "status",
+    )
+
+    def __init__(self, node_ids, coords, restraints, displacements, reactions,
+                 element_ids, connectivity, area, E, lengths, materials,
+                 forces, stresses, status, model_key=""):
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.restraints = np.asarray(restraints, dtype=bool).reshape(-1, 2)
+        self.displacements = np.asarray(displacements, dtype=float).reshape(-1, 2)
+        # NaN where the DOF is free.
+        self.reactions = np.asarray(reactions, dtype=float).reshape(-1, 2)
+        self.element_ids = np.asarray(element_ids, dtype=np.int64)
+        self.connectivity = np.asarray(connectivity, dtype=np.intp).reshape(-1, 2)
+        self.area = np.asarray(area, dtype=float)
+        self.E = np.asarray(E, dtype=float)
+        self.lengths = np.asarray(lengths, dtype=float)
+        self.materials = np.asarray(materials, dtype=str)
+        self.forces = np.asarray(forces, dtype=float)
+        self.stresses = np.asarray(stresses, dtype=float)
+        # Status codes (see STATUS_NAMES); files written with the labels are converted.
+        status = np.asarray(status)
+        if status.dtype.kind in "US":
+            status = np.array([STATUS_NAMES.index(name) for name in status.tolist()])
+        self.status = status.astype(np.uint8)
+        self.model_key = str(model_key)
+
+        h = hashlib.blake2b(digest_size=16)
+        for name in self.FIELDS:
+            h.update(np.ascontiguousarray(getattr(self, name)).tobytes())
+        self.results_hash = h.hexdigest()
+
+    @classmethod
+    def from_truss(cls, truss, d, reactions, forces, stresses, status):
+        """Collect the outputs of one solve (see ``run_calculation``)."""
+        reaction_values = np.full(truss.n_dof, np.nan)
+        reaction_values[truss.restrained_dofs()] = reactions
+        return cls(
+            node_ids=truss.node_ids,
+            coords=truss.coords,
+            restraints=truss.restraints,
+            displacements=d,
+            reactions=reaction_values,
+            element_ids=truss.element_ids,
+            connectivity=truss.connectivity,
+            area=truss.area,
+            E=truss.E,
+            lengths=truss.lengths(),
+            materials=truss.material_names,
+            forces=forces,
+            stresses=stresses,
+            status=status,
+            model_key=truss.content_key(),
+        )
+
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def n_elements(self):
+        return len(self.element_ids)
+
+    @property
+    def end_nodes(self):
+        return self.node_ids[self.connectivity]
+
+    def save(self, path):
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, model_key=np.array(self.model_key), **{name: getattr(self, name) for name in self.FIELDS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            model_key = str(data["model_key"]) if "model_key" in data.files else ""
+            return cls(model_key=model_key, **{name: data[name] for name in cls.FIELDS})
+
+    def _rows(self, section, offset, limit):
+        total = self.n_nodes if RESULT_SECTIONS[section] == "nodes" else self.n_elements
+        stop = total if limit is None else min(total, offset + limit)
+        return slice(min(offset, total), stop)
+
+    def to_results(self, fields=None, offset=0, limit=None):
+        """Build the results document (the former ``truss_results.json``).
+
+        ``fields`` picks sections (all by default); ``offset``/``limit``
+        select a window of node rows for node sections and of element rows
+        for element sections.
+        """
+        fields = fields or tuple(RESULT_SECTIONS)
+        results = {}
+        if "displacements" in fields:
+            rows = self._rows("displacements", offset, limit)
+            results["displacements"] = displacement_rows(self.node_ids[rows], self.displacements[rows])
+        if "reactions" in fields:
+            rows = self._rows("reactions", offset, limit)
+            results["reactions"] = reaction_rows(self.node_ids[rows], self.restraints[rows], self.reactions[rows])
+
+        rows = self._rows("forces", offset, limit)
+        element_ids = self.element_ids[rows].tolist()
+        if "forces" in fields:
+            results["forces"] = force_rows(element_ids, self.forces[rows])
+        if "element_results" in fields:
+            results["element_results"] = element_result_rows(
+                element_ids, self.forces[rows], self.stresses[rows], self.status[rows]
+            )
+        if "elements" in fields:
+            results["elements"] = {
+                eid: {
+                    "node_i": ni,
+                    "node_j": nj,
+                    "area": area,
+                    "material": material,
+                    "length": length,
+                    "young_modulus": E,
+                }
+                for eid, (ni, nj), area, material, length, E in zip(
+                    element_ids, self.end_nodes[rows].tolist(), self.area[rows].tolist(),
+                    self.materials[rows].tolist(), self.lengths[rows].tolist(), self.E[rows].tolist(),
+                )
+            }
+        return results
+
+    def to_npz(self, fields=None, offset=0, limit=None):
+        """Return the selected sections' columns and rows as ``.npz`` bytes."""
+        fields = fields or tuple(RESULT_SECTIONS)
+        arrays = {}
+        for section in fields:
+            rows = self._rows(section, offset, limit)
+            for column in SECTION_COLUMNS[section]:
+                arrays[column] = getattr(self, column)[rows]
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+
+# Solutions kept in memory, keyed by (path, mtime): results and image requests
+# after a calculation are served without touching the disk.
+_solutions = LRUCache(maxsize=16)
+
+
+def _cache_key(path):
+    return (str(path), Path(path).stat().st_mtime_ns)
+
+
+def store_solution(solution, path):
+    """Persist ``solution`` and keep it in memory for the readers that follow."""
+    solution.save(path)
+    _solutions.set(_cache_key(path), solution)
+
+
+def read_solution(path):
+    """Return the ``Solution`` stored at ``path``, or None."""
+    try:
+        key = _cache_key(path)
+    except OSError:
+        return None
+    solution = _solutions.get(key)
+    if solution is None:
+        solution = Solution.load(path)
+        _solutions.set(key, solution)
+    return solution
+
+
+def load_solution(folder):
+    """Return the latest ``Solution`` saved in ``folder``, or None."""
+    return read_solution(Path(folder) / SOLUTION_FILE_NAME)
+
+
+def displacement_rows(node_ids, displacements):
+    """API rows for node IDs and their (n, 2) displacements."""
+    return [
+        {"node_id": node_id, "ux": ux, "uy": uy}
+        for node_id, (ux, uy) in zip(np.asarray(node_ids).tolist(), np.asarray(displacements).tolist())
+    ]
+
+
+def reaction_rows(node_ids, restraints, reactions):
+    """API rows for the supported nodes among ``node_ids`` (reactions are NaN where free)."""
+    return [
+        {"node_id": node_id, "rx": rx if restrained[0] else None, "ry": ry if restrained[1] else None}
+        for node_id, restrained, (rx, ry) in zip(
+            np.asarray(node_ids).tolist(), np.asarray(restraints).tolist(), np.asarray(reactions).tolist()
+        )
+        if any(restrained)
+    ]
+
+
+def force_rows(element_ids, forces):
+    return {
+        eid: {"force": f_val, "status": "Tension" if f_val > 0 else "Compression"}
+        for eid, f_val in zip(np.asarray(element_ids).tolist(), np.asarray(forces).tolist())
+    }
+
+
+def element_result_rows(element_ids, forces, stresses, status):
+    """API rows of the stress check; ``status`` holds codes and is mapped to labels."""
+    names = np.array(STATUS_NAMES)[np.asarray(status, dtype=np.intp)].tolist()
+    return {
+        eid: {"force": f_val, "stress": stress, "status": name}
+        for eid, f_val, stress, name in zip(
+            np.asarray(element_ids).tolist(), np.asarray(forces).tolist(), np.asarray(stresses).tolist(), names
+        )
+    }
+
+
+def displacements_data(truss, d):
+    return displacement_rows(truss.node_ids, d.reshape(-1, 2))
+
+
+def reactions_data(truss, reactions):
+    reaction_values = np.full(truss.n_dof, np.nan)
+    reaction_values[truss.restrained_dofs()] = reactions
+    return reaction_rows(truss.node_ids, truss.restraints, reaction_values.reshape(-1, 2))
@@ -0,0 +1,115 @@
+import numpy as np
+
+from app.logic.models import DEFAULT_DENSITY
+from app.logic.truss_calculator import SystemCache, factorize_system, solve_system, classify_stresses
+from app.logic.results import element_result_rows
+
+DEFAULT_SAFETY_FACTOR = 1.5
+# Smallest area handed out, so members carrying (almost) no force keep some stiffness.
+DEFAULT_MIN_AREA = 1e-5
+MAX_SIZING_ITERATIONS = 100
+# A member is resized only when its area is too small or more than twice this
+# fraction too large for its force; the design has converged when none is.
+SIZING_TOLERANCE = 1e-3
+
+
+class SizingResult:
+    """Outcome of ``size_members``: the sized model and how the iteration went."""
+
+    def __init__(self, truss, forces, iterations, converged, history):
+        self.truss = truss
+        self.forces = forces
+        self.iterations = iterations
+        self.converged = converged
+        # Total mass after each iteration, starting with the initial design.
+        self.history = history
+
+    @property
+    def mass(self):
+        return self.history[-1]
+
+    def utilization(self, safety_factor):
+        """|stress| as a fraction of the allowable stress Sy / safety_factor."""
+        return np.abs(self.forces / self.truss.area) * safety_factor / self.truss.Sy
+
+
+def member_mass(truss):
+    return truss.density * truss.area * truss.lengths()
+
+
+def size_members(truss, materials, safety_factor=DEFAULT_SAFETY_FACTOR, min_area=DEFAULT_MIN_AREA,
+                 max_iterations=MAX_SIZING_ITERATIONS, tol=SIZING_TOLERANCE):
+    """Find minimum-mass areas and materials for which every member stays below Sy / safety_factor.
+
+    Fully stressed design: each iteration solves the current design, then
+    gives every member the area its force needs in each candidate material
+    and keeps the lightest one. Only members outside a ``tol`` band around
+    that area (or whose material changes) are updated, so as the design settles
+    each solve is a low-rank update of the previous factorization rather
+    than a new one; the iterations use their own ``SystemCache`` so they do
+    not evict the shared one. ``truss`` is not modified.
+    """
+    if safety_factor < 1:
+        raise ValueError("safety_factor must be at least 1.")
+    if not min_area > 0:
+        raise ValueError("min_area must be positive.")
+    candidates = list(materials)
+    if not candidates:
+        raise ValueError("No materials to choose from.")
+
+    design = truss.copy()
+    names = np.array([m.name for m in candidates])
+    Sy = np.array([m.Sy for m in candidates])
+    density = np.array([getattr(m, "density", DEFAULT_DENSITY) for m in candidates])
+    lengths = design.lengths()
+    rows = np.arange(design.n_elements)
+    history = [float(member_mass(design).sum())]
+    converged = False
+    cache = SystemCache()
+
+    for iteration in range(1, max_iterations + 1):
+        system, _ = factorize_system(design, cache=cache)
+        d, _ = solve_system(system, design)
+        forces = design.axial_forces(d)
+
+        # (m, materials): area each material needs, and the resulting mass.
+        required = np.maximum(min_area, np.abs(forces)[:, None] * safety_factor / Sy[None, :])
+        best = np.argmin(density[None, :] * required * lengths[:, None], axis=1)
+        required = required[rows, best]
+
+        # Keep members whose area lies in [required, required * (1 + 2 tol)];
+        # resized ones get the middle of that band.
+        changed = (
+            (np.array(design.material_names) != names[best])
+            | (design.area < required)
+            | (design.area > required * (1 + 2 * tol))
+        )
+        area = required * (1 + tol)
+        if not changed.any():
+            converged = True
+            break
+        for k in np.flatnonzero(changed).tolist():
+            material = candidates[best[k]]
+            design.area[k] = area[k]
+            design.E[k], design.Sy[k], design.Su[k] = material.E, material.Sy, material.Su
+            design.density[k] = density[best[k]]
+            design.material_names[k] = material.name
+        history.append(float(member_mass(design).sum()))
+    else:
+        system, _ = factorize_system(design, cache=cache)
+        d, _ = solve_system(system, design)
+        forces = design.axial_forces(d)
+
+    return SizingResult(design, forces, iteration, converged, history)
+
+
+def sizing_report(result, safety_factor):
+    """Per-element summary of a sizing run, with the stress check status."""
+    truss = result.truss
+    stresses, status = classify_stresses(truss, result.forces)
+    report = element_result_rows(truss.element_ids, result.forces, stresses, status)
+    for row, area, material, utilization in zip(
+        report.values(), truss.area.tolist(), truss.material_names, result.utilization(safety_factor).tolist()
+    ):
+        row.update(area=area, material=material, utilization=utilization)
+    return report
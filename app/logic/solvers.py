@@ -0,0 +1,253 @@
+import numpy as np
+import scipy.linalg as la
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+# Defaults for the iterative (conjugate gradient) solver.
+CG_TOLERANCE = 1e-8
+CG_MAX_ITERATIONS = 10000
+PRECONDITIONERS = ("jacobi", "ilu", "none")
+
+# A pivot smaller than this fraction of its own diagonal stiffness means the
+# DOF has (numerically) nothing holding it in place, i.e. a mechanism.
+PIVOT_RATIO_TOL = 1e-10
+
+
+class MechanismError(ValueError):
+    """The stiffness matrix is singular; ``dofs`` lists the unrestrained DOFs."""
+
+    def __init__(self, dofs, message=None):
+        self.dofs = [int(d) for d in dofs]
+        if message is None:
+            message = (
+                f"Stiffness matrix is singular: {len(self.dofs)} degree(s) of freedom "
+                f"({', '.join(str(d) for d in self.dofs)}) are not restrained. "
+                "The truss structure is not properly constrained."
+            )
+        super().__init__(message)
+
+
+class StiffnessFactorization:
+    """One-time factorization of a constrained stiffness matrix.
+
+    Dense matrices are factorized with Cholesky (K is SPD once constrained).
+    SciPy has no sparse Cholesky, so sparse matrices use SuperLU restricted to
+    diagonal pivots, which gives the same pivots as an LDLᵀ factorization.
+    Either way the pivots are checked against the matrix diagonal, so a
+    mechanism is detected from the factorization itself and ``solve`` can be
+    called repeatedly, with one or many right-hand sides.
+    """
+
+    def __init__(self, K):
+        self.n = K.shape[0]
+        self.sparse = sp.issparse(K)
+        if self.sparse:
+            self._factor_sparse(K.tocsc())
+        else:
+            self._factor_dense(np.asarray(K, dtype=float))
+
+    def _factor_dense(self, K):
+        diag = np.diag(K).copy()
+        c, info = la.lapack.dpotrf(K, lower=False, clean=True)
+        if info < 0:
+            raise ValueError(f"Invalid argument {-info} passed to the Cholesky factorization.")
+        if info > 0:
+            # The factorization broke down: refactor a slightly shifted copy
+            # only to find out which pivots vanish.
+            shift = _diagnostic_shift(diag)
+            c, _ = la.lapack.dpotrf(K + shift * np.eye(self.n), lower=False, clean=True)
+            raise MechanismError(_weak_pivots(np.diag(c) ** 2, diag, shift))
+
+        weak = _weak_pivots(np.diag(c) ** 2, diag)
+        if weak.size:
+            raise MechanismError(weak)
+        self._cho = (c, False)
+
+    def _factor_sparse(self, K):
+        diag = K.diagonal()
+        try:
+            lu = _splu_symmetric(K)
+            shift = 0.0
+        except RuntimeError:
+            shift = _diagnostic_shift(diag)
+            lu = _splu_symmetric((K + shift * sp.identity(self.n, format="csc")).tocsc())
+
+        # perm_c[dof] is the elimination step at which ``dof`` was pivoted.
+        pivots = lu.U.diagonal()[lu.perm_c]
+        weak = _weak_pivots(pivots, diag, shift)
+        if weak.size:
+            raise MechanismError(weak)
+        if shift:
+            raise ValueError("Stiffness matrix is singular. The truss structure is not properly constrained.")
+        self._lu = lu
+
+    def solve(self, F):
+        """Solve K u = F for a vector or an (n, k) matrix of right-hand sides."""
+        if self.sparse:
+            return self._lu.solve(np.asarray(F, dtype=float))
+        return la.cho_solve(self._cho, F)
+
+
+class LowRankUpdate:
+    """Solver for ``K0 + U diag(c) Uᵀ`` that reuses a factorization of ``K0``.
+
+    Uses the Sherman–Morrison–Woodbury identity: each solve is one solve
+    against ``base`` plus an r x r system, where r is the number of columns
+    of ``U``. ``condition`` is the condition number of that small system;
+    a large value means the update has drifted too far from the base and
+    the matrix should be refactorized instead. ``Z = base.solve(U)`` may be
+    passed in when the caller already has it.
+    """
+
+    def __init__(self, base, U, c, Z=None):
+        self.base = base
+        self.n = base.n
+        self.sparse = base.sparse
+        self.U = np.asarray(U, dtype=float)
+        self.c = np.asarray(c, dtype=float)
+        self.rank = self.U.shape[1]
+        self.Z = base.solve(self.U) if Z is None else Z
+        S = np.eye(self.rank) + self.c[:, None] * (self.U.T @ self.Z)
+        self.condition = float(np.linalg.cond(S))
+        self._lu = la.lu_factor(S)
+
+    def solve(self, F):
+        """Solve the updated system for a vector or an (n, k) matrix of right-hand sides."""
+        y = self.base.solve(F)
+        Uy = self.U.T @ y
+        w = la.lu_solve(self._lu, self.c[:, None] * Uy if Uy.ndim == 2 else self.c * Uy)
+        return y - self.Z @ w
+
+
+class IterativeSolver:
+    """Preconditioned conjugate gradient solver for a constrained stiffness matrix.
+
+    Nothing is factorized: memory stays at the size of the sparse matrix plus
+    the preconditioner. ``preconditioner`` is "jacobi" (diagonal scaling),
+    "ilu" (SuperLU incomplete factorization with symmetric ordering and
+    diagonal pivots, standing in for incomplete Cholesky) or "none".
+    After every ``solve`` the iteration count, relative residual and
+    convergence flag of the last right-hand side are kept on the instance;
+    a solve that does not converge raises instead of returning its iterate.
+    """
+
+    def __init__(self, K, preconditioner="jacobi", tol=CG_TOLERANCE, maxiter=CG_MAX_ITERATIONS):
+        if preconditioner not in PRECONDITIONERS:
+            raise ValueError(f"Unknown preconditioner '{preconditioner}'. Use one of: {', '.join(PRECONDITIONERS)}.")
+        self.K = sp.csr_matrix(K)
+        self.n = self.K.shape[0]
+        self.preconditioner = preconditioner
+        self.tol = float(tol)
+        self.maxiter = int(maxiter)
+        self.iterations = 0
+        self.residual = 0.0
+        self.converged = True
+
+        diag = self.K.diagonal()
+        unsupported = np.flatnonzero(diag <= 0)
+        if unsupported.size:
+            raise MechanismError(unsupported)
+
+        if preconditioner == "jacobi":
+            inv_diag = 1.0 / diag
+            self._M = spla.LinearOperator((self.n, self.n), matvec=lambda r: inv_diag * r.ravel())
+        elif preconditioner == "ilu":
+            ilu = spla.spilu(
+                self.K.tocsc(),
+                drop_tol=1e-5,
+                fill_factor=10,
+                permc_spec="MMD_AT_PLUS_A",
+                diag_pivot_thresh=0.0,
+                options={"SymmetricMode": True},
+            )
+            self._M = spla.LinearOperator((self.n, self.n), matvec=ilu.solve)
+        else:
+            self._M = None
+
+    def solve(self, F, x0=None):
+        """Solve K u = F; ``x0`` warm-starts the iteration (e.g. the previous displacements)."""
+        F = np.asarray(F, dtype=float)
+        if F.ndim == 2:
+            columns = [self.solve(F[:, k], None if x0 is None else x0[:, k]) for k in range(F.shape[1])]
+            return np.column_stack(columns) if columns else np.zeros(F.shape)
+
+        norm_F = np.linalg.norm(F)
+        if norm_F == 0.0:
+            self.iterations, self.residual, self.converged = 0, 0.0, True
+            return np.zeros(self.n)
+
+        count = [0]
+
+        def _count(_):
+            count[0] += 1
+
+        # A singular K ends in NaNs, which are reported below instead of warned about.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u, info = spla.cg(
+                self.K, F, x0=x0, rtol=self.tol, atol=0.0,
+                maxiter=self.maxiter, M=self._M, callback=_count,
+            )
+        self.iterations = count[0]
+        self.residual = float(np.linalg.norm(F - self.K @ u) / norm_F)
+        self.converged = bool(info == 0 and np.isfinite(u).all())
+        if not np.isfinite(u).all():
+            raise MechanismError([], (
+                "The iterative solver produced non-finite displacements: the stiffness matrix is "
+                "singular. The truss structure is not properly constrained."
+            ))
+        if not self.converged:
+            raise ValueError(
+                f"The iterative solver did not converge in {self.iterations} iterations "
+                f"(relative residual {self.residual:.3g}, tolerance {self.tol:g}). "
+                "Increase maxiter or use the direct solver."
+            )
+        return u
+
+    def info(self):
+        return {
+            "method": "cg",
+            "preconditioner": self.preconditioner,
+            "iterations": self.iterations,
+            "residual": self.residual,
+            "converged": self.converged,
+        }
+
+
+def _splu_symmetric(K):
+    return spla.splu(
+        K,
+        permc_spec="MMD_AT_PLUS_A",
+        diag_pivot_thresh=0.0,
+        options={"SymmetricMode": True},
+    )
+
+
+def _diagnostic_shift(diag):
+    scale = np.max(np.abs(diag)) if diag.size else 1.0
+    return PIVOT_RATIO_TOL * 1e-3 * (scale or 1.0)
+
+
+def _weak_pivots(pivots, diag, shift=0.0):
+    """Return the DOFs whose pivot collapsed relative to their diagonal stiffness."""
+    return np.flatnonzero(pivots <= PIVOT_RATIO_TOL * np.abs(diag) + 10.0 * shift)
+
+
+class FactorizedSystem:
+    """Assembled stiffness of one truss with its reduced free-DOF factorization.
+
+    ``K`` is the full matrix (used for reactions), ``K_fs`` couples the free
+    DOFs to the restrained ones (used for settlements) and ``factor`` solves
+    the free-DOF system for any load vector. ``axial`` holds the element
+    stiffnesses E*A/L the system was built from, when it may serve as the
+    base of later low-rank updates, and ``update_columns`` the base solves
+    of the element columns used by the latest such update.
+    """
+
+    def __init__(self, K, K_fs, factor, free, fixed, axial=None):
+        self.K = K
+        self.K_fs = K_fs
+        self.factor = factor
+        self.free = free
+        self.fixed = fixed
+        self.axial = axial
+        self.update_columns = {}
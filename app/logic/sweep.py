@@ -0,0 +1,192 @@
+import itertools
+import os
+import numpy as np
+
+from app.logic.truss_calculator import SystemCache, factorize_system, solve_system, force_sensitivities
+
+# kind -> (what it belongs to, column of the node/load array it sets)
+SWEEP_PARAMETERS = {
+    "area": ("element", None),
+    "x": ("node", 0),
+    "y": ("node", 1),
+    "fx": ("node", 0),
+    "fy": ("node", 1),
+}
+# Parameters that change the stiffness matrix; the others only change loads.
+STIFFNESS_PARAMETERS = ("area", "x", "y")
+MAX_SWEEP_PARAMETERS = 4
+MAX_SWEEP_VARIANTS = 2000
+MAX_SENSITIVITY_ELEMENTS = 20
+# Below this much work (DOFs times distinct stiffness matrices) the sweep
+# runs in the calling process; shipping it to the pool would cost more.
+PARALLEL_MIN_WORK = 200000
+
+
+class SweepParameter:
+    """One swept quantity: ``kind`` of the node or element ``target`` taking ``values``."""
+
+    def __init__(self, kind, target, values):
+        if kind not in SWEEP_PARAMETERS:
+            raise ValueError(f"Unknown sweep parameter '{kind}'. Use one of: {', '.join(SWEEP_PARAMETERS)}.")
+        self.kind = kind
+        self.owner = SWEEP_PARAMETERS[kind][0]
+        self.target = int(target)
+        self.values = [float(v) for v in values]
+        if not self.values:
+            raise ValueError(f"Sweep of {self.label()} has no values.")
+        if not all(np.isfinite(self.values)):
+            raise ValueError(f"Sweep of {self.label()} has a non-finite value.")
+        if kind == "area" and min(self.values) <= 0:
+            raise ValueError(f"Sweep of {self.label()} must use positive areas.")
+        self.index = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Read {"parameter": "area", "element_id": 3, "values": [...]} or a
+        range given as "start", "stop" and "steps" instead of "values"."""
+        if not isinstance(data, dict):
+            raise ValueError("Each sweep parameter must be an object.")
+        kind = data.get("parameter")
+        if kind not in SWEEP_PARAMETERS:
+            raise ValueError(f"Unknown sweep parameter '{kind}'. Use one of: {', '.join(SWEEP_PARAMETERS)}.")
+        owner = SWEEP_PARAMETERS[kind][0]
+        try:
+            target = data[f"{owner}_id"]
+            if "values" in data:
+                values = list(data["values"])
+            else:
+                steps = int(data["steps"])
+                if not 2 <= steps <= MAX_SWEEP_VARIANTS:
+                    raise ValueError
+                values = np.linspace(float(data["start"]), float(data["stop"]), steps).tolist()
+            return cls(kind, target, values)
+        except (KeyError, TypeError, ValueError) as e:
+            if isinstance(e, ValueError) and str(e):
+                raise
+            raise ValueError(
+                f"Sweep parameter {data!r} needs '{owner}_id' and either 'values' "
+                f"or 'start', 'stop' and 'steps' (2 to {MAX_SWEEP_VARIANTS})."
+            ) from None
+
+    def label(self):
+        return f"{self.kind} of {self.owner} {self.target}"
+
+    def to_dict(self):
+        return {"parameter": self.kind, f"{self.owner}_id": self.target, "values": self.values}
+
+    def resolve(self, truss):
+        """Find the row of the target in ``truss``; raises ValueError if it is not there."""
+        ids = truss.element_ids if self.owner == "element" else truss.node_ids
+        rows = np.flatnonzero(ids == self.target)
+        if not rows.size:
+            raise ValueError(f"Sweep parameter refers to unknown {self.owner} {self.target}.")
+        self.index = int(rows[0])
+        return self
+
+
+def parse_sweep(raw, truss):
+    """Validate the "parameters" of a sweep request against ``truss``."""
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("parameters must be a non-empty list.")
+    if len(raw) > MAX_SWEEP_PARAMETERS:
+        raise ValueError(f"At most {MAX_SWEEP_PARAMETERS} parameters can be swept together.")
+    params = [SweepParameter.from_dict(p).resolve(truss) for p in raw]
+    seen = set()
+    for p in params:
+        if (p.kind, p.target) in seen:
+            raise ValueError(f"The {p.label()} is swept twice.")
+        seen.add((p.kind, p.target))
+    count = int(np.prod([len(p.values) for p in params]))
+    if count > MAX_SWEEP_VARIANTS:
+        raise ValueError(f"The sweep has {count} variants; at most {MAX_SWEEP_VARIANTS} are allowed.")
+    return params
+
+
+def _apply_stiffness(truss, params, combo):
+    for p, value in zip(params, combo):
+        if p.kind == "area":
+            truss.area[p.index] = value
+        elif p.kind in ("x", "y"):
+            truss.coords[p.index, SWEEP_PARAMETERS[p.kind][1]] = value
+
+
+def _evaluate_group(truss, params, combos, responses, cache):
+    """Solve variants that share one stiffness matrix with a single multi-RHS solve."""
+    variant = truss.copy()
+    _apply_stiffness(variant, params, combos[0])
+    system, _ = factorize_system(variant, cache=cache)
+
+    F = np.repeat(variant.load_vector()[:, None], len(combos), axis=1)
+    for col, combo in enumerate(combos):
+        for p, value in zip(params, combo):
+            if p.kind in ("fx", "fy"):
+                F[2 * p.index + SWEEP_PARAMETERS[p.kind][1], col] = value
+
+    d, _ = solve_system(system, variant, F)
+    forces = variant.axial_forces(d)
+    sensitivities = force_sensitivities(variant, system, d, responses) if len(responses) else None
+    return d, forces, sensitivities
+
+
+def _evaluate_groups(truss, params, groups, responses):
+    """Pool entry point: evaluate several stiffness groups, keeping failures per group.
+
+    The groups share a ``SystemCache`` of their own, so the variants do not
+    evict the factorizations of the models being edited.
+    """
+    cache = SystemCache()
+    results = []
+    for combos in groups:
+        try:
+            results.append(_evaluate_group(truss, params, combos, responses, cache))
+        except ValueError as e:
+            results.append(str(e))
+    return results
+
+
+def run_sweep(truss, params, responses=(), executor=None):
+    """Evaluate every combination of the parameter values on ``truss``.
+
+    Variants are grouped by their stiffness parameters (areas, coordinates):
+    each group is factorized once (area-only changes reuse the sweep's first
+    factorization through low-rank updates) and its load variants are solved together.
+    With an ``executor`` (e.g. the ``JobManager``) large sweeps are split into
+    contiguous runs of groups, one per worker (at most one per CPU core). ``responses`` are element
+    positions whose force sensitivities to all areas are returned.
+
+    Returns ``(combos, displacements, forces, sensitivities, errors)``,
+    indexed by variant; a variant that could not be solved has None entries
+    and its message in ``errors``.
+    """
+    combos = list(itertools.product(*(p.values for p in params)))
+    stiffness = [k for k, p in enumerate(params) if p.kind in STIFFNESS_PARAMETERS]
+    groups = {}
+    for v, combo in enumerate(combos):
+        groups.setdefault(tuple(combo[k] for k in stiffness), []).append(v)
+    members = list(groups.values())
+    grouped = [[combos[v] for v in group] for group in members]
+
+    workers = min(getattr(executor, "max_workers", 1), os.cpu_count() or 1)
+    if executor is not None and workers > 1 and len(grouped) > 1 and truss.n_dof * len(grouped) >= PARALLEL_MIN_WORK:
+        # Contiguous runs keep neighbouring area values on one worker, where
+        # they are low-rank updates of the same factorization.
+        bounds = np.linspace(0, len(grouped), min(workers, len(grouped)) + 1).astype(int)
+        chunks = [grouped[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        outcome = [r for part in executor.map(
+            _evaluate_groups, [truss] * len(chunks), [params] * len(chunks), chunks, [responses] * len(chunks),
+        ) for r in part]
+    else:
+        outcome = _evaluate_groups(truss, params, grouped, responses)
+
+    n = len(combos)
+    displacements, forces, sensitivities, errors = [None] * n, [None] * n, [None] * n, [None] * n
+    for group, result in zip(members, outcome):
+        for col, v in enumerate(group):
+            if isinstance(result, str):
+                errors[v] = result
+                continue
+            d, f, s = result
+            displacements[v] = d[:, col]
+            forces[v] = f[:, col]
+            sensitivities[v] = None if s is None else s[:, :, col]
+    return combos, displacements, forces, sensitivities, errors
@@ -1,19 +1,92 @@
+import io
 import numpy as np
+import scipy.sparse as sp
 import matplotlib.cm as cm
 import matplotlib.colors as mcolors
-import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from .solvers import (
+    CG_MAX_ITERATIONS,
+    CG_TOLERANCE,
+    FactorizedSystem,
+    IterativeSolver,
+    LowRankUpdate,
+    MechanismError,
+    StiffnessFactorization,
+)
+from .models import STATUS_SAFE, STATUS_YIELDED, STATUS_FAILED, STATUS_NAMES
+from app.utils.cache import LRUCache
+
+# Systems with more degrees of freedom than this are assembled as a sparse
+# CSR matrix; smaller ones keep the dense NumPy path.
+SPARSE_DOF_THRESHOLD = 1000
+
+# Number of factorized stiffness systems kept around, keyed by
+# TrussArrays.stiffness_key(). Re-solving a cached geometry with new loads
+# only costs a forward/back substitution.
+FACTORIZATION_CACHE_SIZE = 8
+# Area and material edits are solved as low-rank updates of the last full
+# factorization of the same topology until more than MAX_UPDATE_RANK elements
+# differ from it or the update becomes ill-conditioned.
+MAX_UPDATE_RANK = 32
+UPDATE_CONDITION_LIMIT = 1e8
+
+# Last displacement field per DOF layout (TrussArrays.dof_key()), used to
+# warm-start the conjugate gradient solver after an edit.
+_warm_starts = LRUCache(maxsize=FACTORIZATION_CACHE_SIZE)
+
+# Rendered plots, keyed by the content they show and the output settings.
+IMAGE_CACHE_SIZE = 16
+# Above this many nodes/elements the model plot omits per-item labels.
+PLOT_LABEL_LIMIT = 200
+_image_cache = LRUCache(maxsize=IMAGE_CACHE_SIZE)
+
+
+class SystemCache:
+    """Factorized systems by TrussArrays.stiffness_key(), and per
+    TrussArrays.topology_key() the last full direct factorization that
+    low-rank updates start from (see _updated_system)."""
+
+    def __init__(self, maxsize=FACTORIZATION_CACHE_SIZE):
+        self.systems = LRUCache(maxsize=maxsize)
+        self.bases = LRUCache(maxsize=maxsize)
+
+    def clear(self):
+        self.systems.clear()
+        self.bases.clear()
+
+
+# Shared by the models being edited. Throwaway variants (sweep points, sizing
+# iterations) use their own SystemCache so they do not evict these entries.
+_system_cache = SystemCache()
+
+
+def assemble_global_stiffness(truss, sparse=None):
+    """Assemble the global stiffness matrix of a ``TrussArrays`` model.
+
+    With ``sparse=None`` the storage is picked from ``SPARSE_DOF_THRESHOLD``:
+    a CSR matrix for large models and a dense array otherwise.
+    """
+    dof = truss.n_dof
+    if sparse is None:
+        sparse = dof > SPARSE_DOF_THRESHOLD
+
+    if truss.n_elements == 0:
+        return sp.csr_matrix((dof, dof)) if sparse else np.zeros((dof, dof))
+
+    blocks = truss.stiffness_blocks()
+    index = truss.dof_indices()
+    rows = np.repeat(index, 4, axis=1)
+    cols = np.tile(index, (1, 4))
+
+    if sparse:
+        # Duplicate (row, col) triplets are summed by the COO -> CSR conversion.
+        return sp.coo_matrix(
+            (blocks.ravel(), (rows.ravel(), cols.ravel())), shape=(dof, dof)
+        ).tocsr()
 
-def assemble_global_stiffness(nodes, elements):
-    dof = 2 * len(nodes)
     K = np.zeros((dof, dof))
-    for elem in elements:
-        k_local = np.array(elem.local_stiffness())
-        i = (elem.node_i.node_id - 1) * 2
-        j = (elem.node_j.node_id - 1) * 2
-        index = [i, i+1, j, j+1]
-        for a in range(4):
-            for b in range(4):
-                K[index[a], index[b]] += k_local[a, b]
+    np.add.at(K, (rows.ravel(), cols.ravel()), blocks.ravel())
     return K
 
 def check_boundary_conditions(nodes):
@@ -39,134 +112,361 @@ def check_boundary_conditions(nodes):
     return True, ""
 
 
-def apply_boundary_conditions(K, F, nodes):
-    for node in nodes:
-        i = (node.node_id - 1) * 2
-        if node.restraints.get("ux", False):
-            K[i, :] = 0
-            K[:, i] = 0
-            K[i, i] = 1
-            F[i] = 0
-        if node.restraints.get("uy", False):
-            K[i+1, :] = 0
-            K[:, i+1] = 0
-            K[i+1, i+1] = 1
-            F[i+1] = 0
-    return K, F
-
-def solve_displacements(K, F):
-    try:
-        det = np.linalg.det(K)
-        if abs(det) < 1e-10: 
-            raise ValueError(
-                "Stiffness matrix is singular (determinant ≈ 0). "
-                "This usually means the truss structure is not properly constrained. "
-                "Ensure you have at least 3 boundary conditions (restraints) to prevent rigid body motion. "
-                "For a 2D truss, you typically need: "
-                "- At least one node fixed in both x and y (ux=True, uy=True), OR "
-                "- Multiple nodes with restraints that prevent translation and rotation."
-            )
-    except np.linalg.LinAlgError:
-        pass
+def apply_boundary_conditions(K, F, truss):
+    """Reduce K u = F to the free DOFs.
+
+    Restrained DOFs are eliminated rather than zeroed out; their prescribed
+    displacements (settlements) move to the right-hand side:
+    K_ff u_f = F_f - K_fs u_s.
+    """
+    K_ff, K_fs = partition_stiffness(K, truss)
+    F_f = F[truss.free_dofs()] - K_fs @ truss.prescribed_displacements()
+    return K_ff, F_f
+
+
+def partition_stiffness(K, truss):
+    """Return the free-free and free-fixed blocks (K_ff, K_fs) of K."""
+    free = truss.free_dofs()
+    fixed = truss.restrained_dofs()
+    if sp.issparse(K):
+        K_free = K.tocsr()[free]
+        return K_free[:, free], K_free[:, fixed]
+    return K[np.ix_(free, free)], K[np.ix_(free, fixed)]
+
+
+def expand_displacements(truss, d_free):
+    """Scatter free-DOF displacements back into the full DOF vector."""
+    d = np.zeros(truss.n_dof)
+    d[truss.free_dofs()] = d_free
+    d[truss.restrained_dofs()] = truss.prescribed_displacements()
+    return d
+
+
+def compute_reactions(K, F, d, truss):
+    """Return the support reaction at every restrained DOF: R_s = K_s u - F_s."""
+    fixed = truss.restrained_dofs()
+    if sp.issparse(K):
+        return K.tocsr()[fixed] @ d - F[fixed]
+    return K[fixed] @ d - F[fixed]
+
+
+def describe_mechanism(truss, dofs):
+    """Build a user-facing message naming the nodes/directions left unrestrained."""
+    labels = []
+    for dof in dofs:
+        node_id = int(truss.node_ids[dof // 2])
+        labels.append(f"node {node_id} ({'ux' if dof % 2 == 0 else 'uy'})")
+    return (
+        "The truss structure is not properly constrained (it is a mechanism). "
+        f"Nothing prevents movement at: {', '.join(labels)}. "
+        "Add restraints (supports) or members connecting these nodes. "
+        "For a 2D truss you need at least 3 independent restraints to prevent "
+        "translation in X, translation in Y and rotation about Z."
+    )
+
+
+def solve_displacements(K, F, truss=None):
+    """Factorize K once and solve K u = F.
+
+    A singular K raises ``MechanismError``. When ``truss`` is given, K and F
+    are the reduced system from ``apply_boundary_conditions`` and the error
+    names the unrestrained nodes.
+    """
+    if K.shape[0] == 0:
+        return np.zeros_like(F, dtype=float)
     try:
-            return np.linalg.solve(K, F)
-    except np.linalg.LinAlgError as e:
+        return StiffnessFactorization(K).solve(F)
+    except MechanismError as e:
+        if truss is None:
+            raise
+        dofs = truss.free_dofs()[e.dofs]
+        raise MechanismError(dofs, describe_mechanism(truss, dofs)) from None
+
+
+def factorize_system(truss, use_cache=True, solver="direct", preconditioner="jacobi",
+                     tol=CG_TOLERANCE, maxiter=CG_MAX_ITERATIONS, cache=None):
+    """Assemble and factorize the stiffness of ``truss``, reusing a cached system.
+
+    Returns ``(system, cached)``. The cache key covers geometry, connectivity,
+    areas, materials and restraints, so any of those edits misses the cache
+    while load or settlement edits hit it. On a miss, a direct system whose
+    topology was factorized before and which differs only in a few element
+    areas or materials is derived from that factorization by a low-rank
+    update instead of being refactorized.
+
+    ``solver="cg"`` skips the factorization and attaches a preconditioned
+    conjugate gradient ``IterativeSolver`` to a sparse K instead.
+
+    ``cache`` is a ``SystemCache`` to use instead of the shared one.
+    """
+    if cache is None:
+        cache = _system_cache
+    if solver not in ("direct", "cg"):
+        raise ValueError(f"Unknown solver '{solver}'. Use 'direct' or 'cg'.")
+    key = truss.stiffness_key()
+    if solver == "cg":
+        key = (key, preconditioner, float(tol), int(maxiter))
+    if use_cache:
+        system = cache.systems.get(key)
+        if system is not None:
+            return system, True
+        if solver == "direct":
+            system = _updated_system(truss, cache)
+            if system is not None:
+                cache.systems.set(key, system)
+                return system, False
+
+    K = assemble_global_stiffness(truss, sparse=True if solver == "cg" else None)
+    K_ff, K_fs = partition_stiffness(K, truss)
+    free = truss.free_dofs()
+    if K_ff.shape[0] == 0:
+        factor = None
+    else:
         try:
-            solution, residuals, rank, s = np.linalg.lstsq(K, F, rcond=None)
-            if rank < K.shape[0]:
-                raise ValueError(
-                    f"Stiffness matrix is rank-deficient (rank={rank}, expected={K.shape[0]}). "
-                    "The truss structure is not properly constrained. "
-                    "This typically means: "
-                    "1. Not enough boundary conditions (restraints) to prevent rigid body motion, OR "
-                    "2. The structure is a mechanism (unstable). "
-                    "For a 2D truss, you need at least 3 independent restraints to prevent: "
-                    "- Translation in X direction, "
-                    "- Translation in Y direction, "
-                    "- Rotation about Z axis. "
-                    "Please add more restraints (supports) to your nodes."
-                )
-            return solution
-        except Exception as inner_e:
-            raise ValueError(
-                f"Failed to solve truss system: {str(e)}. "
-                "The structure may be unstable or improperly constrained. "
-                "Check that you have sufficient boundary conditions (restraints) on your nodes."
-            ) from e
-
-
-def compute_forces(elements, displacements):
-    forces = {}
-    for elem in elements:
-        cx, cy = elem.direction_cosines()
-        i = (elem.node_i.node_id - 1) * 2
-        j = (elem.node_j.node_id - 1) * 2
-        u = np.array([displacements[i], displacements[i+1], displacements[j], displacements[j+1]])
-        E = elem.material.E
-        A = elem.area
-        L = elem.length()
-        strain = (1 / L) * np.array([-cx, -cy, cx, cy]).dot(u)
-        forces[elem.element_id] = E * A * strain
-    return forces
-
-
-def check_element_failure(elements, forces):
-    results = {}
-
-    for elem in elements:
-        force = forces[elem.element_id]
-        stress = force / elem.area
-
-        Sy = elem.material.Sy
-        Su = elem.material.Su
-
-        if abs(stress) >= Su:
-            status = "FAILED"
-        elif abs(stress) >= Sy:
-            status = "YIELDED"
-        else:
-            status = "SAFE"
-
-        results[elem.element_id] = {
-            "force": force,
-            "stress": stress,
-            "status": status
-        }
-
-    return results
-
-def plot_truss(nodes, elements, displacements, forces, scale=100, filepath=None):
-    import matplotlib.pyplot as plt
-    
-    _, ax = plt.subplots(figsize=(10, 8))
+            if solver == "cg":
+                factor = IterativeSolver(K_ff, preconditioner, tol, maxiter)
+            else:
+                factor = StiffnessFactorization(K_ff)
+        except MechanismError as e:
+            dofs = free[e.dofs]
+            raise MechanismError(dofs, describe_mechanism(truss, dofs)) from None
 
-    for elem in elements:
-        xi, yi = elem.node_i.x, elem.node_i.y
-        xj, yj = elem.node_j.x, elem.node_j.y
-        ax.plot([xi, xj], [yi, yj], "k--", linewidth=1, alpha=0.6)
+    system = FactorizedSystem(K, K_fs, factor, free, truss.restrained_dofs())
+    if use_cache:
+        cache.systems.set(key, system)
+        if solver == "direct" and factor is not None:
+            system.axial = truss.axial_stiffness()
+            cache.bases.set(truss.topology_key(), system)
+    return system, False
+
+
+def _patch_stiffness(K, index, blocks):
+    """Return a copy of K with the (m, 4, 4) ``blocks`` added at the element DOFs ``index``."""
+    rows = np.repeat(index, 4, axis=1).ravel()
+    cols = np.tile(index, (1, 4)).ravel()
+    if sp.issparse(K):
+        return (K + sp.coo_matrix((blocks.ravel(), (rows, cols)), shape=K.shape)).tocsr()
+    K = K.copy()
+    np.add.at(K, (rows, cols), blocks.ravel())
+    return K
+
+
+def _updated_system(truss, cache):
+    """Derive the system of ``truss`` from the last full factorization of its topology in ``cache``.
+
+    A new area or material changes the element stiffness by
+    (E*A/L - E0*A0/L) b bᵀ, a rank-one term, so K is patched with the
+    difference of the element blocks and the base factorization is reused
+    through ``LowRankUpdate``. Returns None when that does not apply and
+    the caller has to refactorize.
+    """
+    base = cache.bases.get(truss.topology_key())
+    if base is None:
+        return None
+    axial = truss.axial_stiffness()
+    changed = np.flatnonzero(axial != base.axial)
+    if changed.size == 0 or changed.size > MAX_UPDATE_RANK:
+        return None
+
+    delta = axial[changed] - base.axial[changed]
+    b = truss.strain_vectors()[changed]
+    index = truss.dof_indices()[changed]
+    K = _patch_stiffness(base.K, index, delta[:, None, None] * b[:, :, None] * b[:, None, :])
+
+    U = np.zeros((truss.n_dof, changed.size))
+    U[index, np.arange(changed.size)[:, None]] = b
+    U = U[base.free]
+    # Column k of Z = K0⁻¹ U depends only on the base and element changed[k],
+    # so the columns of the previous update are reused; successive edits of
+    # the same model cost one base solve per newly changed element.
+    previous = base.update_columns
+    Z = np.empty(U.shape)
+    new = [k for k, e in enumerate(changed.tolist()) if e not in previous]
+    if new:
+        Z[:, new] = base.factor.solve(U[:, new])
+    for k, e in enumerate(changed.tolist()):
+        if e in previous:
+            Z[:, k] = previous[e]
+    factor = LowRankUpdate(base.factor, U, delta, Z)
+    if factor.condition > UPDATE_CONDITION_LIMIT:
+        return None
+    base.update_columns = dict(zip(changed.tolist(), Z.T))
+    _, K_fs = partition_stiffness(K, truss)
+    return FactorizedSystem(K, K_fs, factor, base.free, base.fixed)
 
-    forces_vals = list(forces.values())
-    abs_max = max(abs(f) for f in forces_vals) if forces_vals else 1
-    norm = mcolors.TwoSlopeNorm(vmin=-abs_max, vcenter=0, vmax=abs_max)
-    cmap = cm.coolwarm
 
-    for elem in elements:
-        i = (elem.node_i.node_id - 1) * 2
-        j = (elem.node_j.node_id - 1) * 2
+def solve_system(system, truss, F=None, settlements=True):
+    """Solve a factorized system for the loads of ``truss`` (or ``F``).
 
-        xi = elem.node_i.x + scale * displacements[i]
-        yi = elem.node_i.y + scale * displacements[i + 1]
-        xj = elem.node_j.x + scale * displacements[j]
-        yj = elem.node_j.y + scale * displacements[j + 1]
+    ``F`` may be a load vector or an (n_dof, k) matrix of load cases, all of
+    which are solved against the one factorization. Returns the displacements
+    and the reactions at the restrained DOFs, with the same number of columns.
+    """
+    F = truss.load_vector() if F is None else F
+    u_s = truss.prescribed_displacements() if settlements else np.zeros(len(system.fixed))
+    if F.ndim == 2:
+        u_s = np.repeat(u_s[:, None], F.shape[1], axis=1)
+    F_f = F[system.free] - system.K_fs @ u_s
+    d = np.zeros(F.shape)
+    if isinstance(system.factor, IterativeSolver):
+        previous = _warm_starts.get(truss.dof_key())
+        x0 = previous[system.free] if previous is not None and F.ndim == 1 else None
+        d[system.free] = system.factor.solve(F_f, x0)
+        if F.ndim == 1:
+            _warm_starts.set(truss.dof_key(), d)
+    elif system.factor is not None:
+        d[system.free] = system.factor.solve(F_f)
+    d[system.fixed] = u_s
+    return d, compute_reactions(system.K, F, d, truss)
 
-        force = forces[elem.element_id]
-        color = cmap(norm(force))
 
-        ax.plot([xi, xj], [yi, yj], color=color, linewidth=4)
+def combination_matrix(case_names, combinations):
+    """Return the (n_cases, n_combinations) factor matrix of ``combinations``."""
+    index = {name: k for k, name in enumerate(case_names)}
+    C = np.zeros((len(case_names), len(combinations)))
+    for col, combo in enumerate(combinations):
+        for case, factor in combo.factors.items():
+            if case not in index:
+                raise ValueError(f"Load combination '{combo.name}' references unknown load case '{case}'.")
+            C[index[case], col] = factor
+    return C
+
+
+def solve_load_cases(truss, load_cases, combinations=(), system=None):
+    """Solve every load case in one multi-RHS solve and superpose the combinations.
+
+    Returns ``(names, displacements, reactions, forces)`` with one column per
+    load case followed by one column per combination.
+    """
+    if system is None:
+        system, _ = factorize_system(truss)
+    F = truss.load_matrix(load_cases)
+    d, reactions = solve_system(system, truss, F, settlements=False)
+    forces = truss.axial_forces(d)
+
+    names = [case.name for case in load_cases]
+    if combinations:
+        C = combination_matrix(names, combinations)
+        d = np.hstack([d, d @ C])
+        reactions = np.hstack([reactions, reactions @ C])
+        forces = np.hstack([forces, forces @ C])
+        names += [combo.name for combo in combinations]
+    return names, d, reactions, forces
+
+
+def force_envelope(names, forces):
+    """Return per-element max/min force over all columns and the governing column names."""
+    if forces.shape[1] == 0:
+        empty = np.zeros(forces.shape[0])
+        return {"max": empty, "min": empty, "max_case": [], "min_case": []}
+    imax = np.argmax(forces, axis=1)
+    imin = np.argmin(forces, axis=1)
+    rows = np.arange(forces.shape[0])
+    return {
+        "max": forces[rows, imax],
+        "min": forces[rows, imin],
+        "max_case": [names[k] for k in imax],
+        "min_case": [names[k] for k in imin],
+    }
+
+
+def clear_factorization_cache():
+    _system_cache.clear()
+    _warm_starts.clear()
+
+
+def compute_forces(truss, displacements):
+    axial = truss.axial_forces(displacements)
+    return dict(zip(truss.element_ids.tolist(), axial.tolist()))
+
+
+def force_sensitivities(truss, system, d, responses):
+    """Adjoint derivatives of the forces of elements ``responses`` with respect to every area.
+
+    ``responses`` are element positions and ``d`` the displacements solved
+    with ``system`` (a vector or an (n_dof, k) matrix). With N_j = k_j b_jᵀ u
+    and K_ff λ_j = k_j b_j on the free DOFs,
+
+        dN_j/dA_e = δ_je (E_j/L_j) b_jᵀ u - (E_e/L_e) (b_eᵀ λ_j) (b_eᵀ u),
+
+    so one extra solve per response covers all m areas. Returns an array of
+    shape (len(responses), m), or (len(responses), m, k) for a matrix ``d``.
+    """
+    responses = np.asarray(responses, dtype=np.intp)
+    elongation = truss.elongations(d)
+    if elongation.ndim == 1:
+        return force_sensitivities(truss, system, d[:, None], responses)[:, :, 0]
+
+    G = np.zeros((truss.n_dof, responses.size))
+    G[truss.dof_indices()[responses], np.arange(responses.size)[:, None]] = (
+        truss.axial_stiffness()[responses, None] * truss.strain_vectors()[responses]
+    )
+    lam = np.zeros(G.shape)
+    if system.factor is not None and responses.size:
+        lam[system.free] = system.factor.solve(G[system.free])
+
+    modulus = truss.E / truss.lengths()
+    # (r, m, 1) * (1, m, k)
+    dN = -(modulus[None, :] * truss.elongations(lam).T)[:, :, None] * elongation[None, :, :]
+    dN[np.arange(responses.size), responses] += modulus[responses, None] * elongation[responses]
+    return dN
+
+
+def classify_stresses(truss, forces):
+    """Return the stress of every element and its status code (STATUS_SAFE/YIELDED/FAILED).
+
+    ``forces`` is the (m,) array of axial forces; the codes are a uint8 array.
+    """
+    stresses = np.asarray(forces, dtype=float) / truss.area
+    magnitude = np.abs(stresses)
+    status = np.full(stresses.shape, STATUS_SAFE, dtype=np.uint8)
+    status[magnitude >= truss.Sy] = STATUS_YIELDED
+    status[magnitude >= truss.Su] = STATUS_FAILED
+    return stresses, status
+
+
+def check_element_failure(truss, forces):
+    """Return {element_id: {force, stress, status}}; ``forces`` is a dict by element ID or an array."""
+    if isinstance(forces, dict):
+        forces = [forces[eid] for eid in truss.element_ids.tolist()]
+    forces = np.asarray(forces, dtype=float)
+    stresses, status = classify_stresses(truss, forces)
+    return {
+        eid: {"force": force, "stress": stress, "status": STATUS_NAMES[code]}
+        for eid, force, stress, code in zip(
+            truss.element_ids.tolist(), forces.tolist(), stresses.tolist(), status.tolist()
+        )
+    }
+
+def plot_truss(truss, displacements, forces, scale=100, filepath=None, dpi=150, fmt="png"):
+    """Draw the deformed truss coloured by axial force; ``filepath`` may be a path or a binary file."""
+    # A standalone Figure (rather than pyplot) keeps rendering thread-safe.
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+
+    undeformed = truss.coords
+    deformed = truss.coords + scale * np.asarray(displacements, dtype=float).reshape(-1, 2)
+
+    # One LineCollection per layer instead of one Line2D per element.
+    ax.add_collection(LineCollection(
+        undeformed[truss.connectivity], colors="k", linestyles="--", linewidths=1, alpha=0.6,
+    ))
+
+    if isinstance(forces, dict):
+        forces = [forces[eid] for eid in truss.element_ids.tolist()]
+    forces = np.asarray(forces, dtype=float)
+    abs_max = float(np.max(np.abs(forces))) if forces.size else 1
+    norm = mcolors.TwoSlopeNorm(vmin=-abs_max, vcenter=0, vmax=abs_max)
+    cmap = cm.coolwarm
+
+    ax.add_collection(LineCollection(
+        deformed[truss.connectivity], colors=cmap(norm(forces)), linewidths=4,
+    ))
+    ax.autoscale_view()
 
     sm = cm.ScalarMappable(norm=norm, cmap=cmap)
     sm.set_array([])
-    cbar = plt.colorbar(sm, ax=ax)
+    cbar = fig.colorbar(sm, ax=ax)
     cbar.set_label(
         "Axial Force (N)\n(Positive = Tension, Negative = Compression)", fontsize=12
     )
@@ -176,9 +476,113 @@ def plot_truss(nodes, elements, displacements, forces, scale=100, filepath=None)
     ax.set_ylabel("Y (m)")
     ax.set_title("Truss Deformation and Axial Force Distribution")
     ax.grid(True, alpha=0.3)
-    plt.tight_layout()
+    fig.tight_layout()
     
     save_path = filepath if filepath else "truss_deformation.png"
-    plt.savefig(save_path, dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"Plot saved as '{save_path}'")
\ No newline at end of file
+    fig.savefig(save_path, dpi=dpi, bbox_inches="tight", format=fmt)
+    if isinstance(save_path, str):
+        print(f"Plot saved as '{save_path}'")
+
+
+def plot_model(truss, filepath, dpi=160, fmt="png"):
+    """Draw the undeformed model with node and element labels and load arrows.
+
+    Elements, nodes and arrows are each drawn as a single collection; labels
+    are only added up to ``PLOT_LABEL_LIMIT`` items, beyond which they would
+    be unreadable anyway and dominate the rendering time.
+    """
+    fig = Figure(figsize=(6, 4), dpi=dpi)
+    ax = fig.subplots()
+
+    if truss.n_nodes:
+        xs, ys = truss.coords[:, 0], truss.coords[:, 1]
+        span_x = float(xs.max() - xs.min()) if truss.n_nodes > 1 else 1.0
+        span_y = float(ys.max() - ys.min()) if truss.n_nodes > 1 else 1.0
+        span = max(span_x, span_y, 1.0)
+    else:
+        span = 1.0
+
+    segments = truss.coords[truss.connectivity]
+    ax.add_collection(LineCollection(segments, colors="#38bdf8", linewidths=2.0))
+    if truss.n_elements <= PLOT_LABEL_LIMIT:
+        for element_id, (mid_x, mid_y) in zip(truss.element_ids.tolist(), segments.mean(axis=1).tolist()):
+            ax.text(mid_x, mid_y, f"E{element_id}", color="#e5e7eb", fontsize=7, ha="center", va="center")
+
+    if truss.n_nodes:
+        ax.scatter(xs, ys, s=35 if truss.n_nodes <= PLOT_LABEL_LIMIT else 6, color="#f97316", zorder=5)
+    if truss.n_nodes <= PLOT_LABEL_LIMIT:
+        for node_id, (x, y) in zip(truss.node_ids.tolist(), truss.coords.tolist()):
+            ax.text(x, y, f"N{node_id}", color="#e5e7eb", fontsize=7, ha="left", va="bottom")
+
+    arrow_len = 0.08 * span
+    for axis, name in ((0, "Fx"), (1, "Fy")):
+        loaded = np.flatnonzero(truss.loads[:, axis] != 0.0)
+        if not loaded.size:
+            continue
+        direction = np.sign(truss.loads[loaded, axis])
+        u = direction * arrow_len if axis == 0 else np.zeros(loaded.size)
+        v = direction * arrow_len if axis == 1 else np.zeros(loaded.size)
+        ax.quiver(
+            truss.coords[loaded, 0], truss.coords[loaded, 1], u, v,
+            angles="xy", scale_units="xy", scale=1, color="#f97373", zorder=6,
+            width=0.004, headwidth=4, headlength=5,
+        )
+        if truss.n_nodes > PLOT_LABEL_LIMIT:
+            continue
+        for k, d in zip(loaded.tolist(), direction.tolist()):
+            x, y = truss.coords[k]
+            value = truss.loads[k, axis]
+            if axis == 0:
+                ax.text(x + d * arrow_len * 1.3, y + 0.04 * span, f"{name}={value:.1f}",
+                        color="#fecaca", fontsize=7, ha="center", va="bottom")
+            else:
+                ax.text(x + 0.02 * span, y + d * arrow_len * 1.3, f"{name}={value:.1f}",
+                        color="#fecaca", fontsize=7, ha="left", va="center")
+
+    if truss.n_nodes:
+        x_margin = max(1.0, 0.15 * (float(xs.max() - xs.min()) or 1.0))
+        y_margin = max(1.0, 0.15 * (float(ys.max() - ys.min()) or 1.0))
+        ax.set_xlim(float(xs.min()) - x_margin, float(xs.max()) + x_margin)
+        ax.set_ylim(float(ys.min()) - y_margin, float(ys.max()) + y_margin)
+
+    ax.set_aspect("equal", adjustable="datalim")
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    ax.set_title("Truss visualization", color="#e5e7eb", fontsize=10)
+    ax.grid(True, linestyle="--", alpha=0.35)
+    ax.set_facecolor("#020617")
+    fig.patch.set_facecolor("#020617")
+
+    for spine in ax.spines.values():
+        spine.set_color("#4b5563")
+
+    fig.tight_layout()
+    fig.savefig(filepath, format=fmt, bbox_inches="tight")
+
+
+def render_model(truss, dpi=160, fmt="png"):
+    """Return the model plot as PNG or SVG bytes, cached by the model's content key."""
+    key = ("model", truss.content_key(), int(dpi), fmt)
+    image = _image_cache.get(key)
+    if image is None:
+        buffer = io.BytesIO()
+        plot_model(truss, buffer, dpi=dpi, fmt=fmt)
+        image = buffer.getvalue()
+        _image_cache.set(key, image)
+    return image
+
+
+def render_deformation(solution, scale=100, dpi=150, fmt="png"):
+    """Return the deformation plot of a stored solution as PNG or SVG bytes.
+
+    Rendering is far slower than solving, so it only happens when the image
+    is requested, and the bytes are cached per (results hash, scale, dpi, format).
+    """
+    key = (solution.results_hash, float(scale), int(dpi), fmt)
+    image = _image_cache.get(key)
+    if image is None:
+        buffer = io.BytesIO()
+        plot_truss(solution, solution.displacements, solution.forces, scale=scale, filepath=buffer, dpi=dpi, fmt=fmt)
+        image = buffer.getvalue()
+        _image_cache.set(key, image)
+    return image
\ No newline at end of file
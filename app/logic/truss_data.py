@@ -1,11 +1,23 @@
+from pathlib import Path
 from .models import Material
+from .model_store import ModelStore
+from .jobs import JobManager
+from app.config import MODEL_STORE_DIR, MODEL_STORE_SIZE, MODEL_STORE_PERSIST, PROJECT_MAX_AGE_DAYS, CALC_WORKERS
 
 materials = {
-    "ST-52" : Material("ST-52", 210e9, 350e6 , 550e6),
-    "ST-32" : Material("ST-32", 200e9, 195e6 , 340e6),
-    "Iron" : Material("Iron", 190e9, 200e6 , 325e6)
+    "ST-52" : Material("ST-52", 210e9, 350e6 , 550e6, 7850),
+    "ST-32" : Material("ST-32", 200e9, 195e6 , 340e6, 7850),
+    "Iron" : Material("Iron", 190e9, 200e6 , 325e6, 7870)
 }
 
-nodes = []
+# Truss models are kept per project (one project per login session); see
+# app.utils.project.current_model().
+model_store = ModelStore(
+    directory=MODEL_STORE_DIR or Path(__file__).parent / "projects",
+    maxsize=MODEL_STORE_SIZE,
+    persist=MODEL_STORE_PERSIST,
+    max_age=PROJECT_MAX_AGE_DAYS * 86400 if PROJECT_MAX_AGE_DAYS > 0 else None,
+)
 
-elements = []
+# Background calculations (POST /api/truss/jobs) run on this process pool.
+job_manager = JobManager(max_workers=CALC_WORKERS)
@@ -214,6 +214,120 @@
         }
     }
 
+    function appendTimestamp(messageDiv) {
+        const timestamp = document.createElement("div");
+        timestamp.className = "message-timestamp";
+        timestamp.textContent = formatTimestamp();
+        messageDiv.appendChild(timestamp);
+    }
+
+    function appendImageLink(contentDiv, imageUrl) {
+        const imgLink = document.createElement("a");
+        imgLink.href = imageUrl;
+        imgLink.target = "_blank";
+        imgLink.textContent = "View Truss Image";
+        imgLink.style.color = "var(--accent)";
+        imgLink.style.textDecoration = "underline";
+        imgLink.style.marginTop = "8px";
+        imgLink.style.display = "inline-block";
+        contentDiv.appendChild(imgLink);
+    }
+
+    function addReply(responseText, imageUrl) {
+        if (!imageUrl) {
+            addMessage(responseText, "api");
+            return;
+        }
+        const messageDiv = document.createElement("div");
+        messageDiv.className = "message api";
+
+        const contentDiv = document.createElement("div");
+        contentDiv.className = "message-content";
+
+        // Use innerHTML with renderMarkdown to properly render LaTeX and markdown
+        const textDiv = document.createElement("div");
+        textDiv.innerHTML = renderMarkdown(responseText);
+        contentDiv.appendChild(textDiv);
+        appendImageLink(contentDiv, imageUrl);
+
+        messageDiv.appendChild(contentDiv);
+        appendTimestamp(messageDiv);
+
+        const messagesContainer = $("#chat-messages");
+        if (messagesContainer) {
+            messagesContainer.appendChild(messageDiv);
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        }
+    }
+
+    function startStreamingReply() {
+        // Assistant message that grows as pieces of the answer arrive.
+        // Markdown is re-rendered at most once per animation frame.
+        const messagesContainer = $("#chat-messages");
+        const messageDiv = document.createElement("div");
+        messageDiv.className = "message api";
+        const contentDiv = document.createElement("div");
+        contentDiv.className = "message-content";
+        const textDiv = document.createElement("div");
+        contentDiv.appendChild(textDiv);
+        messageDiv.appendChild(contentDiv);
+        if (messagesContainer) messagesContainer.appendChild(messageDiv);
+
+        let text = "";
+        let scheduled = false;
+
+        function render() {
+            scheduled = false;
+            textDiv.innerHTML = renderMarkdown(text);
+            if (messagesContainer) messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        }
+
+        return {
+            append(delta) {
+                text += delta;
+                if (!scheduled) {
+                    scheduled = true;
+                    requestAnimationFrame(render);
+                }
+            },
+            finish(finalText, imageUrl) {
+                if (typeof finalText === "string") text = finalText;
+                render();
+                if (imageUrl) appendImageLink(contentDiv, imageUrl);
+                appendTimestamp(messageDiv);
+            },
+        };
+    }
+
+    async function readEvents(res, onEvent) {
+        // Minimal Server-Sent Events reader: calls onEvent(name, data) per message.
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+
+        function dispatch(block) {
+            let event = "message";
+            const lines = [];
+            for (const line of block.split("\n")) {
+                if (line.startsWith("event:")) event = line.slice(6).trim();
+                else if (line.startsWith("data:")) lines.push(line.slice(5).replace(/^ /, ""));
+            }
+            if (lines.length) onEvent(event, JSON.parse(lines.join("\n")));
+        }
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true }).replace(/\r\n?/g, "\n");
+            let end;
+            while ((end = buffer.indexOf("\n\n")) !== -1) {
+                dispatch(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+            }
+        }
+        if (buffer.trim()) dispatch(buffer);
+    }
+
     async function sendMessage(message) {
         const chatInput = $("#chat-input");
         const sendBtn = $("#send-btn");
@@ -238,17 +352,44 @@
         showTypingIndicator();
 
         try {
-            const res = await fetch(API_BASE + "/api/chat/req", {
+            const res = await fetch(API_BASE + "/api/chat/stream", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ message: message, history: historyToSend }),
             });
 
-            removeTypingIndicator();
+            let data = null;
+            const contentType = res.headers.get("Content-Type") || "";
+            const streamed = Boolean(res.ok && res.body && contentType.startsWith("text/event-stream"));
+            if (streamed) {
+                // The answer arrives in pieces; show it as it is written.
+                let reply = null;
+                await readEvents(res, (event, payload) => {
+                    if (event === "error") {
+                        data = payload;
+                        return;
+                    }
+                    if (!reply) {
+                        removeTypingIndicator();
+                        reply = startStreamingReply();
+                    }
+                    if (event === "done") {
+                        data = payload;
+                        reply.finish(payload.response || "No response received.", payload.image_url);
+                    } else if (payload && payload.delta) {
+                        reply.append(payload.delta);
+                    }
+                });
+                if (reply && !(data && data.ok)) {
+                    reply.finish();
+                }
+            } else {
+                data = await res.json();
+            }
 
-            const data = await res.json();
+            removeTypingIndicator();
 
-            if (!res.ok || !data.ok) {
+            if (!data || !data.ok) {
                 const errorMsg = (data && data.errors) ? data.errors.join(" ") : "Failed to get response from server.";
                 addMessage("Error: " + errorMsg, "api");
                 setStatus(statusEl, "error", "Could not send message.");
@@ -256,45 +397,8 @@
             }
 
             const responseText = data.response || "No response received.";
-            
-            // If there's an image URL, add it to the message
-            if (data.image_url) {
-                const messageDiv = document.createElement("div");
-                messageDiv.className = "message api";
-                
-                const contentDiv = document.createElement("div");
-                contentDiv.className = "message-content";
-                
-                // Use innerHTML with renderMarkdown to properly render LaTeX and markdown
-                const textDiv = document.createElement("div");
-                textDiv.innerHTML = renderMarkdown(responseText);
-                contentDiv.appendChild(textDiv);
-                
-                // Add image if URL is provided
-                const imgLink = document.createElement("a");
-                imgLink.href = data.image_url;
-                imgLink.target = "_blank";
-                imgLink.textContent = "View Truss Image";
-                imgLink.style.color = "var(--accent)";
-                imgLink.style.textDecoration = "underline";
-                imgLink.style.marginTop = "8px";
-                imgLink.style.display = "inline-block";
-                contentDiv.appendChild(imgLink);
-                
-                messageDiv.appendChild(contentDiv);
-                
-                const timestamp = document.createElement("div");
-                timestamp.className = "message-timestamp";
-                timestamp.textContent = formatTimestamp();
-                messageDiv.appendChild(timestamp);
-                
-                const messagesContainer = $("#chat-messages");
-                if (messagesContainer) {
-                    messagesContainer.appendChild(messageDiv);
-                    messagesContainer.scrollTop = messagesContainer.scrollHeight;
-                }
-            } else {
-                addMessage(responseText, "api");
+            if (!streamed) {
+                addReply(responseText, data.image_url);
             }
 
             state.conversation.push({ role: "assistant", content: responseText });
@@ -1,5 +1,7 @@
 (function () {
     const API_BASE = "";
+    const JOB_POLL_INTERVAL_MS = 500;
+    const JOB_TIMEOUT_MS = 10 * 60 * 1000;
 
     const state = {
         nodes: [],
@@ -64,6 +66,25 @@
         }
     }
 
+    function renderTrussData() {
+        updateSummary();
+
+        const nodeOptions = state.nodes.map(n => ({
+            value: String(n.node_id),
+            label: "Node " + n.node_id + " (" + n.x + ", " + n.y + ")",
+        }));
+
+        populateSelect($("#element-node-i"), nodeOptions, nodeOptions.length ? "Select node i" : "No nodes yet");
+        populateSelect($("#element-node-j"), nodeOptions, nodeOptions.length ? "Select node j" : "No nodes yet");
+        populateSelect($("#load-node"), nodeOptions, nodeOptions.length ? "Select node" : "No nodes yet");
+
+        const materialOptions = state.materials.map(name => ({
+            value: name,
+            label: name,
+        }));
+        populateSelect($("#element-material"), materialOptions, materialOptions.length ? "Select material" : "No materials");
+    }
+
     async function loadTrussData() {
         try {
             const res = await fetch(API_BASE + "/api/truss-data");
@@ -72,29 +93,50 @@
             state.nodes = data.nodes || [];
             state.elements = data.elements || [];
             state.materials = data.materials || [];
-
-            updateSummary();
-
-            const nodeOptions = state.nodes.map(n => ({
-                value: String(n.node_id),
-                label: "Node " + n.node_id + " (" + n.x + ", " + n.y + ")",
-            }));
-
-            populateSelect($("#element-node-i"), nodeOptions, nodeOptions.length ? "Select node i" : "No nodes yet");
-            populateSelect($("#element-node-j"), nodeOptions, nodeOptions.length ? "Select node j" : "No nodes yet");
-            populateSelect($("#load-node"), nodeOptions, nodeOptions.length ? "Select node" : "No nodes yet");
-
-            const materialOptions = state.materials.map(name => ({
-                value: name,
-                label: name,
-            }));
-            populateSelect($("#element-material"), materialOptions, materialOptions.length ? "Select material" : "No materials");
+            renderTrussData();
         } catch (err) {
             console.error(err);
             appendLog("Could not load current truss data.");
         }
     }
 
+    function upsert(list, key, item) {
+        const idx = list.findIndex(x => x[key] === item[key]);
+        if (idx >= 0) {
+            list[idx] = item;
+        } else {
+            list.push(item);
+        }
+    }
+
+    // Send several edits in one request; the server applies all of them or none.
+    // On success the returned nodes/elements are merged into state, so no reload is needed.
+    async function applyOperations(operations) {
+        const res = await fetch(API_BASE + "/api/truss/batch", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ operations: operations }),
+        });
+        const data = await res.json();
+        if (res.ok && data.ok) {
+            data.results.forEach((result, i) => {
+                const op = operations[i];
+                if (op.op === "delete") {
+                    const key = op.type === "node" ? "node_id" : "element_id";
+                    const list = op.type === "node" ? state.nodes : state.elements;
+                    const idx = list.findIndex(x => String(x[key]) === String(op.id));
+                    if (idx >= 0) list.splice(idx, 1);
+                } else if (result.node) {
+                    upsert(state.nodes, "node_id", result.node);
+                } else if (result.element) {
+                    upsert(state.elements, "element_id", result.element);
+                }
+            });
+            renderTrussData();
+        }
+        return { res: res, data: data };
+    }
+
     function setupTabs() {
         const tabs = document.querySelectorAll("#mode-tabs button");
         const panels = document.querySelectorAll(".panel[data-panel]");
@@ -131,24 +173,17 @@
                     uy: formData.get("uy") !== null,
                 };
                 try {
-                    const res = await fetch(API_BASE + "/api/nodes", {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify(payload),
-                    });
-                    const data = await res.json();
+                    const { res, data } = await applyOperations([{ op: "add", type: "node", data: payload }]);
                     if (!res.ok || !data.ok) {
-                        const errors = (data && data.errors) ? data.errors.join(" ") : "Could not add node.";
+                        const errors = (data && data.results) ? data.results[0].error : "Could not add node.";
                         setStatus(statusAddNode, "error", errors);
                         appendLog("Failed to add node.");
                         return;
                     }
-                    state.nodes.push(data.node);
-                    updateSummary();
-                    await loadTrussData();
+                    const node = data.results[0].node;
                     formAddNode.reset();
-                    setStatus(statusAddNode, "success", "Node " + data.node.node_id + " added.");
-                    appendLog("Added node " + data.node.node_id + " at (" + data.node.x + ", " + data.node.y + ").");
+                    setStatus(statusAddNode, "success", "Node " + node.node_id + " added.");
+                    appendLog("Added node " + node.node_id + " at (" + node.x + ", " + node.y + ").");
                 } catch (err) {
                     console.error(err);
                     setStatus(statusAddNode, "error", "Unexpected error while adding node.");
@@ -164,34 +199,27 @@
                 setStatus(statusAddElement, "error", "");
                 const formData = new FormData(formAddElement);
                 const payload = {
-                    node_i_id: formData.get("node_i_id"),
-                    node_j_id: formData.get("node_j_id"),
+                    node_i: formData.get("node_i_id"),
+                    node_j: formData.get("node_j_id"),
                     material: formData.get("material"),
                     area: formData.get("area"),
                 };
-                if (!payload.node_i_id || !payload.node_j_id || !payload.material || !payload.area) {
+                if (!payload.node_i || !payload.node_j || !payload.material || !payload.area) {
                     setStatus(statusAddElement, "error", "Please choose both nodes, a material, and enter an area.");
                     return;
                 }
                 try {
-                    const res = await fetch(API_BASE + "/api/elements", {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify(payload),
-                    });
-                    const data = await res.json();
+                    const { res, data } = await applyOperations([{ op: "add", type: "element", data: payload }]);
                     if (!res.ok || !data.ok) {
-                        const errors = (data && data.errors) ? data.errors.join(" ") : "Could not add element.";
+                        const errors = (data && data.results) ? data.results[0].error : "Could not add element.";
                         setStatus(statusAddElement, "error", errors);
                         appendLog("Failed to add element.");
                         return;
                     }
-                    state.elements.push(data.element);
-                    updateSummary();
-                    await loadTrussData();
+                    const element = data.results[0].element;
                     formAddElement.reset();
-                    setStatus(statusAddElement, "success", "Element " + data.element.element_id + " added.");
-                    appendLog("Added element " + data.element.element_id + " between nodes " + data.element.node_i + " and " + data.element.node_j + ".");
+                    setStatus(statusAddElement, "success", "Element " + element.element_id + " added.");
+                    appendLog("Added element " + element.element_id + " between nodes " + element.node_i + " and " + element.node_j + ".");
                 } catch (err) {
                     console.error(err);
                     setStatus(statusAddElement, "error", "Unexpected error while adding element.");
@@ -216,29 +244,17 @@
                     return;
                 }
                 try {
-                    const res = await fetch(API_BASE + "/api/loads", {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify(payload),
-                    });
-                    const data = await res.json();
+                    const { res, data } = await applyOperations([{ op: "add", type: "load", data: payload }]);
                     if (!res.ok || !data.ok) {
-                        const errors = (data && data.errors) ? data.errors.join(" ") : "Could not add load.";
+                        const errors = (data && data.results) ? data.results[0].error : "Could not add load.";
                         setStatus(statusAddLoad, "error", errors);
                         appendLog("Failed to add load.");
                         return;
                     }
-                    const idx = state.nodes.findIndex(n => n.node_id === data.node.node_id);
-                    if (idx >= 0) {
-                        state.nodes[idx] = data.node;
-                    } else {
-                        state.nodes.push(data.node);
-                    }
-                    updateSummary();
-                    await loadTrussData();
+                    const node = data.results[0].node;
                     formAddLoad.reset();
-                    setStatus(statusAddLoad, "success", "Load applied to node " + data.node.node_id + ".");
-                    appendLog("Applied load to node " + data.node.node_id + " (Fx=" + data.node.fx + ", Fy=" + data.node.fy + ").");
+                    setStatus(statusAddLoad, "success", "Load applied to node " + node.node_id + ".");
+                    appendLog("Applied load to node " + node.node_id + " (Fx=" + node.fx + ", Fy=" + node.fy + ").");
                 } catch (err) {
                     console.error(err);
                     setStatus(statusAddLoad, "error", "Unexpected error while adding load.");
@@ -248,6 +264,33 @@
         }
     }
 
+    // Submit a background calculation and poll it until it finishes.
+    // onStage is called with the current stage (assembly, solve, post-processing).
+    async function runCalculationJob(onStage) {
+        const res = await fetch(API_BASE + "/api/truss/jobs", { method: "POST" });
+        const data = await res.json();
+        if (!res.ok || !data.ok) return data;
+
+        const statusUrl = API_BASE + data.status_url;
+        const deadline = Date.now() + JOB_TIMEOUT_MS;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+            const statusRes = await fetch(statusUrl);
+            const statusData = await statusRes.json();
+            if (!statusRes.ok || !statusData.ok) return statusData;
+            const job = statusData.job;
+            if (job.status === "done") return { ok: true, job: job };
+            if (job.status === "failed" || job.status === "cancelled") {
+                return { ok: false, errors: [job.error || "Calculation was " + job.status + "."] };
+            }
+            if (job.stage && onStage) onStage(job.stage);
+        }
+
+        // Give up rather than poll forever; the job is not needed any more.
+        fetch(statusUrl + "/cancel", { method: "POST" }).catch(() => {});
+        return { ok: false, errors: ["The calculation did not finish in time and was cancelled."] };
+    }
+
     function setupGlobalActions() {
         const btnLoadDefault = $("#btn-load-default");
         const btnClear = $("#btn-clear-truss");
@@ -355,17 +398,21 @@
                 openModal();
                 setStatus(modalStatus, "success", "Rendering truss...");
                 try {
+                    // The image comes back as raw bytes with an ETag, so an unchanged
+                    // truss is revalidated (304) rather than rendered again.
                     const res = await fetch(API_BASE + "/api/truss/plot");
-                    const data = await res.json();
-                    if (!res.ok || !data.ok) {
+                    if (!res.ok) {
+                        const data = await res.json().catch(() => null);
                         const errors = (data && data.errors) ? data.errors.join(" ") : "Could not render truss.";
                         setStatus(modalStatus, "error", errors);
                         appendLog("Failed to render truss.");
                         if (img) img.removeAttribute("src");
                         return;
                     }
+                    const blob = await res.blob();
                     if (img) {
-                        img.src = "data:image/png;base64," + data.image_base64;
+                        if (img.src && img.src.startsWith("blob:")) URL.revokeObjectURL(img.src);
+                        img.src = URL.createObjectURL(blob);
                     }
                     setStatus(modalStatus, "success", "Truss rendered.");
                     appendLog("Rendered truss visualization.");
@@ -438,12 +485,11 @@
                 btnGoChat.textContent = "Calculating...";
                 
                 try {
-                    const res = await fetch(API_BASE + "/api/truss/calculate", {
-                        method: "POST",
+                    const data = await runCalculationJob(stage => {
+                        btnGoChat.textContent = "Calculating (" + stage + ")...";
                     });
-                    const data = await res.json();
                     
-                    if (!res.ok || !data.ok) {
+                    if (!data.ok) {
                         const errors = (data && data.errors) ? data.errors.join(" ") : "Could not calculate truss.";
                         alert("Error calculating truss: " + errors);
                         appendLog("Failed to calculate truss before going to chat.");
@@ -0,0 +1,63 @@
+import threading
+
+from httpx2 import Limits
+from openai import DefaultHttpxClient, OpenAI, Timeout
+
+from app.config import (
+    SECRET_KEY,
+    BASE_URL,
+    CHAT_CONNECT_TIMEOUT,
+    CHAT_READ_TIMEOUT,
+    CHAT_MAX_RETRIES,
+    CHAT_MAX_CONCURRENCY,
+    CHAT_QUEUE_TIMEOUT,
+)
+
+# Idle keep-alive connections are closed after this many seconds.
+KEEPALIVE_EXPIRY = 60.0
+
+_client = None
+_client_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, CHAT_MAX_CONCURRENCY))
+
+
+def chat_client():
+    """The process-wide client for the chat model, created on first use.
+
+    Its connection pool keeps connections to BASE_URL alive between
+    requests, calls time out after CHAT_CONNECT_TIMEOUT / CHAT_READ_TIMEOUT
+    (the read timeout applies between streamed chunks too), and failed
+    calls (connection errors, 408, 429, 5xx) are retried up to
+    CHAT_MAX_RETRIES times with exponential backoff by the SDK.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    base_url=BASE_URL,
+                    api_key=SECRET_KEY,
+                    timeout=Timeout(CHAT_READ_TIMEOUT, connect=CHAT_CONNECT_TIMEOUT),
+                    max_retries=CHAT_MAX_RETRIES,
+                    http_client=DefaultHttpxClient(
+                        limits=Limits(
+                            max_connections=CHAT_MAX_CONCURRENCY,
+                            max_keepalive_connections=CHAT_MAX_CONCURRENCY,
+                            keepalive_expiry=KEEPALIVE_EXPIRY,
+                        ),
+                    ),
+                )
+    return _client
+
+
+def acquire_chat_slot():
+    """Wait up to CHAT_QUEUE_TIMEOUT for one of the CHAT_MAX_CONCURRENCY model call slots.
+
+    Returns False if none came free, so a stalled upstream cannot hold
+    every web worker. A successful call must be paired with ``release_chat_slot``.
+    """
+    return _slots.acquire(timeout=CHAT_QUEUE_TIMEOUT)
+
+
+def release_chat_slot():
+    _slots.release()
@@ -0,0 +1,26 @@
+from flask import session
+import uuid
+
+from app.logic.truss_data import model_store
+
+
+def current_project_id():
+    """Return the project ID of this session, assigning a new one on first use."""
+    project_id = session.get("project_id")
+    if not project_id:
+        project_id = uuid.uuid4().hex
+        session["project_id"] = project_id
+    return project_id
+
+
+def current_model():
+    return model_store.get(current_project_id())
+
+
+def project_dir():
+    """Working directory of the current project (results, images)."""
+    return model_store.project_dir(current_project_id())
+
+
+def save_model(model):
+    model_store.save(model)
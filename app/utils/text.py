@@ -0,0 +1,7 @@
+# Persian (U+06F0..) and Arabic-Indic (U+0660..) digits mapped to ASCII.
+ASCII_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+
+def ascii_digits(text):
+    """Return ``text`` with Persian and Arabic-Indic digits written as 0-9."""
+    return text.translate(ASCII_DIGITS)
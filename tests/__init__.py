@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep the projects created by the tests out of app/logic/projects.
+os.environ.setdefault("MODEL_STORE_DIR", tempfile.mkdtemp(prefix="trussgpt-tests-"))
@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    """A local OpenAI-compatible chat completions server.
+
+    Answers with ``pieces`` (streamed as ``chat.completion.chunk`` events,
+    ``gap`` seconds apart, when the request asks for a stream) and
+    ``finish_reason``. ``requests`` collects the request bodies;
+    ``disconnected`` is set when a client drops a stream before its end.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pieces=("Member ", "5."), finish_reason="stop", gap=0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.pieces, self.finish_reason, self.gap = list(pieces), finish_reason, gap
+        self.requests = []
+        self.disconnected = threading.Event()
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(body)
+        if body.get("stream"):
+            self._stream(server)
+            return
+        data = json.dumps({
+            "id": "fake", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(server.pieces)},
+                         "finish_reason": server.finish_reason}],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, server):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = [({"content": piece}, None) for piece in server.pieces] + [({}, server.finish_reason)]
+        try:
+            for delta, finish_reason in chunks:
+                self._send_event(json.dumps({
+                    "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": "fake",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }))
+                time.sleep(server.gap)
+            self._send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            server.disconnected.set()
+
+    def _send_event(self, data):
+        event = f"data: {data}\n\n".encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+        self.wfile.flush()
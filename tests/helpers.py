@@ -0,0 +1,56 @@
+from app.app import app
+from app.logic.models import Material, Node, Element, TrussArrays
+
+
+def logged_in_client():
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["logged_in"] = True
+    return client
+
+
+def build(client, operations):
+    """Replace the model of ``client`` with the result of a batch of operations."""
+    client.post("/api/truss/clear")
+    response = client.post("/api/truss/batch", json={"operations": operations})
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def node(ref, x, y, **fields):
+    return {"op": "add", "type": "node", "ref": ref, "data": {"x": x, "y": y, **fields}}
+
+
+def element(node_i, node_j, area=0.01, material="ST-52"):
+    return {"op": "add", "type": "element", "data": {"node_i": node_i, "node_j": node_j, "area": area, "material": material}}
+
+
+def rectangle(diagonal=True):
+    """A 4 m x 3 m frame pinned at "a" and on a roller at "b", loaded sideways at "c"."""
+    operations = [
+        node("a", 0, 0, ux=True, uy=True),
+        node("b", 4, 0, uy=True),
+        node("c", 4, 3, fx=1000.0),
+        node("d", 0, 3),
+        element("a", "b"),
+        element("b", "c"),
+        element("c", "d"),
+        element("d", "a"),
+    ]
+    if diagonal:
+        operations.append(element("a", "c"))
+    return operations
+
+
+def rectangle_arrays():
+    """The ``rectangle()`` frame as ``TrussArrays``, for tests of the solver modules."""
+    steel = Material("ST-52", 210e9, 355e6, 510e6)
+    nodes = [
+        Node(1, 0, 0, restraints={"ux": True, "uy": True}),
+        Node(2, 4, 0, restraints={"ux": False, "uy": True}),
+        Node(3, 4, 3, loads={"fx": 1000.0, "fy": 0.0}),
+        Node(4, 0, 3),
+    ]
+    pairs = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+    elements = [Element(k + 1, nodes[i], nodes[j], 0.01, steel) for k, (i, j) in enumerate(pairs)]
+    return TrussArrays(nodes, elements)
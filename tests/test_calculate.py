@@ -0,0 +1,72 @@
+import json
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.logic.solvers import IterativeSolver
+from tests.helpers import logged_in_client, build, rectangle
+
+
+class IterativeSolverTest(unittest.TestCase):
+    def test_unconverged_solve_raises(self):
+        K = sp.diags([2.0] * 50) + sp.diags([-1.0] * 49, 1) + sp.diags([-1.0] * 49, -1)
+        solver = IterativeSolver(K, preconditioner="none", maxiter=2)
+        with self.assertRaises(ValueError):
+            solver.solve(np.ones(50))
+        self.assertFalse(solver.converged)
+
+    def test_singular_solve_raises(self):
+        K = sp.csr_matrix(np.array([[1.0, -1.0], [-1.0, 1.0]]))
+        with self.assertRaises(ValueError):
+            IterativeSolver(K, preconditioner="none", maxiter=50).solve(np.array([1.0, 0.0]))
+
+
+class CalculateTest(unittest.TestCase):
+    def test_cg_solve(self):
+        client = logged_in_client()
+        build(client, rectangle(diagonal=True))
+        client.post("/api/truss/calculate")
+        direct = client.get("/api/truss/results").json["results"]["displacements"]
+        response = client.post("/api/truss/calculate", json={"solver": "cg"})
+
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertIs(response.json["solver"]["converged"], True)
+        cg = client.get("/api/truss/results").json["results"]["displacements"]
+        for a, b in zip(cg, direct):
+            self.assertAlmostEqual(a["ux"], b["ux"], delta=1e-12)
+            self.assertAlmostEqual(a["uy"], b["uy"], delta=1e-12)
+
+    def test_cg_load_cases(self):
+        client = logged_in_client()
+        build(client, rectangle(diagonal=True))
+        response = client.post("/api/truss/calculate-cases", json={
+            "solver": "cg",
+            "cases": {"W": [{"node_id": 3, "fx": 500.0}]},
+            "combinations": {"1.5W": "1.5W"},
+        })
+
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertIs(response.json["solver"]["converged"], True)
+
+    def test_failed_cg_solve_keeps_last_results(self):
+        client = logged_in_client()
+        build(client, rectangle(diagonal=True))
+        self.assertEqual(client.post("/api/truss/calculate").status_code, 200)
+        before = client.get("/api/truss/results").get_data(as_text=True)
+
+        # Without its diagonal the frame is a mechanism that still passes
+        # check_boundary_conditions.
+        diagonal = max(e["element_id"] for e in client.get("/api/truss-data").json["elements"])
+        client.post("/api/truss/batch", json={"operations": [{"op": "delete", "type": "element", "id": diagonal}]})
+        response = client.post("/api/truss/calculate", json={"solver": "cg", "maxiter": 50})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json["ok"])
+        after = client.get("/api/truss/results").get_data(as_text=True)
+        self.assertEqual(after, before)
+        json.loads(after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.api import chat_api
+from app.logic import chat_answers
+from app.logic.chat_answers import AnswerCache, answer_cache, normalize_message
+from app.utils import chat_client
+from tests.fake_openai import FakeOpenAI
+from tests.helpers import logged_in_client, build, rectangle
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_equivalent_questions(self):
+        self.assertEqual(normalize_message("  Which   MEMBER fails? "), "which member fails")
+        self.assertEqual(normalize_message("عضو ۱۲ چه نيرويي دارد؟"), "عضو 12 چه نیرویی دارد")
+
+
+class ChatServerTest(unittest.TestCase):
+    """Chat endpoints against a local OpenAI-compatible server, through the real SDK client."""
+
+    def setUp(self):
+        answer_cache.clear()
+        self.client = logged_in_client()
+        build(self.client, rectangle(diagonal=True))
+        self.client.post("/api/truss/calculate")
+
+    def serve(self, **options):
+        server = FakeOpenAI(**options)
+        self.addCleanup(server.close)
+        patches = [
+            mock.patch.object(chat_api, "SECRET_KEY", "key"),
+            mock.patch.object(chat_api, "BASE_URL", server.url),
+            mock.patch.object(chat_client, "SECRET_KEY", "key"),
+            mock.patch.object(chat_client, "BASE_URL", server.url),
+            mock.patch.object(chat_client, "_client", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return server
+
+    def ask(self):
+        response = self.client.post("/api/chat/stream", json={"message": "Which member fails?"})
+        body = response.get_data(as_text=True)
+        response.close()
+        return body
+
+    def test_stream_relays_chunks(self):
+        server = self.serve(pieces=["Member ", "5", " fails."])
+        body = self.ask()
+        self.assertEqual(body.count("data: {\"delta\""), 3)
+        self.assertIn("event: done", body)
+        self.assertIn("Member 5 fails.", body)
+        self.assertTrue(server.requests[0]["stream"])
+
+    def test_complete_answer_is_cached(self):
+        server = self.serve(finish_reason="stop")
+        self.ask()
+        body = self.ask()
+        self.assertEqual(len(server.requests), 1)
+        self.assertIn('"cached": true', body)
+
+    def test_truncated_answer_is_not_cached(self):
+        server = self.serve(finish_reason="length")
+        self.ask()
+        self.ask()
+        self.assertEqual(len(server.requests), 2)
+
+    def test_plain_request_caches_complete_answer(self):
+        server = self.serve(pieces=["Member 5."])
+        for _ in range(2):
+            response = self.client.post("/api/chat/req", json={"message": "Which member fails?"})
+            self.assertEqual(response.status_code, 200, response.json)
+            self.assertIn("Member 5.", response.json["response"])
+        self.assertEqual(len(server.requests), 1)
+
+    def test_leaving_mid_stream_closes_upstream(self):
+        server = self.serve(pieces=["word "] * 50, gap=0.05)
+        response = self.client.post("/api/chat/stream", json={"message": "Which member fails?"}, buffered=False)
+        self.assertIn("delta", next(response.iter_encoded()).decode())
+        response.close()
+
+        self.assertTrue(server.disconnected.wait(5))
+        self.assertEqual(len(answer_cache._memory), 0)
+
+
+class DiskTierTest(unittest.TestCase):
+    def test_disk_pruned_every_few_writes(self):
+        cache = AnswerCache(maxsize=4, directory=tempfile.mkdtemp(), disk_maxsize=2)
+        with mock.patch.object(chat_answers, "PRUNE_EVERY", 5):
+            for k in range(4):
+                cache.set(str(k), "answer")
+            self.assertEqual(len(os.listdir(cache.directory)), 4)
+            cache.set("4", "answer")
+            self.assertEqual(len(os.listdir(cache.directory)), 2)
+        self.assertEqual(AnswerCache(directory=cache.directory).get("4"), "answer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from tests.helpers import logged_in_client, build, rectangle
+
+
+class GeometryResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.client = logged_in_client()
+        build(self.client, rectangle(diagonal=True))
+        self.assertEqual(self.client.post("/api/truss/calculate").status_code, 200)
+
+    def edit(self, kind, data):
+        data_key = "nodes" if kind == "node" else "elements"
+        target = self.client.get("/api/truss-data").json[data_key][-1]
+        operation = {"op": "update", "type": kind, "id": target[f"{kind}_id"], "data": data}
+        self.assertEqual(self.client.post("/api/truss/batch", json={"operations": [operation]}).status_code, 200)
+
+    def results(self):
+        return self.client.get("/api/truss/geometry").json["results"]
+
+    def test_results_of_current_model(self):
+        self.assertIsNotNone(self.results())
+
+    def test_moved_node_drops_results(self):
+        self.edit("node", {"x": 0.5, "y": 3})
+        self.assertIsNone(self.results())
+        self.client.post("/api/truss/calculate")
+        self.assertIsNotNone(self.results())
+
+    def test_area_edit_drops_results(self):
+        self.edit("element", {"area": 0.02})
+        self.assertIsNone(self.results())
+
+
+if __name__ == "__main__":
+    unittest.main()
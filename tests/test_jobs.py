@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.logic.jobs import JobManager, JobCancelled, run_calculation, _run_job, _update_status, _write_json
+from app.logic.models import TrussModel
+from app.logic.results import SOLUTION_FILE_NAME
+from app.logic.truss_data import materials
+
+JOB_ID = "0" * 32
+
+
+def small_truss():
+    model = TrussModel("jobs")
+    a = model.add_node(0, 0, {"ux": True, "uy": True})
+    b = model.add_node(4, 0, {"ux": False, "uy": True})
+    c = model.add_node(2, 3, loads={"fx": 0.0, "fy": -1000.0})
+    for i, j in ((a, b), (b, c), (c, a)):
+        model.add_element(i, j, 0.01, materials["ST-52"])
+    return model.snapshot()
+
+
+class JobCancelTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.manager = JobManager(max_workers=1)
+        self.jobs_dir = self.manager.jobs_dir(self.folder)
+        self.status_path = self.jobs_dir / f"{JOB_ID}.json"
+        _write_json(self.status_path, {"job_id": JOB_ID, "status": "running", "stage": "solve"})
+
+    def test_cancel_after_finish_keeps_final_status(self):
+        self.assertTrue(self.manager.status(self.folder, JOB_ID)["cancel_requested"] is False)
+        _update_status(self.status_path, status="done")
+        status = self.manager.cancel(self.folder, JOB_ID)
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(self.manager.status(self.folder, JOB_ID)["status"], "done")
+
+    def test_worker_finishing_after_cancel_is_not_overwritten(self):
+        status = self.manager.cancel(self.folder, JOB_ID)
+        self.assertEqual(status["status"], "running")
+        self.assertTrue(status["cancel_requested"])
+        _update_status(self.status_path, status="done")
+        _update_status(self.status_path, status="running", cancel_requested=True)
+        self.assertEqual(self.manager.status(self.folder, JOB_ID)["status"], "done")
+
+    def test_cancelled_job_stores_nothing(self):
+        (self.jobs_dir / f"{JOB_ID}.cancel").touch()
+        _run_job(str(self.jobs_dir), JOB_ID, small_truss(), {}, str(self.folder))
+        self.assertEqual(self.manager.status(self.folder, JOB_ID)["status"], "cancelled")
+        self.assertFalse((self.folder / SOLUTION_FILE_NAME).exists())
+        self.assertFalse(self.manager.result_path(self.folder, JOB_ID).exists())
+
+    def test_cancel_just_before_storing(self):
+        with self.assertRaises(JobCancelled):
+            run_calculation(small_truss(), {}, self.folder, cancelled=lambda: True)
+        self.assertFalse((self.folder / SOLUTION_FILE_NAME).exists())
+        run_calculation(small_truss(), {}, self.folder, cancelled=lambda: False)
+        self.assertTrue((self.folder / SOLUTION_FILE_NAME).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from app.logic.models import LoadCombination
+
+
+class FromExpressionTest(unittest.TestCase):
+    def parse(self, expression):
+        return LoadCombination.from_expression(expression).factors
+
+    def test_decimal_factors(self):
+        self.assertEqual(self.parse("1.2D + 1.6L"), {"D": 1.2, "L": 1.6})
+        self.assertEqual(self.parse("0.9D-1.0W"), {"D": 0.9, "W": -1.0})
+        self.assertEqual(self.parse("1.2D+1.0E+1L"), {"D": 1.2, "E": 1.0, "L": 1.0})
+
+    def test_exponent_factor(self):
+        self.assertEqual(self.parse("D+1e3*L"), {"D": 1.0, "L": 1000.0})
+        self.assertEqual(self.parse("2.5E-1*W"), {"W": 0.25})
+
+    def test_explicit_product(self):
+        self.assertEqual(self.parse("1.2*D+2*E1"), {"D": 1.2, "E1": 2.0})
+
+    def test_exponent_without_product_is_rejected(self):
+        for expression in ("D+1e3L", "2E1"):
+            with self.assertRaises(ValueError):
+                self.parse(expression)
+
+    def test_malformed(self):
+        for expression in ("", "1.2D1.6L", "D*", "1.2"):
+            with self.assertRaises(ValueError):
+                self.parse(expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.api import turss_info_api
+from app.logic.model_store import ModelStore, StaleModelError
+from tests.helpers import logged_in_client
+
+DAY = 86400
+
+
+class ProjectPruneTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ModelStore(tempfile.mkdtemp(), persist=True, max_age=7 * DAY)
+
+    def age(self, project_id, days):
+        past = time.time() - days * DAY
+        os.utime(self.store.directory / project_id, (past, past))
+
+    def test_prune_removes_unused_projects(self):
+        for project_id in ("old", "recent"):
+            (self.store.project_dir(project_id) / "truss_solution.npz").write_bytes(b"x")
+            self.store.save(self.store.get(project_id))
+        self.age("old", 8)
+        self.age("recent", 6)
+
+        self.assertEqual(self.store.prune(), ["old"])
+        self.assertFalse((self.store.directory / "old").exists())
+        self.assertTrue((self.store.directory / "recent" / "truss_solution.npz").exists())
+        self.assertEqual(self.store.get("old").nodes, [])
+
+    def test_using_a_project_keeps_it(self):
+        self.store.project_dir("active")
+        self.age("active", 8)
+        self.store._touched.clear()
+        self.store.project_dir("active")
+        self.assertEqual(self.store.prune(), [])
+
+    def test_prune_runs_when_projects_are_opened(self):
+        self.store.project_dir("old")
+        self.age("old", 8)
+        self.store._last_prune = 0.0
+        self.store.project_dir("new")
+        self.assertFalse((self.store.directory / "old").exists())
+
+    def run_with_prune_due(self, action):
+        self.store._last_prune = 0.0
+        worker = threading.Thread(target=action, daemon=True)
+        worker.start()
+        worker.join(5)
+        self.assertFalse(worker.is_alive(), "the store deadlocked while pruning")
+
+    def test_get_prunes_when_due(self):
+        self.store.project_dir("old")
+        self.age("old", 8)
+        self.run_with_prune_due(lambda: self.store.get("new"))
+        self.assertFalse((self.store.directory / "old").exists())
+
+    def test_save_prunes_when_due(self):
+        model = self.store.get("new")
+        self.store.project_dir("old")
+        self.age("old", 8)
+        self.run_with_prune_due(lambda: self.store.save(model))
+        self.assertFalse((self.store.directory / "old").exists())
+        self.assertTrue((self.store.directory / "new" / "model.pkl").exists())
+
+
+class SharedStoreTest(unittest.TestCase):
+    """Two stores on one directory stand in for two worker processes."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.first = ModelStore(directory, persist=True)
+        self.second = ModelStore(directory, persist=True)
+
+    def test_save_after_other_worker_saved_is_refused(self):
+        a = self.first.get("p")
+        b = self.second.get("p")
+        a.add_node(0, 0)
+        self.first.save(a)
+        b.add_node(1, 1)
+
+        with self.assertRaises(StaleModelError):
+            self.second.save(b)
+        reloaded = self.second.get("p")
+        self.assertEqual([(n.x, n.y) for n in reloaded.nodes], [(0.0, 0.0)])
+        reloaded.add_node(1, 1)
+        self.second.save(reloaded)
+        self.assertEqual(len(self.first.get("p").nodes), 2)
+
+    def test_save_after_eviction(self):
+        store = ModelStore(tempfile.mkdtemp(), maxsize=1, persist=True)
+        model = store.get("p")
+        store.save(model)
+        store.get("q")
+        model.add_node(0, 0)
+        store.save(model)
+        self.assertEqual(len(store.get("p").nodes), 1)
+
+    def test_stale_save_is_a_conflict(self):
+        client = logged_in_client()
+        with mock.patch.object(turss_info_api, "save_model", side_effect=StaleModelError("changed")):
+            response = client.post("/api/nodes", json={"x": 0, "y": 0})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json, {"ok": False, "errors": ["changed"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
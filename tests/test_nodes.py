@@ -0,0 +1,38 @@
+import unittest
+
+from app.logic.models import TrussModel
+from tests.helpers import logged_in_client, build, node
+
+
+class NonFiniteCoordinateTest(unittest.TestCase):
+    def setUp(self):
+        self.client = logged_in_client()
+        build(self.client, [node("a", 0, 0, ux=True, uy=True)])
+
+    def test_model_rejects_non_finite_coordinates(self):
+        model = TrussModel("test")
+        for x, y in ((float("inf"), 0.0), (0.0, float("-inf")), (float("nan"), 1.0)):
+            with self.assertRaises(ValueError):
+                model.add_node(x, y)
+        self.assertEqual(model.nodes, [])
+
+    def test_add_node(self):
+        for value in ("inf", "-inf", "nan"):
+            response = self.client.post("/api/nodes", json={"x": value, "y": 1})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("finite", response.json["errors"][0])
+
+    def test_batch(self):
+        response = self.client.post("/api/truss/batch", json={"operations": [node("b", "inf", 1)]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("finite", response.json["errors"][0])
+
+    def test_import(self):
+        body = '{"type": "node", "id": 1, "x": 0, "y": 0}\n{"type": "node", "id": 2, "x": Infinity, "y": 0}\n'
+        response = self.client.post("/api/truss/import?format=jsonl", data=body)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("finite", " ".join(response.json["errors"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from app.logic.results import Solution
+from app.logic.truss_calculator import classify_stresses, factorize_system, solve_system
+from tests.helpers import rectangle_arrays
+
+
+class SolutionSaveTest(unittest.TestCase):
+    def test_concurrent_saves(self):
+        truss = rectangle_arrays()
+        system, _ = factorize_system(truss, use_cache=False)
+        d, reactions = solve_system(system, truss)
+        forces = truss.axial_forces(d)
+        solution = Solution.from_truss(truss, d, reactions, forces, *classify_stresses(truss, forces))
+        path = Path(tempfile.mkdtemp()) / "truss_solution.npz"
+        errors = []
+
+        def save():
+            try:
+                for _ in range(20):
+                    solution.save(path)
+            except OSError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=save) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        np.testing.assert_array_equal(Solution.load(path).forces, solution.forces)
+        self.assertEqual(list(path.parent.glob("*.tmp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from app.api import turss_info_api
+from app.logic import truss_calculator
+from app.logic.models import Material
+from app.logic.sizing import size_members
+from app.utils.project import current_model
+from tests.helpers import logged_in_client, build, rectangle, rectangle_arrays
+
+
+def size_then_edit(edit):
+    """``size_members`` that lets ``edit(model)`` change the model before it returns."""
+    original = turss_info_api.size_members
+
+    def run(*args, **kwargs):
+        result = original(*args, **kwargs)
+        model = current_model()
+        with model.write():
+            edit(model)
+        return result
+
+    return mock.patch.object(turss_info_api, "size_members", run)
+
+
+class SizeApplyTest(unittest.TestCase):
+    def setUp(self):
+        self.client = logged_in_client()
+        build(self.client, rectangle(diagonal=True))
+
+    def areas(self):
+        return [e["area"] for e in self.client.get("/api/truss-data").json["elements"]]
+
+    def test_apply(self):
+        response = self.client.post("/api/truss/size", json={"apply": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json["applied"])
+        self.assertNotEqual(self.areas(), [0.01] * 5)
+
+    def test_load_edited_while_sizing(self):
+        def edit(model):
+            model.update_node(model.nodes[2], loads={"fx": 5000.0, "fy": 0.0})
+
+        with size_then_edit(edit):
+            response = self.client.post("/api/truss/size", json={"apply": True})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.areas(), [0.01] * 5)
+
+    def test_element_replaced_while_sizing(self):
+        def edit(model):
+            element = model.elements[-1]
+            node_i, node_j, area, material = element.node_i, element.node_j, element.area, element.material
+            model.remove_element(element)
+            model.add_element(node_i, node_j, area, material)
+
+        with size_then_edit(edit):
+            response = self.client.post("/api/truss/size", json={"apply": True})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.areas(), [0.01] * 5)
+
+
+class SizeMembersTest(unittest.TestCase):
+    def test_iterations_leave_shared_cache_alone(self):
+        truss_calculator.clear_factorization_cache()
+        materials = [Material("ST-37", 210e9, 235e6, 360e6), Material("ST-52", 210e9, 355e6, 510e6)]
+        result = size_members(rectangle_arrays(), materials)
+        self.assertTrue(result.converged)
+        self.assertEqual(len(truss_calculator._system_cache.systems), 0)
+        self.assertEqual(len(truss_calculator._system_cache.bases), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
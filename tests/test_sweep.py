@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from app.logic.sweep import SweepParameter, run_sweep
+from app.logic.truss_calculator import clear_factorization_cache, factorize_system, solve_system
+from tests.helpers import rectangle_arrays
+
+
+class SweepTest(unittest.TestCase):
+    def setUp(self):
+        clear_factorization_cache()
+
+    def test_sweep_keeps_shared_factorizations(self):
+        truss = rectangle_arrays()
+        factorize_system(truss)
+        values = np.linspace(0.005, 0.02, 20).tolist()
+        param = SweepParameter("area", 5, values).resolve(truss)
+
+        combos, displacements, _, _, errors = run_sweep(truss, [param])
+
+        self.assertEqual(errors, [None] * len(values))
+        _, cached = factorize_system(truss)
+        self.assertTrue(cached)
+        variant = truss.copy()
+        variant.area[4] = values[-1]
+        expected, _ = solve_system(factorize_system(variant, use_cache=False)[0], variant)
+        np.testing.assert_allclose(displacements[-1], expected, rtol=1e-9, atol=1e-15)
+
+
+if __name__ == "__main__":
+    unittest.main()